@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from .models import Invitation
+from .models import Invitation, OutboundEmail
 
-admin.site.register(Invitation)
\ No newline at end of file
+admin.site.register(Invitation)
+admin.site.register(OutboundEmail)
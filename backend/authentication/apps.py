@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        # registers the auth version invalidation signals
+        from authentication import tokens  # noqa: F401
+        from authentication.blacklist import check_shared_cache
+        from django.conf import settings
+
+        check_shared_cache(settings.JWT_BLACKLIST_CACHE)
@@ -0,0 +1,43 @@
+from authentication.tokens import auth_version
+from core.caching import is_shared_cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from users.models import ClaimsUser
+
+CLAIMS = ("organization_id", "is_superuser", "is_organization_admin", "auth_version")
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds request.user from the token claims
+    instead of loading the user row. Tokens issued before the claims were
+    added, or before the user was deactivated or their roles changed (see
+    auth_version), fall back to the database lookup, which rejects
+    inactive users.
+
+    The auth versions live in the default cache, so claims are only
+    trusted when it is shared by all workers: with a per-process cache a
+    deactivation seen by one worker would not reach the others, and every
+    request loads the user instead.
+    """
+
+    def get_user(self, validated_token):
+        if not is_shared_cache() or not all(claim in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        organization_id = validated_token["organization_id"]
+        if validated_token["auth_version"] != auth_version(user_id, organization_id):
+            return super().get_user(validated_token)
+
+        return ClaimsUser.from_claims(
+            user_id,
+            organization_id,
+            validated_token["is_superuser"],
+            validated_token["is_organization_admin"],
+        )
@@ -0,0 +1,260 @@
+import atexit
+import hashlib
+import logging
+import math
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from core.caching import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. Membership tests can return false
+    positives at roughly error_rate once capacity items were added, never
+    false negatives.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class BlacklistWriter:
+    """
+    Background thread that writes outstanding and blacklisted tokens to the
+    database in batches, so requests don't wait on those inserts.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, entry):
+        self.start()
+        self.queue.put(entry)
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="jwt-blacklist-writer", daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        while True:
+            entries = [self.queue.get()]
+            while len(entries) < self.batch_size:
+                try:
+                    entries.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(entries)
+            except Exception:
+                logger.exception(f"Failed to persist {len(entries)} token entries")
+            finally:
+                close_old_connections()
+                for _ in entries:
+                    self.queue.task_done()
+
+    def write(self, entries):
+        OutstandingToken.objects.bulk_create(
+            [
+                OutstandingToken(
+                    jti=entry["jti"],
+                    user_id=entry["user_id"],
+                    token=entry["token"],
+                    created_at=entry["created_at"],
+                    expires_at=entry["expires_at"],
+                )
+                for entry in entries
+            ],
+            ignore_conflicts=True,
+        )
+
+        blacklisted_jtis = [entry["jti"] for entry in entries if entry["blacklist"]]
+        if blacklisted_jtis:
+            BlacklistedToken.objects.bulk_create(
+                [
+                    BlacklistedToken(token_id=token_id)
+                    for token_id in OutstandingToken.objects.filter(
+                        jti__in=blacklisted_jtis
+                    ).values_list("id", flat=True)
+                ],
+                ignore_conflicts=True,
+            )
+
+    def flush(self, timeout=5):
+        """
+        Wait up to timeout seconds for queued entries to be written.
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+
+class CachedBlacklist:
+    """
+    Refresh-token blacklist that avoids a database query per refresh.
+
+    Revoked JTIs go into the shared cache (until the token expires) so every
+    worker sees a revocation immediately. Each worker also keeps a Bloom
+    filter of the JTIs blacklisted in the database, refreshed every
+    SYNC_INTERVAL seconds. A lookup that misses the cache and the Bloom
+    filter is known not to be revoked; only Bloom filter hits (old
+    revocations evicted from the cache, or false positives) query the
+    database. Blacklist rows are written to the database asynchronously.
+    """
+
+    KEY_PREFIX = "jwt-blacklist:"
+
+    def __init__(self, options):
+        self.options = options
+        self.writer = BlacklistWriter()
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.synced_at = None
+        self.next_sync = 0
+
+    @property
+    def cache(self):
+        return caches[self.options["CACHE_ALIAS"]]
+
+    def key(self, jti):
+        return f"{self.KEY_PREFIX}{jti}"
+
+    def sync(self):
+        """
+        Load the JTIs blacklisted in the database since the last sync into
+        the Bloom filter, rebuilding it when it is new or full.
+        """
+        if time.monotonic() < self.next_sync:
+            return
+
+        with self.lock:
+            if time.monotonic() < self.next_sync:
+                return
+
+            now = timezone.now()
+            blacklisted = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+            rebuild = self.bloom is None or self.bloom.count >= self.bloom.capacity
+            if rebuild:
+                bloom = BloomFilter(
+                    self.options["BLOOM_CAPACITY"], self.options["BLOOM_ERROR_RATE"]
+                )
+            else:
+                bloom = self.bloom
+                # overlap with the previous sync to cover in-flight writes
+                blacklisted = blacklisted.filter(
+                    blacklisted_at__gte=self.synced_at
+                    - timezone.timedelta(seconds=self.options["SYNC_INTERVAL"])
+                )
+
+            for jti in blacklisted.values_list("token__jti", flat=True).iterator():
+                bloom.add(jti)
+
+            self.bloom = bloom
+            self.synced_at = now
+            self.next_sync = time.monotonic() + self.options["SYNC_INTERVAL"]
+
+    def is_blacklisted(self, jti):
+        if self.cache.get(self.key(jti)):
+            return True
+
+        self.sync()
+        if jti not in self.bloom:
+            return False
+
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def blacklist(self, token):
+        """
+        Revoke a token. Returns False if it was already revoked, by this or
+        any other worker.
+        """
+        jti = token.payload[api_settings.JTI_CLAIM]
+        expires_at = datetime_from_epoch(token.payload["exp"])
+        timeout = max(1, int((expires_at - timezone.now()).total_seconds()))
+
+        if not self.cache.add(self.key(jti), 1, timeout=timeout):
+            return False
+
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+        self.writer.submit(self.entry(token, blacklist=True))
+        return True
+
+    def add_outstanding(self, token):
+        self.writer.submit(self.entry(token, blacklist=False))
+
+    def entry(self, token, blacklist):
+        return {
+            "jti": token.payload[api_settings.JTI_CLAIM],
+            "user_id": token.payload.get(api_settings.USER_ID_CLAIM),
+            "token": str(token),
+            "created_at": token.current_time,
+            "expires_at": datetime_from_epoch(token.payload["exp"]),
+            "blacklist": blacklist,
+        }
+
+
+def check_shared_cache(options):
+    """
+    Refuse to enable the cached blacklist on a cache the workers don't
+    share: a token revoked by one worker would still be accepted by the
+    others until their next sync.
+    """
+    if not options["ENABLED"]:
+        return
+
+    if not is_shared_cache(options["CACHE_ALIAS"]):
+        backend = settings.CACHES[options["CACHE_ALIAS"]]["BACKEND"]
+        raise ImproperlyConfigured(
+            f"JWT_BLACKLIST_CACHE needs a cache shared by all workers, "
+            f"the {options['CACHE_ALIAS']!r} cache uses {backend}. Set REDIS_URL."
+        )
+
+
+cached_blacklist = CachedBlacklist(settings.JWT_BLACKLIST_CACHE)
+atexit.register(cached_blacklist.writer.flush)
@@ -0,0 +1,118 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from authentication.models import Invitation, OutboundEmail
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired invitations, expired JWT blacklist rows and old outbox '
+        'emails in bounded chunks. Run periodically with --loop, which entrypoint.sh '
+        'starts, or from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows deleted per statement, keeps each lock short',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between chunks to leave room for other writers',
+        )
+        parser.add_argument(
+            '--outbox-retention-days',
+            type=int,
+            default=30,
+            help='Sent and dead outbox emails older than this are deleted',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and prune again every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=3600,
+            help='Seconds to wait between runs (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                self.prune(options)
+            except Exception as e:
+                # keep the worker alive, the next run picks up where this one failed
+                if not options['loop']:
+                    raise
+                self.stderr.write(self.style.ERROR(f"Failed to prune expired rows: {e}"))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def prune(self, options):
+        now = timezone.now()
+        outbox_cutoff = now - timedelta(days=options['outbox_retention_days'])
+
+        # leaf tables first so each chunk only deletes from one table
+        targets = [
+            (
+                'blacklisted tokens',
+                BlacklistedToken.objects.filter(token__expires_at__lt=now),
+            ),
+            ('outstanding tokens', OutstandingToken.objects.filter(expires_at__lt=now)),
+            (
+                'outbox emails',
+                OutboundEmail.objects.filter(
+                    status__in=['sent', 'dead'], created_at__lt=outbox_cutoff
+                ),
+            ),
+            (
+                'expired invitations',
+                Invitation.objects.filter(accepted=False, expires_at__lt=now),
+            ),
+        ]
+
+        for label, queryset in targets:
+            deleted, elapsed = self.delete_in_chunks(
+                queryset, options['chunk_size'], options['pause']
+            )
+            rate = deleted / elapsed if elapsed else 0
+            self.stdout.write(
+                f'Deleted {deleted} {label} in {elapsed:.2f}s ({rate:.0f} rows/s)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Expired rows pruned successfully!'))
+
+    def delete_in_chunks(self, queryset, chunk_size, pause):
+        """
+        Delete the rows matched by queryset chunk_size rows at a time and
+        return the number of rows deleted and the time it took.
+        """
+        model = queryset.model
+        deleted = 0
+        started = time.monotonic()
+
+        while True:
+            ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            _, per_model = model.objects.filter(pk__in=ids).delete()
+            deleted += per_model.get(model._meta.label, 0)
+            if pause:
+                time.sleep(pause)
+
+        return deleted, time.monotonic() - started
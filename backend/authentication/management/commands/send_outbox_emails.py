@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from authentication.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Emails sent per batch over one email backend connection',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll the outbox instead of draining it once',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when the outbox is empty (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+
+        while True:
+            try:
+                sent, failed = send_batch(options['batch_size'])
+            except Exception as e:
+                # keep the worker alive, the claimed emails are retried once
+                # their lease expires
+                if not options['loop']:
+                    raise
+                self.stderr.write(self.style.ERROR(f"Failed to send a batch: {e}"))
+                time.sleep(options['interval'])
+                continue
+            total_sent += sent
+            total_failed += failed
+
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed")
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Outbox drained: {total_sent} sent, {total_failed} failed')
+        )
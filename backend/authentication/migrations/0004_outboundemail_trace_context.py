@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='trace_context',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -43,4 +43,47 @@ class Invitation(models.Model):
                 self.expires_at = timezone.now() + timezone.timedelta(days=7)
                 kwargs['force_update'] = True
                 kwargs['force_insert'] = False
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class OutboundEmail(models.Model):
+    """
+    An email waiting in the outbox. Requests only queue emails; the
+    `send_outbox_emails` worker delivers them in batches and retries
+    failures with exponential backoff until they are sent or dead.
+    """
+
+    STATUS_CHOICES = {
+        "pending": "Pending",
+        "sent": "Sent",
+        "dead": "Dead",
+    }
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    invitation = models.ForeignKey(
+        Invitation,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="emails",
+    )
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # trace context of the request that queued the email, see core.tracing
+    trace_context = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"Email to {self.to_email} ({self.status})"
@@ -0,0 +1,180 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import Invitation, OutboundEmail
+from authentication.utils import render_invitation_email
+from core import tracing
+
+logger = logging.getLogger(__name__)
+
+# how long a claimed email stays hidden from other workers before it is
+# picked up again, in case the worker that claimed it died mid-batch. The
+# lease is renewed before each email is sent, so it only has to outlast one
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def invitation_url(invitation):
+    return f"{settings.FRONTEND_URL}/register?token={invitation.id}"
+
+
+def queue_invitation_emails(invitations):
+    """
+    Render and queue the invitation emails with a single insert.
+    """
+    trace_context = tracing.inject()
+    emails = []
+    for invitation in invitations:
+        subject, body, html_body = render_invitation_email(
+            invitation, invitation_url(invitation)
+        )
+        emails.append(
+            OutboundEmail(
+                invitation=invitation,
+                to_email=invitation.email,
+                subject=subject,
+                body=body,
+                html_body=html_body,
+                trace_context=trace_context,
+            )
+        )
+    return OutboundEmail.objects.bulk_create(emails)
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff before the next delivery attempt.
+    """
+    delay = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size):
+    """
+    Claim up to batch_size due emails. Rows locked by another worker are
+    skipped, and claimed rows are leased so concurrent workers leave them be.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            next_attempt_at=now + CLAIM_LEASE
+        )
+    for email in emails:
+        email.next_attempt_at = now + CLAIM_LEASE
+    return emails
+
+
+def renew_lease(email):
+    """
+    Extend the lease on a claimed email right before sending it. Returns
+    False when the lease ran out and another worker claimed the email.
+    """
+    lease = timezone.now() + CLAIM_LEASE
+    renewed = OutboundEmail.objects.filter(
+        id=email.id, status="pending", next_attempt_at=email.next_attempt_at
+    ).update(next_attempt_at=lease)
+    email.next_attempt_at = lease
+    return renewed == 1
+
+
+def send_batch(batch_size=None):
+    """
+    Deliver one batch of due emails over a single email backend connection.
+
+    If the connection fails to open or close, every email not sent yet
+    counts as a failed attempt. Emails whose lease ran out while earlier
+    ones were sent belong to another worker by then and are left alone.
+    Whatever was sent or failed is recorded even when an error escapes.
+
+    Returns a (sent, failed) tuple of counts.
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    sent, failed, lost = [], [], []
+    try:
+        try:
+            with get_connection(fail_silently=False) as connection:
+                for email in emails:
+                    if not renew_lease(email):
+                        logger.warning(f"Lease on email {email.id} ran out, leaving it to another worker")
+                        lost.append(email)
+                        continue
+                    message = EmailMultiAlternatives(
+                        subject=email.subject,
+                        body=email.body,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=[email.to_email],
+                    )
+                    if email.html_body:
+                        message.attach_alternative(email.html_body, "text/html")
+
+                    email.attempts += 1
+                    try:
+                        # joins the trace of the request that queued the email
+                        with tracing.span(
+                            "send email",
+                            attributes={"email.id": str(email.id), "email.attempt": email.attempts},
+                            context=tracing.extract(email.trace_context),
+                        ):
+                            connection.send_messages([message])
+                    except Exception as e:
+                        logger.warning(
+                            f"Failed to send email {email.id} (attempt {email.attempts}): {e}"
+                        )
+                        email.last_error = str(e)
+                        failed.append(email)
+                    else:
+                        sent.append(email)
+        except Exception as e:
+            logger.warning(f"Email backend connection failed: {e}")
+            done = {email.id for email in sent + failed + lost}
+            for email in emails:
+                if email.id not in done:
+                    email.attempts += 1
+                    email.last_error = str(e)
+                    failed.append(email)
+    finally:
+        record_results(sent, failed)
+
+    return len(sent), len(failed)
+
+
+def record_results(sent, failed):
+    """
+    Mark sent emails and their invitations, and schedule the retry of
+    failed ones or give up on them.
+    """
+    if not sent and not failed:
+        return
+
+    now = timezone.now()
+    for email in sent:
+        email.status = "sent"
+        email.sent_at = now
+        email.last_error = ""
+    for email in failed:
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = "dead"
+            logger.error(f"Giving up on email {email.id} after {email.attempts} attempts")
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+
+    with transaction.atomic():
+        OutboundEmail.objects.bulk_update(
+            sent + failed,
+            ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+        )
+        invitation_ids = [email.invitation_id for email in sent if email.invitation_id]
+        if invitation_ids:
+            Invitation.objects.filter(id__in=invitation_ids).update(email_sent=True)
@@ -1,33 +1,85 @@
 from datetime import timedelta
 
 from authentication.models import Invitation
+from authentication.tokens import CachedBlacklistRefreshToken, set_user_claims
+from core.loaders import LoadedPrimaryKeyRelatedField
+from django.conf import settings
 from django.utils import timezone  # Changed this import
 from organizations.models import Organization, Role, UserRole
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from users.models import User
 
 
+if settings.JWT_BLACKLIST_CACHE["ENABLED"]:
+    refresh_token_class = CachedBlacklistRefreshToken
+else:
+    refresh_token_class = RefreshToken
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
-    Extends the TokenObtainPairSerializer to include organization ID in claims.
+    Extends the TokenObtainPairSerializer to include organization ID and
+    admin flags in claims.
     """
 
+    token_class = refresh_token_class
+
     @classmethod
     def get_token(cls, user):
         """
-        Generates a JWT that includes the user's organization ID in claims.
+        Generates a JWT that includes the user's organization ID and admin
+        flags in claims.
         """
         token = super().get_token(user)
-        organization = user.organization
-        organization_id = None
-        if organization:
-            organization_id = str(organization.id)
-        token["organization_id"] = organization_id
-        return token
+        return set_user_claims(token, user)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer using the configured refresh token class. The user
+    claims are recomputed on every refresh so organization and admin
+    changes reach the access token without logging in again.
+    """
+
+    token_class = refresh_token_class
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        set_user_claims(refresh, user)
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data["refresh"] = str(refresh)
+
+        return data
 
 
 class InvitationSerializer(serializers.ModelSerializer):
+    organization = LoadedPrimaryKeyRelatedField(queryset=Organization.objects.all())
+    role = LoadedPrimaryKeyRelatedField(queryset=Role.objects.all())
+
     class Meta:
         model = Invitation
         fields = ["id", "email", "organization", "role", "created_at", "expires_at"]
@@ -77,25 +129,14 @@ class InvitationSerializer(serializers.ModelSerializer):
             else:
                 existing_invitation.delete()
 
-        try:
-            user = User.objects.get(email=email)
-            if UserRole.objects.filter(user=user, organization=organization).exists():
-                raise serializers.ValidationError(
-                    {"detail": "User is already a member of this organization"}
-                )
-        except User.DoesNotExist:
-            pass
-
-        try:
-            Organization.objects.get(id=organization.id)
-        except Organization.DoesNotExist:
+        if UserRole.objects.filter(
+            user__email=email, role__organization=organization
+        ).exists():
             raise serializers.ValidationError(
-                {"organization": "Invalid organization ID"}
+                {"detail": "User is already a member of this organization"}
             )
 
-        try:
-            Role.objects.get(id=role.id, organization=organization)
-        except Role.DoesNotExist:
+        if role.organization_id != organization.id:
             raise serializers.ValidationError(
                 {"role": "Invalid role ID or role does not belong to the organization"}
             )
@@ -112,3 +153,13 @@ class InvitationSerializer(serializers.ModelSerializer):
         validated_data["expires_at"] = timezone.now() + timedelta(days=7)
         validated_data["invited_by"] = self.context["request"].user
         return super().create(validated_data)
+
+
+class BulkInvitationRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk invitation. The role may be given by id or by name and
+    is resolved in bulk by the view.
+    """
+
+    email = serializers.EmailField()
+    role = serializers.CharField(max_length=100)
@@ -1,3 +1,446 @@
-from django.test import TestCase
+import io
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from authentication.authentication import ClaimsJWTAuthentication
+from authentication.blacklist import BloomFilter, CachedBlacklist, check_shared_cache
+from authentication.management.commands.prune_expired import Command as PruneExpiredCommand
+from authentication.models import Invitation, OutboundEmail
+from authentication.outbox import claim_batch, queue_invitation_emails, send_batch
+from authentication.serializers import CustomTokenObtainPairSerializer
+from core.loaders import Loader, LoadedPrimaryKeyRelatedField, _current_loader
+from core.permissions import IsOrganizationAdmin
+from organizations.models import Organization, Role, UserRole
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import ClaimsUser, User
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError("provider unavailable")
+
+
+class UnreachableEmailBackend(EmailBackend):
+    def open(self):
+        raise ConnectionError("connection refused")
+
+
+class FailingCloseEmailBackend(EmailBackend):
+    def close(self):
+        raise ConnectionError("connection reset")
+
+
+class SlowEmailBackend(EmailBackend):
+    """
+    Takes so long over the first email that the lease on the rest of the
+    batch runs out and another worker claims them.
+    """
+
+    claimed = []
+
+    def send_messages(self, messages):
+        if not mail.outbox:
+            OutboundEmail.objects.exclude(to_email=messages[0].to[0]).update(next_attempt_at=timezone.now())
+            SlowEmailBackend.claimed = claim_batch(10)
+        return super().send_messages(messages)
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        self.role = Role.objects.create(name="member", organization=self.organization)
+        self.admin = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=self.organization
+        )
+
+    def create_invitations(self, count):
+        return [
+            Invitation.objects.create(
+                email=f"user{i}@acme.test",
+                organization=self.organization,
+                role=self.role,
+                invited_by=self.admin,
+                expires_at=timezone.now() + timedelta(days=7),
+            )
+            for i in range(count)
+        ]
+
+    def test_queue_does_not_send(self):
+        queue_invitation_emails(self.create_invitations(2))
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.filter(status="pending").count(), 2)
+
+    def test_send_batch_delivers_and_marks_invitations(self):
+        invitations = self.create_invitations(3)
+        queue_invitation_emails(invitations)
+
+        self.assertEqual(send_batch(), (3, 0))
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn("Acme", mail.outbox[0].subject)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertEqual(OutboundEmail.objects.filter(status="sent").count(), 3)
+        self.assertEqual(Invitation.objects.filter(email_sent=True).count(), 3)
+        self.assertEqual(send_batch(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND="authentication.tests.CountingEmailBackend")
+    def test_send_batch_reuses_one_connection(self):
+        CountingEmailBackend.opened = 0
+        queue_invitation_emails(self.create_invitations(5))
+
+        send_batch()
+
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND="authentication.tests.FailingEmailBackend")
+    def test_failures_back_off_then_go_dead(self):
+        queue_invitation_emails(self.create_invitations(1))
+
+        self.assertEqual(send_batch(), (0, 1))
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, "pending")
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("provider unavailable", email.last_error)
+
+        # not due yet
+        self.assertEqual(send_batch(), (0, 0))
+
+        for attempt in range(2):
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            send_batch()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, "dead")
+        self.assertEqual(email.attempts, 3)
+        self.assertFalse(Invitation.objects.get().email_sent)
+
+    @override_settings(EMAIL_BACKEND="authentication.tests.UnreachableEmailBackend")
+    def test_connection_failures_count_as_attempts(self):
+        queue_invitation_emails(self.create_invitations(2))
+
+        for attempt in range(3):
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(send_batch(), (0, 2))
+
+        self.assertEqual(OutboundEmail.objects.filter(status="dead", attempts=3).count(), 2)
+        self.assertIn("connection refused", OutboundEmail.objects.first().last_error)
+
+    @override_settings(EMAIL_BACKEND="authentication.tests.FailingCloseEmailBackend")
+    def test_sent_emails_are_recorded_when_closing_fails(self):
+        queue_invitation_emails(self.create_invitations(2))
+
+        self.assertEqual(send_batch(), (2, 0))
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboundEmail.objects.filter(status="sent").count(), 2)
+        self.assertEqual(Invitation.objects.filter(email_sent=True).count(), 2)
+
+    @override_settings(EMAIL_BACKEND="authentication.tests.SlowEmailBackend")
+    def test_emails_claimed_by_another_worker_are_not_sent_twice(self):
+        queue_invitation_emails(self.create_invitations(3))
+
+        self.assertEqual(send_batch(), (1, 0))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(SlowEmailBackend.claimed), 2)
+        self.assertEqual(
+            OutboundEmail.objects.filter(
+                id__in=[email.id for email in SlowEmailBackend.claimed], status="pending", attempts=0
+            ).count(),
+            2,
+        )
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_bulk_invite_queues_emails_for_updated_invitations(self):
+        admin_role = Role.objects.create(name="admin", organization=self.organization)
+        UserRole.objects.create(user=self.admin, role=admin_role)
+        other_role = Role.objects.create(name="viewer", organization=self.organization)
+        unsent, delivered = self.create_invitations(2)
+        queue_invitation_emails([unsent])
+        token = CustomTokenObtainPairSerializer.get_token(self.admin).access_token
+
+        response = self.client.post(
+            f"/api/auth/{self.organization.id}/invite/bulk/",
+            {"invitations": [
+                {"email": unsent.email, "role": other_role.name},
+                {"email": delivered.email, "role": other_role.name},
+                {"email": "new@acme.test", "role": self.role.name},
+            ]},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]],
+            ["updated", "updated", "created"],
+        )
+        self.assertEqual(send_batch(), (3, 0))
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["new@acme.test", unsent.email, delivered.email],
+        )
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+
+class CachedBlacklistTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.blacklist = CachedBlacklist(
+            {
+                "CACHE_ALIAS": "default",
+                "BLOOM_CAPACITY": 1000,
+                "BLOOM_ERROR_RATE": 0.001,
+                "SYNC_INTERVAL": 60,
+            }
+        )
+        # write inline so the rows are visible inside the test transaction
+        self.blacklist.writer.submit = lambda entry: self.blacklist.writer.write([entry])
+        self.user = User.objects.create_user("user@acme.test", "password", "Una", "User")
+
+    def test_requires_a_shared_cache(self):
+        options = {**self.blacklist.options, "ENABLED": True}
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_cache(options)
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}):
+            check_shared_cache(options)
+
+    def test_unrevoked_tokens_skip_the_database_after_sync(self):
+        self.blacklist.sync()
+        token = RefreshToken.for_user(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.blacklist.is_blacklisted(token["jti"]))
+
+    def test_revocation_is_seen_without_a_query_and_only_once(self):
+        token = RefreshToken.for_user(self.user)
+
+        self.assertTrue(self.blacklist.blacklist(token))
+        self.assertFalse(self.blacklist.blacklist(token))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.blacklist.is_blacklisted(token["jti"]))
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=token["jti"]).exists())
+
+    def test_revocations_missing_from_the_cache_fall_back_to_the_database(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+
+        self.assertTrue(self.blacklist.is_blacklisted(token["jti"]))
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        # the claims are only trusted on a cache shared between processes
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory},
+        }))
+        organization = Organization.objects.create(name="Acme")
+        admin_role = Role.objects.create(name="admin", organization=organization)
+        self.user = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=organization
+        )
+        UserRole.objects.create(user=self.user, role=admin_role)
+        self.authentication = ClaimsJWTAuthentication()
+
+    def token(self):
+        access = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        return self.authentication.get_validated_token(str(access))
+
+    def is_admin(self, user):
+        return IsOrganizationAdmin().has_permission(SimpleNamespace(user=user), None)
+
+    def test_current_tokens_need_no_query(self):
+        token = self.token()
+
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(token)
+            self.assertTrue(self.is_admin(user))
+        self.assertIsInstance(user, ClaimsUser)
+
+    def test_unrelated_saves_keep_tokens_current(self):
+        token = self.token()
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=["last_login"])
+
+        self.assertIsInstance(self.authentication.get_user(token), ClaimsUser)
+
+    def test_deactivated_users_are_rejected(self):
+        token = self.token()
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(token)
+
+    def test_demoted_admins_fall_back_to_the_database(self):
+        token = self.token()
+        UserRole.objects.filter(user=self.user).delete()
+
+        user = self.authentication.get_user(token)
+
+        self.assertNotIsInstance(user, ClaimsUser)
+        self.assertFalse(self.is_admin(user))
+
+    def test_per_process_caches_fall_back_to_the_database(self):
+        token = self.token()
+
+        for backend in ("locmem.LocMemCache", "dummy.DummyCache"):
+            with override_settings(CACHES={"default": {"BACKEND": f"django.core.cache.backends.{backend}"}}):
+                user = self.authentication.get_user(token)
+
+            self.assertNotIsInstance(user, ClaimsUser)
+            self.assertEqual(user.pk, self.user.pk)
+
+    def test_evicted_versions_fall_back_to_the_database(self):
+        token = self.token()
+        caches["default"].clear()
+
+        user = self.authentication.get_user(token)
+
+        self.assertNotIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(self.is_admin(user))
+
+
+class LoadedPrimaryKeyRelatedFieldTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        self.role = Role.objects.create(name="member", organization=self.organization)
+        self.other_role = Role.objects.create(
+            name="member", organization=Organization.objects.create(name="Other")
+        )
+        token = _current_loader.set(Loader())
+        self.addCleanup(_current_loader.reset, token)
+
+    def test_resolves_each_object_once_per_request(self):
+        field = LoadedPrimaryKeyRelatedField(queryset=Role.objects.all())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(field.to_internal_value(self.role.id), self.role)
+            self.assertEqual(field.to_internal_value(str(self.role.id)), self.role)
+
+    def test_applies_a_filtered_queryset(self):
+        field = LoadedPrimaryKeyRelatedField(
+            queryset=Role.objects.filter(organization=self.organization)
+        )
+
+        self.assertEqual(field.to_internal_value(self.role.id), self.role)
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(self.other_role.id)
+
+
+class PruneExpiredTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        self.role = Role.objects.create(name="member", organization=self.organization)
+        self.admin = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=self.organization
+        )
+
+    def test_deletes_expired_rows_in_chunks(self):
+        now = timezone.now()
+        for i, (expires_at, accepted) in enumerate(
+            [(now - timedelta(days=1), False)] * 5
+            + [(now - timedelta(days=1), True), (now + timedelta(days=1), False)]
+        ):
+            Invitation.objects.create(
+                email=f"user{i}@acme.test",
+                organization=self.organization,
+                role=self.role,
+                invited_by=self.admin,
+                expires_at=expires_at,
+                accepted=accepted,
+            )
+        for i, (status, age) in enumerate([("sent", 40), ("dead", 40), ("pending", 40), ("sent", 1)]):
+            email = OutboundEmail.objects.create(to_email=f"user{i}@acme.test", subject="Hi", body="", status=status)
+            OutboundEmail.objects.filter(pk=email.pk).update(created_at=now - timedelta(days=age))
+        for i, expires_at in enumerate([now - timedelta(hours=1)] * 3 + [now + timedelta(hours=1)]):
+            token = OutstandingToken.objects.create(
+                user=self.admin, jti=f"jti-{i}", token="token", expires_at=expires_at
+            )
+            BlacklistedToken.objects.create(token=token)
+
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command("prune_expired", chunk_size=2, stdout=out)
+
+        output = out.getvalue()
+        for line in (
+            "Deleted 3 blacklisted tokens",
+            "Deleted 3 outstanding tokens",
+            "Deleted 2 outbox emails",
+            "Deleted 5 expired invitations",
+        ):
+            self.assertIn(line, output)
+        deletes = Counter(
+            query["sql"].split('"')[1] for query in queries if query["sql"].startswith("DELETE")
+        )
+        # at most 2 rows per statement
+        self.assertEqual(deletes["invitations"], 3)
+        self.assertEqual(deletes["token_blacklist_outstandingtoken"], 2)
+        self.assertEqual(Invitation.objects.count(), 2)
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list("status", flat=True)), ["pending", "sent"]
+        )
+        self.assertEqual(OutstandingToken.objects.get().jti, "jti-3")
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_loop_survives_a_failed_run(self):
+        runs = []
+
+        def prune(options):
+            runs.append(options)
+            if len(runs) == 1:
+                raise ConnectionError("database went away")
+            raise KeyboardInterrupt
+
+        err = io.StringIO()
+        with mock.patch.object(PruneExpiredCommand, "prune", side_effect=prune), \
+                mock.patch("time.sleep"), self.assertRaises(KeyboardInterrupt):
+            call_command("prune_expired", loop=True, stdout=io.StringIO(), stderr=err)
+
+        self.assertEqual(len(runs), 2)
+        self.assertIn("database went away", err.getvalue())
@@ -0,0 +1,110 @@
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+
+from authentication.blacklist import cached_blacklist
+
+
+# user fields the access token claims depend on
+AUTH_FIELDS = {"is_active", "is_superuser", "organization", "organization_id"}
+
+
+def auth_version_keys(user_id, organization_id):
+    return [f"auth:user:{user_id}", f"auth:organization:{organization_id}"]
+
+
+def auth_version(user_id, organization_id):
+    """
+    Return the current auth version of a user. It changes whenever the
+    user is deactivated or deleted, their roles change, or the roles of
+    their organization change, so older tokens stop matching it.
+
+    Versions are random rather than counters: one evicted from the cache
+    is replaced by a new value, which no issued token carries.
+    """
+    keys = auth_version_keys(user_id, organization_id)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = cache.get(key) or ""
+    return ":".join(versions[key] for key in keys)
+
+
+def invalidate_auth_versions(user_ids=(), organization_ids=()):
+    """
+    Make the access tokens of the given users, and of every member of the
+    given organizations, fall back to the database until they are refreshed.
+    Call this after bulk changes, which skip the signals below.
+    """
+    keys = [f"auth:user:{user_id}" for user_id in user_ids]
+    keys += [f"auth:organization:{organization_id}" for organization_id in organization_ids]
+    if keys:
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+
+def set_user_claims(token, user):
+    """
+    Add the claims ClaimsJWTAuthentication builds the request user from.
+    """
+    token["auth_version"] = auth_version(user.pk, user.organization_id)
+    token["organization_id"] = (
+        str(user.organization_id) if user.organization_id else None
+    )
+    token["is_superuser"] = user.is_superuser
+    token["is_organization_admin"] = user.roles.filter(
+        role__name="admin", role__organization_id=user.organization_id
+    ).exists()
+    return token
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist checks and writes go through the cached
+    blacklist rather than querying the token_blacklist tables directly.
+    """
+
+    def check_blacklist(self):
+        if cached_blacklist.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        if not cached_blacklist.blacklist(self):
+            raise TokenError(_("Token is blacklisted"))
+
+    @classmethod
+    def for_user(cls, user):
+        # skip BlacklistMixin.for_user, which inserts the OutstandingToken inline
+        token = super(BlacklistMixin, cls).for_user(user)
+        cached_blacklist.add_outstanding(token)
+        return token
+
+
+@receiver(post_save, sender="users.User")
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not AUTH_FIELDS & set(update_fields)):
+        return
+    invalidate_auth_versions(user_ids=[instance.pk])
+
+
+@receiver(post_delete, sender="users.User")
+def user_deleted(sender, instance, **kwargs):
+    invalidate_auth_versions(user_ids=[instance.pk])
+
+
+@receiver(post_save, sender="organizations.UserRole")
+@receiver(post_delete, sender="organizations.UserRole")
+def user_role_changed(sender, instance, **kwargs):
+    invalidate_auth_versions(user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender="organizations.Role")
+@receiver(post_delete, sender="organizations.Role")
+def role_changed(sender, instance, **kwargs):
+    invalidate_auth_versions(organization_ids=[instance.organization_id])
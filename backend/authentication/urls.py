@@ -1,7 +1,7 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .views import AcceptInvitationView, InviteUserView, RegisterView
+from .views import AcceptInvitationView, BulkInviteUsersView, InviteUserView, RegisterView
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
@@ -9,7 +9,12 @@ urlpatterns = [
     path("refresh/", TokenRefreshView.as_view(), name="refresh"),
     path("<uuid:organizationId>/invite/", InviteUserView.as_view(), name="invite_user"),
     path(
-        "invitations/<uuid:organizationId>/accept/",
+        "<uuid:organizationId>/invite/bulk/",
+        BulkInviteUsersView.as_view(),
+        name="bulk_invite_users",
+    ),
+    path(
+        "invitations/<uuid:token>/accept/",
         AcceptInvitationView.as_view(),
         name="accept_invitation",
     ),
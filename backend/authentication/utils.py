@@ -1,11 +1,9 @@
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import send_mail
-from django.conf import settings
+from authentication.serializers import CustomTokenObtainPairSerializer
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
 def login_response_constructor(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
     
     # Initialize organization data as None
     organization_data = None
@@ -51,33 +49,18 @@ def login_response_constructor(user):
         }
     }
 
-def send_invitation_email(invitation, invitation_url):
+def render_invitation_email(invitation, invitation_url):
     """
-    Send invitation email using configured email backend
+    Render the subject, plain text and html bodies of an invitation email
     """
-    try:
-        context = {
-            'invitation': invitation,
-            'invitation_url': invitation_url,
-            'organization_name': invitation.organization.name,
-            'sender_name': 'CLM System'
-        }
-        
-        # Render email templates
-        html_message = render_to_string('email/invitation.html', context)
-        plain_message = strip_tags(html_message)
-        
-        # Send email
-        send_mail(
-            subject=f'CLM System: Invitation to join {invitation.organization.name}',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[invitation.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
-        print(f"Failed to send invitation email: {str(e)}")
-        raise
-    
\ No newline at end of file
+    context = {
+        'invitation': invitation,
+        'invitation_url': invitation_url,
+        'organization_name': invitation.organization.name,
+        'sender_name': 'CLM System'
+    }
+
+    html_message = render_to_string('email/invitation.html', context)
+    plain_message = strip_tags(html_message)
+    subject = f'CLM System: Invitation to join {invitation.organization.name}'
+    return subject, plain_message, html_message
@@ -1,15 +1,29 @@
+import csv
+import io
 import logging
-from authentication.models import Invitation
-from authentication.serializers import InvitationSerializer
-from authentication.utils import login_response_constructor, send_invitation_email
-from core.permissions import IsOrganizationAdmin
+from datetime import timedelta
+
+from authentication.models import Invitation, OutboundEmail
+from authentication.outbox import invitation_url, queue_invitation_emails
+from authentication.serializers import (
+    BulkInvitationRowSerializer,
+    CustomTokenObtainPairSerializer,
+    InvitationSerializer,
+)
+from authentication.utils import login_response_constructor
+from core.permissions import IsInOrganization, IsOrganizationAdmin
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
-from rest_framework import generics, status
+from organizations.models import Organization, Role, UserRole
+from rest_framework import generics, serializers, status
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.views import APIView
 
+from users.models import User
 from users.serializers import UserSerializer
 
 logger = logging.getLogger(__name__)
@@ -28,7 +42,7 @@ class RegisterView(generics.CreateAPIView):
             user = serializer.save()
 
             # logging in new user and return tokens as success response
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
             token_pair = {"access": access_token, "refresh": refresh_token}
@@ -58,51 +72,34 @@ class InviteUserView(generics.CreateAPIView):
 
         serializer = self.get_serializer(data=mutable_data)
         if not serializer.is_valid():
-            print("Serializer errors:", serializer.errors)  # Debug print
+            logger.debug(f"Invalid invitation: {serializer.errors}")
             return Response(
                 {"message": "Invalid data provided", "errors": serializer.errors},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         try:
-            invitation = serializer.save()
-            invitation_url = f"{settings.FRONTEND_URL}/register?token={invitation.id}"
+            with transaction.atomic():
+                invitation = serializer.save()
+                # delivery happens in the outbox worker, outside the request
+                queue_invitation_emails([invitation])
 
-            try:
-                send_invitation_email(invitation, invitation_url)
-                invitation.email_sent = True
-                invitation.save(update_fields=["email_sent"])
-
-                return Response(
-                    {
-                        "message": "Invitation sent successfully!",
-                        "email_sent": True,
-                        "invitation": {
-                            "id": str(invitation.id),
-                            "email": invitation.email,
-                            "organization": str(invitation.organization.id),
-                            "role": str(invitation.role.id),
-                            "expires_at": invitation.expires_at,
-                            "invitation_url": invitation_url,
-                        },
-                    },
-                    status=status.HTTP_201_CREATED,
-                )
-
-            except Exception as e:
-                print(f"Email sending failed: {str(e)}")
-                invitation.email_sent = False
-                invitation.save(update_fields=["email_sent"])
-
-                logger.error(f"Error sending invitation email: {str(e)}", exc_info=True)
-                return Response(
-                    {
-                        "message": "Invitation created but email failed to send",
-                        "email_sent": False,
-                        "invitation": serializer.data,
+            return Response(
+                {
+                    "message": "Invitation created, email queued for delivery",
+                    "email_sent": False,
+                    "email_queued": True,
+                    "invitation": {
+                        "id": str(invitation.id),
+                        "email": invitation.email,
+                        "organization": str(invitation.organization_id),
+                        "role": str(invitation.role_id),
+                        "expires_at": invitation.expires_at,
+                        "invitation_url": invitation_url(invitation),
                     },
-                    status=status.HTTP_201_CREATED,
-                )
+                },
+                status=status.HTTP_201_CREATED,
+            )
 
         except serializers.ValidationError as e:
             if (
@@ -120,13 +117,171 @@ class InviteUserView(generics.CreateAPIView):
             raise
 
         except Exception as e:
-            logger.error(f"Error accepting invitation: {str(e)}", exc_info=True)
+            logger.error(f"Error creating invitation: {str(e)}", exc_info=True)
             return Response(
                 {"message": "Failed to create invitation"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
 
+class BulkInviteUsersView(APIView):
+    """
+    Invite many users to an organization in one request.
+
+    Accepts either JSON ({"invitations": [{"email": ..., "role": ...}]}) or a
+    multipart CSV upload in the "file" field with email and role columns.
+    The role can be a role id or name. Every row gets a result with its
+    status ("created", "updated", "skipped" or "error"), in request order.
+    Invitation emails are queued for the outbox worker, for created and
+    updated invitations alike.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin, IsInOrganization]
+    parser_classes = [JSONParser, MultiPartParser]
+
+    MAX_ROWS = 5000
+
+    def get_rows(self, request):
+        upload = request.FILES.get("file")
+        if upload:
+            reader = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig"))
+            return [
+                {"email": (row.get("email") or "").strip(), "role": (row.get("role") or "").strip()}
+                for row in reader
+            ]
+
+        rows = request.data.get("invitations") if isinstance(request.data, dict) else request.data
+        return rows if isinstance(rows, list) else None
+
+    def post(self, request, organizationId):
+        rows = self.get_rows(request)
+        if not rows:
+            return Response(
+                {"message": "Provide a non-empty invitations list or a CSV file"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > self.MAX_ROWS:
+            return Response(
+                {"message": f"At most {self.MAX_ROWS} invitations can be sent at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        organization = Organization.objects.get(id=organizationId)
+        results = [None] * len(rows)
+
+        valid_rows = {}
+        for index, row in enumerate(rows):
+            serializer = BulkInvitationRowSerializer(data=row)
+            if serializer.is_valid():
+                valid_rows[index] = serializer.validated_data
+            else:
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+
+        # resolve everything the rows refer to with a few set-based queries
+        roles = {}
+        for role in Role.objects.filter(organization=organization):
+            roles[str(role.id)] = role
+            roles[role.name] = role
+
+        emails = {data["email"] for data in valid_rows.values()}
+        members = set(
+            User.objects.filter(email__in=emails)
+            .filter(Q(organization=organization) | Q(roles__role__organization=organization))
+            .values_list("email", flat=True)
+        )
+        existing = {
+            invitation.email: invitation
+            for invitation in Invitation.objects.filter(
+                organization=organization, email__in=emails
+            ).order_by("created_at")
+        }
+
+        now = timezone.now()
+        expires_at = now + timedelta(days=settings.INVITATION_EXPIRY_DAYS)
+        to_create, to_update, to_delete = {}, {}, []
+
+        for index, data in valid_rows.items():
+            email = data["email"]
+            role = roles.get(data["role"])
+
+            if role is None:
+                results[index] = {
+                    "index": index,
+                    "status": "error",
+                    "errors": {"role": ["Invalid role or role does not belong to the organization"]},
+                }
+                continue
+            if email in members:
+                results[index] = {
+                    "index": index,
+                    "status": "skipped",
+                    "errors": {"email": ["User is already a member of this organization"]},
+                }
+                continue
+            if email in to_create or email in to_update:
+                results[index] = {
+                    "index": index,
+                    "status": "skipped",
+                    "errors": {"email": ["Duplicate email in request"]},
+                }
+                continue
+
+            invitation = existing.get(email)
+            if invitation and invitation.accepted:
+                results[index] = {
+                    "index": index,
+                    "status": "skipped",
+                    "errors": {
+                        "email": ["This user has already accepted an invitation to this organization"]
+                    },
+                }
+                continue
+
+            if invitation and invitation.expires_at > now:
+                invitation.role = role
+                invitation.expires_at = expires_at
+                to_update[email] = (index, invitation)
+                continue
+
+            if invitation:
+                to_delete.append(invitation.id)
+            to_create[email] = (
+                index,
+                Invitation(
+                    email=email,
+                    organization=organization,
+                    role=role,
+                    invited_by=request.user,
+                    expires_at=expires_at,
+                ),
+            )
+
+        created = [invitation for _, invitation in to_create.values()]
+        updated = [invitation for _, invitation in to_update.values()]
+
+        with transaction.atomic():
+            if to_delete:
+                Invitation.objects.filter(id__in=to_delete).delete()
+            Invitation.objects.bulk_create(created)
+            Invitation.objects.bulk_update(updated, ["role", "expires_at"])
+            # updated invitees are told about the new role and expiry, and
+            # get the invitation if it was never delivered; emails still
+            # waiting in the outbox are replaced rather than sent twice
+            OutboundEmail.objects.filter(invitation__in=updated, status="pending").delete()
+            queue_invitation_emails(created + updated)
+
+        for row_status, invitations in (("created", to_create), ("updated", to_update)):
+            for index, invitation in invitations.values():
+                results[index] = {
+                    "index": index,
+                    "status": row_status,
+                    "invitation_id": str(invitation.id),
+                    "email": invitation.email,
+                }
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 class AcceptInvitationView(generics.GenericAPIView):
     """
     Accept an invitation to join an organization.
@@ -148,11 +303,9 @@ class AcceptInvitationView(generics.GenericAPIView):
         serializer = self.get_serializer(data=request.data)
 
         if serializer.is_valid():
-            user = serializer.save()
+            user = serializer.save(organization_id=invitation.organization_id)
 
-            UserRole.objects.create(
-                user=user, organization=invitation.organization, role=invitation.role
-            )
+            UserRole.objects.create(user=user, role_id=invitation.role_id)
 
             invitation.accepted = True
             invitation.save()
@@ -0,0 +1,374 @@
+"""
+Load-test the main flows against the app under gunicorn, with local
+stand-ins for S3 and signatureAPI from benchmarks/stubs.py.
+
+Each flow runs on its own for --duration seconds with --concurrency
+clients, and is reported as requests per second and p50/p95/p99 latency:
+
+    python benchmarks/loadtest.py --concurrency 16 --duration 30
+    python benchmarks/loadtest.py --save-baseline
+    python benchmarks/loadtest.py --signatureapi-latency 0.3 --signatureapi-error-rate 0.05
+
+The database comes from the usual settings (DATABASE_URL). The tenant is
+created with generate_synthetic_data on first use and reused afterwards.
+The run fails when a flow's p95 latency grows or its throughput drops by
+more than --tolerance against the stored baseline. Latencies depend on
+the machine, so baselines are not committed: store one with
+--save-baseline on the machine that runs the comparison, or pass
+--no-baseline to only report.
+"""
+import argparse
+import base64
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import requests
+
+import stubs
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "benchmarks", "baselines", "loadtest.json")
+PASSWORD = "synthetic-password"
+
+
+def login(client, tenant):
+    return client.post(f"{tenant.url}/api/auth/login/", json={"email": tenant.email, "password": PASSWORD})
+
+
+def list_contracts(client, tenant):
+    return client.get(f"{tenant.url}/api/contracts/")
+
+
+def create_contract(client, tenant):
+    key = f"loadtest/{uuid.uuid4()}.pdf"
+    return client.post(
+        f"{tenant.url}/api/contracts/",
+        json={"title": "Load test", "contract_type": "nda", "file_path": key},
+    )
+
+
+def presign_upload(client, tenant):
+    return client.get(f"{tenant.url}/api/contracts/presigned-post-url/", params={"file_type": "application/pdf"})
+
+
+def presign_download(client, tenant):
+    return client.get(f"{tenant.url}/api/contracts/presigned-download-url/", params={"file_path": tenant.file_path})
+
+
+def send_for_signing(client, tenant):
+    return client.post(
+        f"{tenant.url}/api/esignature/send-contract/",
+        json={
+            "contract_id": tenant.contract_id,
+            "document_format": "pdf",
+            "routing": "sequential",
+            "recipients": [{"key": "signer", "recipient_type": "signer", "name": "Sam Signer", "email": "sam@signer.test"}],
+            "places": [{"key": "signature", "place_type": "signature", "recipient_key": "signer"}],
+        },
+    )
+
+
+def invite_user(client, tenant):
+    return client.post(
+        f"{tenant.url}/api/auth/{tenant.organization_id}/invite/",
+        json={"email": f"loadtest-{uuid.uuid4().hex}@invitee.test", "role": tenant.role_id},
+    )
+
+
+# flow name: (function, expected status, authenticated)
+FLOWS = {
+    "login": (login, 200, False),
+    "list_contracts": (list_contracts, 200, True),
+    "create_contract": (create_contract, 201, True),
+    "presign_upload": (presign_upload, 200, True),
+    "presign_download": (presign_download, 200, True),
+    "send_for_signing": (send_for_signing, 202, True),
+    "invite_user": (invite_user, 201, True),
+}
+
+
+def session(token=None):
+    """
+    Return an HTTP client that looks like traffic from the load balancer,
+    which terminates TLS in production.
+    """
+    client = requests.Session()
+    client.headers["X-Forwarded-Proto"] = "https"
+    if token is not None:
+        client.headers["Authorization"] = f"Bearer {token}"
+    return client
+
+
+class Tenant:
+    """
+    The organization under test and the ids the flows need.
+    """
+
+    def __init__(self, url, seed):
+        self.url = url
+        self.email = f"admin@org0.seed{seed}.test"
+
+    def log_in(self):
+        response = login(session(), self)
+        if response.status_code != 200:
+            return False
+        self.token = response.json()["access"]
+        # the organization is only exposed in the token claims
+        payload = self.token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        self.organization_id = claims["organization_id"]
+        return True
+
+    def load(self):
+        client = session(self.token)
+        contracts = client.get(f"{self.url}/api/contracts/", params={"ordering": "created_at"}).json()
+        self.contract_id = contracts[0]["id"]
+        self.file_path = contracts[0]["file_path"]
+        roles = client.get(f"{self.url}/api/organizations/{self.organization_id}/roles/").json()["roles"]
+        self.role_id = next(role["id"] for role in roles if role["name"] != "admin")
+
+
+def run_flow(tenant, name, concurrency, duration, warm_up):
+    """
+    Run one flow from concurrency threads and return the latencies of the
+    measured requests in seconds and the number of failed ones.
+    """
+    flow, expected, authenticated = FLOWS[name]
+    latencies = []
+    errors = []
+    statuses = {}
+    lock = threading.Lock()
+    started = time.perf_counter()
+    measure_from = started + warm_up
+    deadline = measure_from + duration
+
+    def worker():
+        client = session(tenant.token if authenticated else None)
+        own_latencies, own_errors = [], 0
+        while True:
+            request_started = time.perf_counter()
+            if request_started >= deadline:
+                break
+            try:
+                status = flow(client, tenant).status_code
+            except requests.RequestException:
+                status = "error"
+            latency = time.perf_counter() - request_started
+            if request_started < measure_from:
+                continue
+            if status == expected:
+                own_latencies.append(latency)
+            else:
+                own_errors += 1
+                with lock:
+                    statuses[status] = statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), statuses
+
+
+def summarize(latencies, errors, duration):
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(p50 * 1000, 1),
+        "p95_ms": round(p95 * 1000, 1),
+        "p99_ms": round(p99 * 1000, 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return the regressions of results against the baseline, one line each.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {previous['rps']} -> {result['rps']} requests/s")
+    return regressions
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"gunicorn exited with status {process.returncode}")
+        try:
+            session().get(f"{url}/openapi.json", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    sys.exit(f"gunicorn did not answer within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flows", default=",".join(FLOWS), help="Comma-separated flows to run")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds measured per flow")
+    parser.add_argument("--warm-up", type=float, default=2, help="Seconds run per flow before measuring")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=2, help="gunicorn threads per worker")
+    parser.add_argument("--url", help="Test a running server instead of starting gunicorn and the stand-ins")
+    parser.add_argument("--seed", type=int, default=1000, help="Seed of the synthetic tenant")
+    parser.add_argument("--contracts", type=int, default=1000, help="Contracts in the synthetic tenant")
+    parser.add_argument("--s3-latency", type=float, default=0.0, help="Seconds added to S3 responses")
+    parser.add_argument("--s3-error-rate", type=float, default=0.0, help="Share of S3 requests that fail")
+    parser.add_argument("--signatureapi-latency", type=float, default=0.0, help="Seconds added to signatureAPI responses")
+    parser.add_argument("--signatureapi-error-rate", type=float, default=0.0, help="Share of signatureAPI requests that fail")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--no-baseline", action="store_true", help="Only report, without comparing to a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression, 0.2 is 20%%")
+    args = parser.parse_args()
+    if not (args.save_baseline or args.no_baseline or os.path.exists(args.baseline)):
+        parser.error(f"no baseline at {args.baseline}, store one with --save-baseline or pass --no-baseline")
+
+    names = [name.strip() for name in args.flows.split(",") if name.strip()]
+    unknown = set(names) - set(FLOWS)
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(sorted(unknown))}")
+
+    env = {
+        **os.environ,
+        "AWS_ACCESS_KEY_ID": "loadtest",
+        "AWS_SECRET_ACCESS_KEY": "loadtest",
+        "AWS_STORAGE_BUCKET_NAME": "loadtest",
+        "AWS_S3_REGION_NAME": "us-east-1",
+        "SIGNATUREAPI_API_KEY": "loadtest",
+    }
+    env.setdefault("AWS_PRESIGNED_EXPIRY", "3600")
+    env.setdefault("DEBUG", "False")
+    env.setdefault("ALLOWED_HOSTS", "127.0.0.1,localhost")
+
+    server = None
+    url = args.url
+    if url is None:
+        s3 = stubs.start(stubs.S3Handler, latency=args.s3_latency, error_rate=args.s3_error_rate)
+        signatureapi = stubs.start(
+            stubs.SignatureAPIHandler, latency=args.signatureapi_latency, error_rate=args.signatureapi_error_rate
+        )
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        env.update({
+            "PORT": str(port),
+            "GUNICORN_WORKERS": str(args.workers),
+            "GUNICORN_THREADS": str(args.threads),
+            "AWS_S3_ENDPOINT_URL": f"http://127.0.0.1:{s3.server_port}",
+            "SIGNATUREAPI_BASE_URL": f"http://127.0.0.1:{signatureapi.server_port}/v1/",
+        })
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "clm.wsgi:application", "--config", "gunicorn.conf.py"],
+            cwd=BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    try:
+        if server is not None:
+            wait_until_up(url, server)
+
+        tenant = Tenant(url, args.seed)
+        if not tenant.log_in():
+            print(f"Generating a tenant with {args.contracts} contracts (seed {args.seed})")
+            subprocess.run(
+                [
+                    sys.executable, "manage.py", "generate_synthetic_data", "--organizations", "1",
+                    "--contracts-per-org", str(args.contracts), "--seed", str(args.seed),
+                ],
+                cwd=BASE_DIR,
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            if not tenant.log_in():
+                sys.exit(f"Could not log in as {tenant.email}")
+        tenant.load()
+
+        results = {}
+        for name in names:
+            latencies, errors, statuses = run_flow(tenant, name, args.concurrency, args.duration, args.warm_up)
+            results[name] = summarize(latencies, errors, args.duration)
+            if statuses:
+                results[name]["error_statuses"] = {str(status): count for status, count in statuses.items()}
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    baseline = {}
+    if not args.no_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["flows"]
+
+    print(f"{len(names)} flows, {args.concurrency} clients, {args.duration:g}s each")
+    print(f"{'flow':<18}{'requests/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'p95 vs baseline':>17}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        change = f"{(result['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%" if previous and previous["p95_ms"] else "-"
+        print(
+            f"{name:<18}{result['rps']:>12.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['errors']:>8}{change:>17}"
+        )
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "workers": args.workers,
+                "threads": args.threads,
+                "flows": {**baseline, **results},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if args.no_baseline:
+        return
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"Not in the baseline, not compared: {', '.join(missing)}", file=sys.stderr)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
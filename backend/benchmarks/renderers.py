@@ -0,0 +1,83 @@
+"""
+Compare the JSON renderers and parsers on a contract list: DRF's
+JSONRenderer and JSONParser against the orjson ones in core.renderers,
+and MessagePack when msgpack is installed.
+
+The list is serialized once with ContractSerializer, as the list endpoint
+does, then rendered and parsed --runs times:
+
+    python benchmarks/renderers.py --contracts 10000
+"""
+import argparse
+import gc
+import io
+import statistics
+import sys
+import time
+
+from serializers import make_contracts, setup_django
+
+
+def timed(function, runs):
+    """
+    Return the result of function and its median duration in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        gc.collect()
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contracts", type=int, default=10000, help="Contracts in the list")
+    parser.add_argument("--counterparties", type=int, default=2, help="Counterparties per contract")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs, the median is reported")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from contracts.serializers import ContractSerializer
+    from core import renderers
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    if renderers.orjson is None:
+        sys.exit("orjson is not installed")
+
+    contracts = make_contracts(args.contracts, args.counterparties)
+    data, serialize_ms = timed(lambda: ContractSerializer(contracts, many=True).data, max(1, args.runs // 3))
+
+    formats = [
+        ("json", JSONRenderer(), JSONParser()),
+        ("orjson", renderers.ORJSONRenderer(), renderers.ORJSONParser()),
+    ]
+    if renderers.msgpack is not None:
+        formats.append(("msgpack", renderers.MessagePackRenderer(), renderers.MessagePackParser()))
+
+    print(f"{args.contracts} contracts with {args.counterparties} counterparties, median of {args.runs} runs")
+    print(f"ContractSerializer: {serialize_ms:.1f} ms")
+    print(f"{'format':<10}{'render ms':>11}{'parse ms':>10}{'size KiB':>10}{'render speed-up':>17}")
+
+    rendered = {}
+    baseline_ms = None
+    for name, renderer, parser_instance in formats:
+        body, render_ms = timed(lambda: renderer.render(data, renderer.media_type), args.runs)
+        _, parse_ms = timed(lambda: parser_instance.parse(io.BytesIO(body)), args.runs)
+        rendered[name] = body
+        baseline_ms = baseline_ms or render_ms
+        print(
+            f"{name:<10}{render_ms:>11.1f}{parse_ms:>10.1f}{len(body) / 1024:>10.0f}"
+            f"{baseline_ms / render_ms:>16.1f}x"
+        )
+
+    if rendered["orjson"] != rendered["json"]:
+        sys.exit("orjson output differs from JSONRenderer")
+    print("orjson output is identical to JSONRenderer")
+
+
+if __name__ == "__main__":
+    main()
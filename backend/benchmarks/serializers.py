@@ -0,0 +1,355 @@
+"""
+Micro-benchmark the DRF serializers on the hot paths: serializing lists as
+the list endpoints do, and validating request payloads. Reports the time
+and peak memory per object at realistic payload sizes.
+
+No database or network is used: instances are built in memory, with the
+counterparties prefetched as the contract list view does. Uniqueness
+validators, which are a query each and covered by the query budget tests
+in core/tests.py, are skipped, so the numbers are serializer CPU only:
+
+    python benchmarks/serializers.py
+    python benchmarks/serializers.py --save-baseline
+    python benchmarks/serializers.py --filter contract --runs 20
+
+The run fails when a benchmark gets slower or allocates more than
+--tolerance against the stored baseline. Timings depend on the machine,
+so baselines are not committed: store one with --save-baseline on the
+machine that runs the comparison, or pass --no-baseline to only report.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "benchmarks", "baselines", "serializers.json")
+
+NOW = datetime(2025, 1, 15, 9, 30, tzinfo=timezone.utc)
+
+
+def setup_django():
+    sys.path.insert(0, BASE_DIR)
+    # without a database any query fails loudly instead of being measured
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.setdefault("AWS_PRESIGNED_EXPIRY", "3600")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clm.settings")
+
+    import django
+
+    django.setup()
+
+
+def make_contracts(size, counterparties_per_contract=2):
+    from contracts.models import Contract
+    from counterparties.models import Counterparty
+
+    organization_id = uuid.uuid4()
+    contracts = []
+    for i in range(size):
+        contract = Contract(
+            id=uuid.uuid4(),
+            title=f"Master services agreement {i}",
+            description="Services, fees and liability terms agreed with the supplier.",
+            contract_type="msa",
+            organization_id=organization_id,
+            stage="negotiation",
+            effective_from=date(2025, 1, 1),
+            expires_on=date(2026, 1, 1) + timedelta(days=i % 365),
+            is_renewable=i % 3 == 0,
+            renewal_count=i % 2,
+            created_at=NOW,
+            created_by_id=1,
+            last_modified_at=NOW,
+            last_modified_by_id=1,
+            file_path=f"contracts/{organization_id}/{i}.pdf",
+        )
+        counterparties = [
+            Counterparty(
+                id=uuid.uuid4(),
+                party_name=f"Supplier {i}-{j}",
+                party_type="company",
+                contract_id=contract.id,
+                organization_id=organization_id,
+                email=f"legal{j}@supplier{i}.test",
+                isPrimary=j == 0,
+                added_at=NOW,
+                updated_at=NOW,
+            )
+            for j in range(counterparties_per_contract)
+        ]
+        # what prefetch_related("counterparties") leaves on each contract
+        prefetched = Counterparty.objects.all()
+        prefetched._result_cache = counterparties
+        prefetched._prefetch_done = True
+        contract._prefetched_objects_cache = {"counterparties": prefetched}
+        contracts.append(contract)
+    return contracts
+
+
+def make_users(size):
+    from users.models import User
+
+    return [
+        User(
+            id=i + 1,
+            email=f"member{i}@tenant.test",
+            first_name="Member",
+            last_name=str(i),
+            created_at=NOW,
+            updated_at=NOW,
+        )
+        for i in range(size)
+    ]
+
+
+def make_roles(size):
+    from organizations.models import Role
+
+    return [
+        Role(id=i + 1, name=f"role-{i}", permissions=["contracts.view", "contracts.create", "counterparties.view"])
+        for i in range(size)
+    ]
+
+
+def make_invitations(size, organization, role):
+    from authentication.models import Invitation
+
+    return [
+        Invitation(
+            id=uuid.uuid4(),
+            email=f"invitee{i}@tenant.test",
+            organization=organization,
+            role=role,
+            created_at=NOW,
+            expires_at=NOW + timedelta(days=7),
+        )
+        for i in range(size)
+    ]
+
+
+def envelope_payload(recipients, places_per_recipient):
+    place_types = [
+        {"place_type": "signature"},
+        {"place_type": "initials", "height": 40},
+        {"place_type": "text_input", "hint": "Job title", "requirement": "required"},
+        {"place_type": "recipient_completed_date"},
+    ]
+    return {
+        "contract_id": str(uuid.uuid4()),
+        "document_format": "pdf",
+        "routing": "sequential",
+        "recipients": [
+            {"key": f"signer-{i}", "recipient_type": "signer", "name": f"Signer {i}", "email": f"signer{i}@party.test"}
+            for i in range(recipients)
+        ],
+        "places": [
+            {"key": f"place-{i}-{j}", "recipient_key": f"signer-{i}", **place_types[j % len(place_types)]}
+            for i in range(recipients)
+            for j in range(places_per_recipient)
+        ],
+    }
+
+
+def benchmarks():
+    """
+    Return (name, objects, function) for every benchmark. The function does
+    the work for all objects once.
+    """
+    from authentication.serializers import InvitationSerializer
+    from contracts.serializers import ContractSerializer
+    from esignature.serializers import EnvelopeDataSerializer, PlaceSerializer
+    from organizations.models import Organization, Role
+    from organizations.serializers import RoleSerializer
+    from users.serializers import UserSerializer
+
+    organization = Organization(id=uuid.uuid4(), name="Tenant", created_at=NOW, updated_at=NOW)
+    role = Role(id=1, name="member", organization=organization, permissions=["contracts.view"])
+
+    contracts = make_contracts(1000)
+    users = make_users(200)
+    roles = make_roles(20)
+    invitations = make_invitations(100, organization, role)
+
+    contract_payloads = [
+        {
+            "title": f"Non-disclosure agreement {i}",
+            "description": "Mutual NDA ahead of the supplier evaluation.",
+            "contract_type": "nda",
+            "stage": "draft",
+            "effective_from": "2025-02-01",
+            "expires_on": "2027-02-01",
+            "is_renewable": True,
+            "file_path": f"uploads/{i}.pdf",
+        }
+        for i in range(200)
+    ]
+    user_payloads = [
+        {"email": f"new{i}@tenant.test", "password": "s3cret-pass", "first_name": "New", "last_name": str(i)}
+        for i in range(200)
+    ]
+    invitation_payloads = [
+        {"email": f"invitee{i}@tenant.test", "organization": str(organization.id), "role": role.id}
+        for i in range(200)
+    ]
+    role_payloads = [
+        {"name": f"role-{i}", "permissions": ["contracts.view", "contracts.change", "READ"]} for i in range(200)
+    ]
+    envelope = envelope_payload(recipients=10, places_per_recipient=4)
+
+    def validate(serializer_class, payloads):
+        def run():
+            for payload in payloads:
+                serializer_class(data=payload).is_valid(raise_exception=True)
+
+        return run
+
+    def validate_invitations():
+        # validate() looks up existing invitations and members, time the
+        # field validation the view runs before it
+        for payload in invitation_payloads:
+            InvitationSerializer(data=payload).to_internal_value(payload)
+
+    def validate_envelope():
+        EnvelopeDataSerializer(data=envelope).is_valid(raise_exception=True)
+
+    def validate_places():
+        PlaceSerializer(data=envelope["places"], many=True).is_valid(raise_exception=True)
+
+    return [
+        ("ContractSerializer list", len(contracts), lambda: ContractSerializer(contracts, many=True).data),
+        ("ContractSerializer validate", len(contract_payloads), validate(ContractSerializer, contract_payloads)),
+        ("UserSerializer list", len(users), lambda: UserSerializer(users, many=True).data),
+        ("UserSerializer validate", len(user_payloads), validate(UserSerializer, user_payloads)),
+        ("InvitationSerializer list", len(invitations), lambda: InvitationSerializer(invitations, many=True).data),
+        ("InvitationSerializer validate", len(invitation_payloads), validate_invitations),
+        ("RoleSerializer list", len(roles), lambda: RoleSerializer(roles, many=True).data),
+        ("RoleSerializer validate", len(role_payloads), validate(RoleSerializer, role_payloads)),
+        ("EnvelopeDataSerializer validate", 1, validate_envelope),
+        ("PlaceSerializer validate", len(envelope["places"]), validate_places),
+    ], (organization, role)
+
+
+def measure(function, objects, runs):
+    """
+    Return the median time per object in nanoseconds over runs, and the
+    peak memory per object in bytes of one traced run.
+    """
+    function()  # warm up caches such as the serializer field declarations
+    timings = []
+    for _ in range(runs):
+        gc.collect()
+        started = time.perf_counter_ns()
+        function()
+        timings.append((time.perf_counter_ns() - started) / objects)
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / objects
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return the regressions of results against the baseline, one line each.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["ns_per_object"] > previous["ns_per_object"] * (1 + tolerance):
+            regressions.append(f"{name}: {previous['ns_per_object']:.0f} -> {result['ns_per_object']:.0f} ns/object")
+        if result["bytes_per_object"] > previous["bytes_per_object"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {previous['bytes_per_object']:.0f} -> {result['bytes_per_object']:.0f} peak bytes/object"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="Timed runs per benchmark, the median is reported")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--no-baseline", action="store_true", help="Only report, without comparing to a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression, 0.25 is 25%%")
+    args = parser.parse_args()
+    if not (args.save_baseline or args.no_baseline or os.path.exists(args.baseline)):
+        parser.error(f"no baseline at {args.baseline}, store one with --save-baseline or pass --no-baseline")
+
+    setup_django()
+
+    from core.loaders import Loader, _current_loader
+    from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+    cases, (organization, role) = benchmarks()
+    cases = [case for case in cases if args.filter.lower() in case[0].lower()]
+
+    # related fields resolve through the request loader, seed it as if
+    # the objects had been fetched earlier in the request
+    loader = Loader()
+    loader.add(organization, role)
+    token = _current_loader.set(loader)
+
+    results = {}
+    with ExitStack() as stack:
+        for validator in (UniqueValidator, UniqueTogetherValidator):
+            stack.enter_context(mock.patch.object(validator, "__call__", lambda *args: None))
+        for name, objects, function in cases:
+            ns_per_object, bytes_per_object = measure(function, objects, args.runs)
+            results[name] = {
+                "objects": objects,
+                "ns_per_object": round(ns_per_object),
+                "bytes_per_object": round(bytes_per_object),
+            }
+    _current_loader.reset(token)
+
+    baseline = {}
+    if not args.no_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["benchmarks"]
+
+    print(f"{'benchmark':<34}{'objects':>8}{'ns/object':>12}{'peak B/object':>15}{'vs baseline':>13}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        change = f"{(result['ns_per_object'] / previous['ns_per_object'] - 1) * 100:+.0f}%" if previous else "-"
+        print(
+            f"{name:<34}{result['objects']:>8}{result['ns_per_object']:>12,}"
+            f"{result['bytes_per_object']:>15,}{change:>13}"
+        )
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"python": sys.version.split()[0], "benchmarks": {**baseline, **results}}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if args.no_baseline:
+        return
+    missing = sorted(set(results) - set(baseline))
+    if missing:
+        print(f"Not in the baseline, not compared: {', '.join(missing)}", file=sys.stderr)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
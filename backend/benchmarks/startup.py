@@ -0,0 +1,101 @@
+"""
+Measure cold-start time: how long importing Django and the project takes,
+and how long the first request takes compared to a warm one.
+
+Each run is a fresh interpreter, so nothing is cached between runs:
+
+    python benchmarks/startup.py --runs 10 --path /openapi.json
+
+With --warm-up the app is warmed as the preloading gunicorn master does
+before measuring the first request.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(path, warm_up):
+    """
+    Run in the child interpreter: time each startup phase in milliseconds.
+    """
+    started = time.perf_counter()
+    timings = {}
+
+    def mark(phase):
+        timings[phase] = (time.perf_counter() - started) * 1000
+
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clm.settings")
+
+    import django
+
+    mark("import django")
+    django.setup()
+    mark("django.setup")
+
+    from django.core.wsgi import get_wsgi_application
+
+    get_wsgi_application()
+    mark("wsgi application")
+
+    if warm_up:
+        from core.startup import warm_up as run_warm_up
+
+        run_warm_up()
+        mark("warm up")
+
+    from django.test import Client
+
+    client = Client()
+    request_started = time.perf_counter()
+    status = client.get(path, HTTP_HOST="localhost").status_code
+    timings["first request"] = (time.perf_counter() - request_started) * 1000
+    mark("ready")
+
+    request_started = time.perf_counter()
+    client.get(path, HTTP_HOST="localhost")
+    timings["second request"] = (time.perf_counter() - request_started) * 1000
+
+    timings["status"] = status
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--path", default="/openapi.json", help="Path of the first request")
+    parser.add_argument("--warm-up", action="store_true", help="Warm up before the first request")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.path, args.warm_up)))
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--path", args.path]
+    if args.warm_up:
+        command.append("--warm-up")
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=BASE_DIR)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    statuses = {run.pop("status") for run in runs}
+    print(f"{args.runs} runs of GET {args.path} (status {', '.join(map(str, sorted(statuses)))})")
+    print(f"{'phase':<18}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for phase in runs[0]:
+        values = [run[phase] for run in runs]
+        print(
+            f"{phase:<18}{statistics.median(values):>12.1f}{min(values):>10.1f}{max(values):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
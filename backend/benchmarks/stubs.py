@@ -0,0 +1,123 @@
+"""
+Local stand-ins for S3 and signatureAPI, so load tests measure the app and
+not the network. Each answers like the real service with a configurable
+latency and injects errors at a configurable rate.
+
+Run both on their own to point a local server at them:
+
+    python benchmarks/stubs.py --s3-port 9000 --signatureapi-port 9001 --latency 0.2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and server.random.random() < server.error_rate:
+            self.send_error_response()
+        else:
+            self.send_success_response()
+
+    do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = handle_request
+
+    def reply(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class S3Handler(StubHandler):
+    """
+    Path-style S3: every object exists, writes and deletes succeed.
+    """
+
+    def send_success_response(self):
+        if self.command == "DELETE":
+            self.reply(204)
+        elif self.command == "POST" and "delete" in self.path:
+            self.reply(200, b"<DeleteResult></DeleteResult>", "application/xml")
+        else:
+            self.reply(200, content_type="application/octet-stream")
+
+    def send_error_response(self):
+        self.reply(
+            503,
+            b"<Error><Code>SlowDown</Code><Message>Injected failure</Message></Error>",
+            "application/xml",
+        )
+
+
+class SignatureAPIHandler(StubHandler):
+    """
+    Envelopes and senders, every sender is verified.
+    """
+
+    def send_success_response(self):
+        resource = self.path.strip("/").split("/")
+        if self.command == "POST" and resource[-1] == "envelopes":
+            self.reply(201, json.dumps({"id": str(uuid.uuid4()), "status": "processing"}).encode())
+        elif self.command == "POST" and resource[-1] == "senders":
+            self.reply(201, json.dumps({"id": str(uuid.uuid4()), "status": "pending_verification"}).encode())
+        elif self.command == "GET" and "senders" in resource:
+            self.reply(200, json.dumps({"id": resource[-1], "status": "verified"}).encode())
+        else:
+            self.reply(404, json.dumps({"title": "Not found"}).encode())
+
+    def send_error_response(self):
+        self.reply(500, json.dumps({"title": "Injected failure"}).encode())
+
+
+def start(handler, port=0, latency=0.0, error_rate=0.0, seed=0):
+    """
+    Serve handler on localhost from a background thread and return the
+    server; port 0 picks a free port, read it from server.server_port.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.random = random.Random(seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--s3-port", type=int, default=9000)
+    parser.add_argument("--signatureapi-port", type=int, default=9001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail, 0 to 1")
+    args = parser.parse_args()
+
+    s3 = start(S3Handler, args.s3_port, args.latency, args.error_rate)
+    signatureapi = start(SignatureAPIHandler, args.signatureapi_port, args.latency, args.error_rate)
+    print(f"AWS_S3_ENDPOINT_URL=http://127.0.0.1:{s3.server_port}")
+    print(f"SIGNATUREAPI_BASE_URL=http://127.0.0.1:{signatureapi.server_port}/v1/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measure the request overhead of TracingMiddleware against the target of
+less than 2% at the default sample rate.
+
+A contract list view is called directly and through the middleware,
+alternating between the two so both see the same machine state. Traced
+requests are measured three ways: sampled at --sample-rate as in
+production, and with a caller's traceparent that forces the trace to be
+recorded or dropped. Spans are exported to os.devnull by the batch
+processor, as they would be to a file:
+
+    python benchmarks/tracing.py
+    python benchmarks/tracing.py --contracts 500 --requests 200 --max-overhead 2
+
+The run fails when the overhead at --sample-rate exceeds --max-overhead
+percent.
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+
+from serializers import make_contracts, setup_django
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-{flags}"
+
+
+def timed(function, requests):
+    """
+    Return the duration of requests calls of function in milliseconds.
+    """
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(requests):
+        function()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contracts", type=int, default=100, help="Contracts in the list, one page by default")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per timed run")
+    parser.add_argument("--runs", type=int, default=15, help="Timed runs, the median is reported")
+    parser.add_argument("--sample-rate", type=float, default=0.01, help="Share of requests that are traced")
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="Allowed overhead at --sample-rate, in %%")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from contracts.serializers import ContractSerializer
+    from core import tracing
+    from core.renderers import ORJSONRenderer
+
+    settings.TRACING = {
+        **settings.TRACING,
+        "ENABLED": True,
+        "SAMPLE_RATE": args.sample_rate,
+        "EXPORTER": "file",
+        "FILE": os.devnull,
+    }
+    tracing.configure()
+    if tracing._tracer is None:
+        sys.exit("opentelemetry-sdk is not installed")
+
+    contracts = make_contracts(args.contracts)
+    renderer = ORJSONRenderer()
+
+    def view(request):
+        data = ContractSerializer(contracts, many=True).data
+        return HttpResponse(renderer.render(data, renderer.media_type), content_type=renderer.media_type)
+
+    middleware = tracing.TracingMiddleware(view)
+    factory = RequestFactory()
+    cases = [
+        (f"sampled at {args.sample_rate:g}", factory.get("/api/contracts/")),
+        ("always recorded", factory.get("/api/contracts/", HTTP_TRACEPARENT=TRACEPARENT.format(flags="01"))),
+        ("never recorded", factory.get("/api/contracts/", HTTP_TRACEPARENT=TRACEPARENT.format(flags="00"))),
+    ]
+
+    print(
+        f"{args.contracts} contracts, median of {args.runs} runs of {args.requests} requests"
+    )
+    print(f"{'traced request':<22}{'plain ms':>10}{'traced ms':>11}{'overhead':>10}")
+    overheads = {}
+    for name, request in cases:
+        plain, traced = [], []
+        # warm up, the first recorded span also starts the export thread
+        timed(lambda: middleware(request), args.requests)
+        for _ in range(args.runs):
+            plain.append(timed(lambda: view(request), args.requests))
+            traced.append(timed(lambda: middleware(request), args.requests))
+        plain_ms = statistics.median(plain) / args.requests
+        traced_ms = statistics.median(traced) / args.requests
+        overheads[name] = (traced_ms - plain_ms) / plain_ms * 100
+        print(f"{name:<22}{plain_ms:>10.3f}{traced_ms:>11.3f}{overheads[name]:>9.2f}%")
+
+    overhead = overheads[cases[0][0]]
+    if overhead > args.max_overhead:
+        sys.exit(f"Tracing overhead of {overhead:.2f}% is above {args.max_overhead:g}%")
+    print(f"Tracing overhead is within {args.max_overhead:g}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,12 @@
+from core.views import metrics, openapi_schema, redoc
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="CLM Management API",
-        default_version="v1",
-        description="This is the API for the Contract Lifecycle Management System",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="your-email@example.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/users/", include("users.urls")),
@@ -30,5 +15,7 @@ urlpatterns = [
     path('api/contracts/', include('contracts.urls')),
     path('api/counterparties/', include('counterparties.urls')),
     path('api/esignature/', include('esignature.urls')),
-    path('', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('metrics', metrics, name='metrics'),
+    path('openapi.json', openapi_schema, name='schema-json'),
+    path('', redoc, name='schema-redoc'),
 ]
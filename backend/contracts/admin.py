@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from contracts.models import Contract
+from contracts.models import Contract, PendingObjectDeletion
 
 admin.site.register(Contract)
+admin.site.register(PendingObjectDeletion)
@@ -0,0 +1,83 @@
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from contracts.models import PendingObjectDeletion
+from contracts.services.s3 import S3
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Delete the S3 objects queued for deletion, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Give up on an object after this many failed attempts',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll the queue instead of draining it once',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30,
+            help='Seconds to wait between polls when the queue is empty (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        s3_client = S3()
+        total_deleted = total_failed = 0
+        last_id = 0
+
+        while True:
+            pending = list(
+                PendingObjectDeletion.objects.filter(
+                    id__gt=last_id, attempts__lt=options['max_attempts']
+                ).order_by('id')[:BATCH_SIZE]
+            )
+            if pending:
+                last_id = pending[-1].id
+                keys = [item.key for item in pending]
+                # no transaction is held while waiting on S3; workers running
+                # at the same time may delete the same objects, which S3 allows
+                try:
+                    errors = s3_client.delete_objects(keys)
+                except (BotoCoreError, ClientError) as e:
+                    errors = {key: str(e) for key in keys}
+
+                with transaction.atomic():
+                    PendingObjectDeletion.objects.filter(
+                        id__in=[item.id for item in pending if item.key not in errors]
+                    ).delete()
+                    for item in pending:
+                        if item.key in errors:
+                            item.attempts = F('attempts') + 1
+                            item.last_error = errors[item.key]
+                    PendingObjectDeletion.objects.bulk_update(
+                        [item for item in pending if item.key in errors],
+                        ['attempts', 'last_error'],
+                    )
+
+                total_deleted += len(pending) - len(errors)
+                total_failed += len(errors)
+                self.stdout.write(f"Deleted {len(pending) - len(errors)} objects, {len(errors)} failed")
+                continue
+
+            if not options['loop']:
+                break
+            last_id = 0
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'S3 purge finished: {total_deleted} deleted, {total_failed} failed')
+        )
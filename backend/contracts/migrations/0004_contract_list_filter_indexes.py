@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0003_alter_contract_stage'),
+        ('organizations', '0003_alter_role_unique_together_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'created_at'], name='contracts_organiz_19fb1d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'stage'], name='contracts_organiz_8038ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'contract_type'], name='contracts_organiz_3e9d14_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'expires_on'], name='contracts_organiz_196f5f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'effective_from'], name='contracts_organiz_6ab3c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'is_renewable'], name='contracts_organiz_6379b0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['organization', 'created_by'], name='contracts_organiz_0f4a48_idx'),
+        ),
+    ]
@@ -51,6 +51,52 @@ class Contract(models.Model):
 
     class Meta:
         db_table = "contracts"
+        # every list query is scoped to one organization, so each index
+        # leads with organization to avoid a tenant-wide scan
+        indexes = [
+            models.Index(fields=["organization", "created_at"]),
+            models.Index(fields=["organization", "stage"]),
+            models.Index(fields=["organization", "contract_type"]),
+            models.Index(fields=["organization", "expires_on"]),
+            models.Index(fields=["organization", "effective_from"]),
+            models.Index(fields=["organization", "is_renewable"]),
+            models.Index(fields=["organization", "created_by"]),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.organization}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_organization_id = instance.__dict__.get("organization_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        # counterparties store a copy of the organization, move them along
+        # if the contract changed organization
+        loaded_organization_id = getattr(self, "_loaded_organization_id", None)
+        if loaded_organization_id and loaded_organization_id != self.organization_id:
+            self.counterparties.update(organization_id=self.organization_id)
+        self._loaded_organization_id = self.organization_id
+
+
+class PendingObjectDeletion(models.Model):
+    """
+    An S3 object queued for deletion. Bulk deletes of contracts queue their
+    files here; `python manage.py purge_s3_objects` removes them from the
+    bucket in batches.
+    """
+
+    key = models.CharField(max_length=1024, unique=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "s3_object_deletions"
+
+    def __str__(self):
+        return self.key
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from counterparties.serializers import CounterpartySerializer
 from contracts.models import Contract
@@ -20,3 +21,96 @@ class ContractSerializer(serializers.ModelSerializer):
             fields['file_path'].read_only = True
         
         return fields
+
+
+class ContractFilterSerializer(serializers.Serializer):
+    """
+    Validates the query parameters accepted by the contract list endpoint.
+    """
+
+    ORDERING_FIELDS = [
+        "created_at",
+        "last_modified_at",
+        "expires_on",
+        "effective_from",
+        "title",
+        "stage",
+    ]
+
+    stage = serializers.MultipleChoiceField(
+        choices=list(Contract.STAGE_CHOICES.items()), required=False
+    )
+    contract_type = serializers.CharField(max_length=255, required=False)
+    expires_on_after = serializers.DateField(required=False)
+    expires_on_before = serializers.DateField(required=False)
+    effective_from_after = serializers.DateField(required=False)
+    effective_from_before = serializers.DateField(required=False)
+    is_renewable = serializers.BooleanField(required=False, allow_null=True, default=None)
+    created_by = serializers.IntegerField(min_value=1, required=False)
+    ordering = serializers.ChoiceField(
+        choices=ORDERING_FIELDS + [f"-{field}" for field in ORDERING_FIELDS],
+        default="-created_at",
+    )
+
+    # query parameters DRF handles itself
+    RESERVED_PARAMS = {api_settings.URL_FORMAT_OVERRIDE}
+
+    def to_internal_value(self, data):
+        # a misspelled filter would otherwise silently list every contract
+        unknown = set(data) - set(self.fields) - self.RESERVED_PARAMS
+        if unknown:
+            raise serializers.ValidationError(
+                {name: ["Unknown filter."] for name in sorted(unknown)}
+            )
+
+        # stage can be repeated (?stage=draft&stage=review) or comma separated
+        if hasattr(data, "getlist"):
+            stages = [
+                stage
+                for value in data.getlist("stage")
+                for stage in value.split(",")
+                if stage
+            ]
+            data = data.dict()
+            if stages:
+                data["stage"] = stages
+            else:
+                data.pop("stage", None)
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        for field in ["expires_on", "effective_from"]:
+            after = attrs.get(f"{field}_after")
+            before = attrs.get(f"{field}_before")
+            if after and before and after > before:
+                raise serializers.ValidationError(
+                    {f"{field}_after": f"Must not be later than {field}_before"}
+                )
+        return attrs
+
+    def filter_queryset(self, queryset):
+        """
+        Apply the validated filters and ordering to a contract queryset.
+        """
+        data = self.validated_data
+        filters = {}
+
+        if data.get("stage"):
+            filters["stage__in"] = sorted(data["stage"])
+        if data.get("contract_type"):
+            filters["contract_type"] = data["contract_type"]
+        if data.get("expires_on_after"):
+            filters["expires_on__gte"] = data["expires_on_after"]
+        if data.get("expires_on_before"):
+            filters["expires_on__lte"] = data["expires_on_before"]
+        if data.get("effective_from_after"):
+            filters["effective_from__gte"] = data["effective_from_after"]
+        if data.get("effective_from_before"):
+            filters["effective_from__lte"] = data["effective_from_before"]
+        if data.get("is_renewable") is not None:
+            filters["is_renewable"] = data["is_renewable"]
+        if data.get("created_by"):
+            filters["created_by_id"] = data["created_by"]
+
+        # id breaks ties so pages stay stable when the ordering field repeats
+        return queryset.filter(**filters).order_by(data["ordering"], "id")
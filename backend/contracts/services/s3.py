@@ -1,17 +1,25 @@
 import uuid
 from datetime import datetime, timezone
-import boto3
 from botocore.exceptions import ClientError
-from botocore.config import Config
 from django.conf import settings
 
+from core import tracing
+from core.metrics import outbound_call
+
 class S3:
     def __init__(self):
-        self.client = boto3.client(service_name='s3',
-                                   aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                                   aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                                   region_name=settings.AWS_S3_REGION_NAME,
-                                   config=Config(signature_version='s3v4'))
+        # boto3 takes a noticeable share of startup, so it is only imported
+        # when a client is first needed
+        import boto3
+        from botocore.config import Config
+
+        with tracing.span('s3 create_client'):
+            self.client = boto3.client(service_name='s3',
+                                       aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                                       aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                                       region_name=settings.AWS_S3_REGION_NAME,
+                                       endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                                       config=Config(signature_version='s3v4'))
         self.expiresIn = settings.AWS_PRESIGNED_EXPIRY
 
     def generate_presigned_post_url(self, file_type, key=None):
@@ -20,34 +28,38 @@ class S3:
             object_name = f'{uuid.uuid4()}_{current_time}'
             bucket_name = settings.AWS_STORAGE_BUCKET_NAME
 
-            response = self.client.generate_presigned_post(
-                bucket_name,
-                object_name if key is None else key,
-                Fields={"Content-Type": file_type},
-                Conditions=[{"Content-Type": file_type}],
-                ExpiresIn=self.expiresIn
-            )
+            # presigning is local, it is traced but not counted as a call
+            with tracing.span('s3 generate_presigned_post'):
+                response = self.client.generate_presigned_post(
+                    bucket_name,
+                    object_name if key is None else key,
+                    Fields={"Content-Type": file_type},
+                    Conditions=[{"Content-Type": file_type}],
+                    ExpiresIn=self.expiresIn
+                )
             return response
         except ClientError as e:
             return None
     
     def generate_presigned_url_expanded(self, client_method_name, key):
         try:
-            response = self.client.generate_presigned_url(
-                ClientMethod=client_method_name,
-                Params={
-                    'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                    'Key': key,
-                },
-                ExpiresIn=self.expiresIn
-            )
+            with tracing.span('s3 generate_presigned_url'):
+                response = self.client.generate_presigned_url(
+                    ClientMethod=client_method_name,
+                    Params={
+                        'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+                        'Key': key,
+                    },
+                    ExpiresIn=self.expiresIn
+                )
             return response
         except ClientError as e:
             return None
     
     def check_object_exists(self, key):
         try:
-            self.client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+            with outbound_call('s3', 'head_object'):
+                self.client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
             return True
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
@@ -56,8 +68,21 @@ class S3:
 
     def delete_object(self, key):
         try:
-            response = self.client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+            with outbound_call('s3', 'delete_object'):
+                response = self.client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
             print(response)
             return True
         except ClientError as e:
             return False
+
+    def delete_objects(self, keys):
+        """
+        Delete up to 1000 objects in one request. Returns the keys that could
+        not be deleted, mapped to the error message.
+        """
+        with outbound_call('s3', 'delete_objects'):
+            response = self.client.delete_objects(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+            )
+        return {error['Key']: error.get('Message', error.get('Code', '')) for error in response.get('Errors', [])}
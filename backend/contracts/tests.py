@@ -1,3 +1,92 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from contracts.models import Contract
+from organizations.models import Organization, Role, UserRole
+from users.models import User
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ContractListFilterTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        self.admin = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=self.organization
+        )
+        UserRole.objects.create(
+            user=self.admin, role=Role.objects.create(name="admin", organization=self.organization)
+        )
+        self.other_author = User.objects.create_user(
+            "bob@acme.test", "password", "Bob", "Author", organization=self.organization
+        )
+        for title, stage, contract_type, expires_on, is_renewable, author in [
+            ("Alpha", "negotiation", "nda", date(2026, 2, 1), True, self.admin),
+            ("Bravo", "negotiation", "msa", date(2026, 5, 1), False, self.admin),
+            ("Charlie", "review", "nda", date(2026, 3, 15), False, self.other_author),
+            ("Delta", "draft", "nda", None, True, self.admin),
+        ]:
+            Contract.objects.create(
+                title=title,
+                stage=stage,
+                contract_type=contract_type,
+                expires_on=expires_on,
+                is_renewable=is_renewable,
+                created_by=author,
+                organization=self.organization,
+                file_path=f"acme/{title}.pdf",
+            )
+        Contract.objects.create(
+            title="Elsewhere",
+            stage="negotiation",
+            contract_type="nda",
+            organization=Organization.objects.create(name="Other"),
+            file_path="other/elsewhere.pdf",
+        )
+        self.client.force_login(self.admin)
+
+    def titles(self, query):
+        response = self.client.get("/api/contracts/", query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [contract["title"] for contract in response.json()]
+
+    def errors(self, query):
+        response = self.client.get("/api/contracts/", query)
+        self.assertEqual(response.status_code, 400)
+        return response.json()
+
+    def test_filters_combine(self):
+        self.assertEqual(
+            self.titles({"stage": "negotiation", "expires_on_after": "2026-01-01", "expires_on_before": "2026-03-31"}),
+            ["Alpha"],
+        )
+        self.assertEqual(self.titles({"is_renewable": "true", "ordering": "title"}), ["Alpha", "Delta"])
+        self.assertEqual(self.titles({"contract_type": "msa"}), ["Bravo"])
+        self.assertEqual(self.titles({"created_by": self.other_author.id}), ["Charlie"])
+
+    def test_stage_can_be_repeated_or_comma_separated(self):
+        expected = ["Alpha", "Bravo", "Charlie"]
+        self.assertEqual(self.titles({"stage": ["negotiation", "review"], "ordering": "title"}), expected)
+        self.assertEqual(self.titles({"stage": "negotiation,review", "ordering": "title"}), expected)
+
+    def test_ordering_is_whitelisted(self):
+        self.assertEqual(self.titles({"ordering": "-title"}), ["Delta", "Charlie", "Bravo", "Alpha"])
+        self.assertEqual(self.titles({"ordering": "expires_on", "stage": "negotiation,review"}), ["Alpha", "Charlie", "Bravo"])
+        for ordering in ("file_path", "-organization__name", "created_by__password"):
+            self.assertIn("ordering", self.errors({"ordering": ordering}))
+
+    def test_invalid_values_are_rejected(self):
+        self.assertIn("stage", self.errors({"stage": "signed"}))
+        self.assertIn("expires_on_after", self.errors({"expires_on_after": "next quarter"}))
+        self.assertIn("created_by", self.errors({"created_by": "0"}))
+        self.assertIn(
+            "expires_on_after",
+            self.errors({"expires_on_after": "2026-06-01", "expires_on_before": "2026-01-01"}),
+        )
+
+    def test_unknown_filters_are_rejected(self):
+        self.assertEqual(
+            self.errors({"stages": "draft", "organization": "other"}),
+            {"organization": ["Unknown filter."], "stages": ["Unknown filter."]},
+        )
+        self.assertEqual(len(self.titles({"format": "json"})), 4)
@@ -1,7 +1,7 @@
 from contracts.models import Contract
-from contracts.serializers import ContractSerializer
+from contracts.serializers import ContractFilterSerializer, ContractSerializer
 from contracts.services.s3 import S3
-from core.permissions import IsOrganizationAdmin
+from core.permissions import HasPermission, IsOrganizationAdmin
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.exceptions import PermissionDenied
@@ -13,6 +13,10 @@ from rest_framework.views import APIView
 class ContractListCreateView(generics.ListCreateAPIView):
     """
     List contracts for user's organization or create a new one.
+
+    The list can be narrowed with query parameters: stage (repeatable),
+    contract_type, expires_on_after, expires_on_before, effective_from_after,
+    effective_from_before, is_renewable, created_by and ordering.
     """
 
     permission_classes = [IsAuthenticated, IsOrganizationAdmin]
@@ -21,10 +25,17 @@ class ContractListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         organization = user.organization
-        return Contract.objects.filter(organization=organization).prefetch_related(
+        queryset = Contract.objects.filter(organization=organization).prefetch_related(
             "counterparties"
         )
 
+        if self.request.method != "GET":
+            return queryset
+
+        filter_serializer = ContractFilterSerializer(data=self.request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        return filter_serializer.filter_queryset(queryset)
+
     def create(self, request, *args, **kwargs):
         """
         Create a new contract.
@@ -60,21 +71,27 @@ class ContractRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     Retrieve, update or delete a contract.
     """
 
-    permissions_classes = [IsAuthenticated, IsOrganizationAdmin]
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
     queryset = Contract.objects.all()
     serializer_class = ContractSerializer
 
+    def get_permissions(self):
+        permissions = super().get_permissions()
+        if self.request.method == "DELETE":
+            permissions.append(HasPermission("contracts.delete"))
+        return permissions
+
     def check_organization_and_get_contract(self, request):
         """
         Check if the requested contract belongs to user's organization
         and return it. If not, raise PermissionDenied.
         """
         user = request.user
-        organization = user.organization
 
         contract = self.get_object()
 
-        if contract.organization != organization:
+        # compare ids so neither organization has to be loaded
+        if contract.organization_id != user.organization_id:
             raise PermissionDenied(
                 {
                     "error": "The requested contract does not belong to user's organization"
@@ -144,7 +161,7 @@ class GeneratePresignedPostUrlView(APIView):
             contract = get_object_or_404(Contract, file_path=file_path)
 
             if (
-                contract.organization != user.organization
+                contract.organization_id != user.organization_id
             ):  # ensure the file belongs to organization
                 return Response(
                     {
@@ -184,7 +201,7 @@ class GeneratePresignedDownloadUrlView(APIView):
 
         contract = get_object_or_404(Contract, file_path=file_path)
 
-        if contract.organization != user.organization:
+        if contract.organization_id != user.organization_id:
             return Response(
                 {
                     "error": "The requested contract does not belong to user's organization"
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # before the middleware is loaded, so TracingMiddleware can tell
+        # whether it is needed
+        from core.renderers import check_msgpack
+        from core.tracing import configure
+
+        configure()
+        check_msgpack()
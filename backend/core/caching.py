@@ -0,0 +1,15 @@
+from django.conf import settings
+
+# cache backends that every process keeps to itself
+PER_PROCESS_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def is_shared_cache(alias="default"):
+    """
+    Whether all workers read and write the same cache. Entries invalidated
+    by one worker are only gone for the others when it is.
+    """
+    return settings.CACHES[alias]["BACKEND"] not in PER_PROCESS_CACHES
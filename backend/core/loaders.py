@@ -0,0 +1,100 @@
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+_current_loader = ContextVar("loader", default=None)
+
+
+class Loader:
+    """
+    Request-scoped identity map. Each object is fetched at most once per
+    request.
+    """
+
+    def __init__(self):
+        self.identity_map = defaultdict(dict)
+
+    def add(self, *instances):
+        """
+        Remember already loaded instances. Partially loaded instances are
+        skipped so later lookups never see missing fields.
+        """
+        for instance in instances:
+            if instance is not None and not instance.get_deferred_fields():
+                model = instance._meta.concrete_model
+                self.identity_map[model][instance.pk] = instance
+
+    def load(self, model, pk):
+        """
+        Return the instance with the given primary key, or None.
+        """
+        pk = model._meta.pk.to_python(pk)
+        return self.load_many(model, [pk]).get(pk)
+
+    def load_many(self, model, pks):
+        """
+        Return a dict of primary key to instance, fetching the ones not
+        loaded yet in a single query.
+        """
+        model = model._meta.concrete_model
+        cache = self.identity_map[model]
+        missing = {pk for pk in pks if pk not in cache}
+        if missing:
+            for instance in model._default_manager.filter(pk__in=missing):
+                cache[instance.pk] = instance
+        return {pk: cache[pk] for pk in pks if pk in cache}
+
+
+def get_loader():
+    """
+    Return the current request's loader, or a throwaway one outside of a
+    request.
+    """
+    loader = _current_loader.get()
+    return loader if loader is not None else Loader()
+
+
+class LoaderMiddleware:
+    """
+    Give every request its own loader, available as request.loader and
+    through get_loader().
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.loader = Loader()
+        token = _current_loader.set(request.loader)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_loader.reset(token)
+
+
+class LoadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves through the request's loader, so
+    an object already fetched during the request is not queried again.
+    A filtered queryset, e.g. roles of one organization, is queried as
+    usual so its scoping applies; the result is still remembered.
+    """
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        if queryset.query.has_filters():
+            instance = super().to_internal_value(data)
+            get_loader().add(instance)
+            return instance
+
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        try:
+            instance = get_loader().load(queryset.model, data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
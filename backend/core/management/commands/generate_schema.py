@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.schema import code_version, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema for the current code version, run at build time'
+
+    def handle(self, *args, **options):
+        version = code_version()
+        path, content = write_schema(version)
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {len(content)} bytes of schema for version {version} to {path}')
+        )
@@ -0,0 +1,363 @@
+import io
+import json
+import random
+import time
+import uuid
+from datetime import datetime, time as datetime_time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from authentication.models import Invitation
+from contracts.models import Contract
+from counterparties.models import ContractParty, Counterparty, Party
+from organizations.models import Organization, Role, UserRole
+from organizations.permissions import compile_permissions
+from users.models import User
+
+DEFAULT_STAGES = (
+    'draft=20,draft_completed=5,negotiation=10,review=8,approval=5,sign_pending=7,'
+    'execution=10,monitoring=25,renewal=4,termination=3,rejected=3'
+)
+DEFAULT_EXPIRY = 'none=15,expired=15,30d=5,90d=10,1y=30,later=25'
+
+# days from the reference date for each expiry bucket, None for no expiry
+EXPIRY_BUCKETS = {
+    'none': None,
+    'expired': (-730, -1),
+    '30d': (0, 30),
+    '90d': (31, 90),
+    '1y': (91, 365),
+    'later': (366, 1825),
+}
+CONTRACT_TYPES = ['nda', 'msa', 'sow', 'employment', 'lease', 'purchase', 'license']
+ADMIN_PERMISSIONS = {
+    'can_invite': True,
+    'can_manage_users': True,
+    'can_manage_roles': True,
+    'can_manage_permissions': True,
+    'can_manage_organization': True,
+    'is_organization_admin': True,
+}
+ROLE_PERMISSIONS = [['READ'], ['READ', 'WRITE'], ['READ', 'WRITE', 'DELETE'], ['FULL_ACCESS']]
+
+# COPY text format escapes
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+# parents before children, the order rows are written in
+TABLES = [
+    (Organization, ['id', 'name', 'created_at', 'updated_at']),
+    (Role, ['name', 'organization_id', 'permissions', 'permission_mask', 'created_at', 'updated_at']),
+    (User, [
+        'password', 'is_superuser', 'email', 'first_name', 'last_name',
+        'organization_id', 'created_at', 'updated_at', 'is_staff', 'is_active',
+    ]),
+    (UserRole, ['user_id', 'role_id', 'assigned_at', 'updated_at']),
+    (Invitation, [
+        'id', 'email', 'organization_id', 'invited_by_id', 'role_id', 'accepted',
+        'email_sent', 'created_at', 'expires_at',
+    ]),
+    (Contract, [
+        'id', 'title', 'contract_type', 'organization_id', 'stage', 'effective_from',
+        'expires_on', 'is_renewable', 'renewal_count', 'terminated_at', 'terminated_reason',
+        'created_at', 'created_by_id', 'last_modified_at', 'last_modified_by_id', 'file_path',
+    ]),
+    (Party, [
+        'id', 'organization_id', 'party_name', 'party_type', 'email', 'normalized_email',
+        'created_at', 'updated_at',
+    ]),
+    (Counterparty, [
+        'id', 'party_name', 'party_type', 'contract_id', 'organization_id', 'email',
+        'isPrimary', 'added_at', 'updated_at',
+    ]),
+    (ContractParty, ['id', 'contract_id', 'party_id', 'role', 'isPrimary', 'added_at', 'updated_at']),
+]
+
+
+def parse_weights(value, choices):
+    """
+    Parse "name=weight,..." into a list of names and a list of weights.
+    """
+    names, weights = [], []
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in choices:
+            raise CommandError(f"Unknown value {name!r}, expected one of {', '.join(choices)}")
+        try:
+            weights.append(float(weight))
+        except ValueError:
+            raise CommandError(f"Invalid weight for {name!r}: {weight!r}")
+        names.append(name)
+    if sum(weights) <= 0:
+        raise CommandError(f"Weights must not all be zero: {value!r}")
+    return names, weights
+
+
+def parse_range(value):
+    """
+    Parse "N" or "MIN-MAX" into a (min, max) tuple.
+    """
+    low, _, high = value.partition('-')
+    try:
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise CommandError(f"Invalid range {value!r}, expected N or MIN-MAX")
+    if low < 0 or high < low:
+        raise CommandError(f"Invalid range {value!r}")
+    return low, high
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value).translate(COPY_ESCAPES)
+    # uuids, numbers and dates never need escaping
+    return str(value)
+
+
+class Writer:
+    """
+    Buffer generated rows per table and write them with COPY, which loads
+    rows several times faster than INSERT. Tables are always flushed in
+    dependency order, so every batch only references rows already written.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.buffers = {model: [] for model, _ in TABLES}
+        self.buffered = 0
+        self.counts = {model: 0 for model, _ in TABLES}
+
+    def add(self, model, row):
+        self.buffers[model].append(row)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            for model, fields in TABLES:
+                rows = self.buffers[model]
+                if not rows:
+                    continue
+                self.copy(model, fields, rows)
+                self.counts[model] += len(rows)
+                rows.clear()
+        self.buffered = 0
+
+    def copy(self, model, fields, rows):
+        columns = ', '.join(
+            connection.ops.quote_name(model._meta.get_field(field).column) for field in fields
+        )
+        data = io.StringIO()
+        for row in rows:
+            data.write('\t'.join(map(copy_value, row)))
+            data.write('\n')
+        data.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN',
+                data,
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic tenants with members, roles, invitations, contracts and '
+        'counterparties for benchmarks. The same seed and reference date always produce '
+        'the same rows. Never run this against production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=10, help='Organizations to create')
+        parser.add_argument('--contracts-per-org', type=int, default=10000, help='Contracts per organization')
+        parser.add_argument(
+            '--counterparties-per-contract',
+            default='1-3',
+            help='Counterparties per contract, N or MIN-MAX',
+        )
+        parser.add_argument(
+            '--parties-per-org',
+            type=int,
+            default=2000,
+            help='Directory parties per organization, shared by its contracts',
+        )
+        parser.add_argument('--members-per-org', type=int, default=50, help='Users per organization, admin included')
+        parser.add_argument('--roles-per-org', type=int, default=5, help='Roles per organization besides admin')
+        parser.add_argument('--invitations-per-org', type=int, default=20, help='Invitations per organization')
+        parser.add_argument(
+            '--stages',
+            default=DEFAULT_STAGES,
+            help='Stage distribution as stage=weight pairs separated by commas',
+        )
+        parser.add_argument(
+            '--expiry',
+            default=DEFAULT_EXPIRY,
+            help=f"Expiry distribution as bucket=weight pairs, buckets: {', '.join(EXPIRY_BUCKETS)}",
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Random seed')
+        parser.add_argument(
+            '--reference-date',
+            type=datetime.fromisoformat,
+            help='Date expiries and creation dates are relative to (default: today)',
+        )
+        parser.add_argument(
+            '--password',
+            default='synthetic-password',
+            help='Password of every generated user',
+        )
+        parser.add_argument('--batch-size', type=int, default=50000, help='Rows buffered per write')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Synthetic data is loaded with COPY, which needs PostgreSQL')
+
+        self.options = options
+        self.stages = parse_weights(options['stages'], Contract.STAGE_CHOICES)
+        self.expiry = parse_weights(options['expiry'], EXPIRY_BUCKETS)
+        self.counterparties = parse_range(options['counterparties_per_contract'])
+        if self.counterparties[1] > options['parties_per_org']:
+            raise CommandError('--parties-per-org must be at least the number of counterparties per contract')
+        if options['members_per_org'] < 1:
+            raise CommandError('--members-per-org must be at least 1, for the admin')
+
+        reference_date = options['reference_date'] or timezone.localdate()
+        self.now = timezone.make_aware(datetime.combine(reference_date, datetime_time(12)))
+        # hashing is slow on purpose, every user shares one hash
+        self.password = make_password(options['password'])
+
+        first_name = self.organization_name(0)
+        if Organization.objects.filter(name=first_name).exists():
+            raise CommandError(f"{first_name!r} already exists, use another --seed")
+
+        writer = Writer(options['batch_size'])
+        started = time.monotonic()
+        for index in range(options['organizations']):
+            self.generate_organization(writer, index)
+            self.stdout.write(f"Generated {self.organization_name(index)}")
+        writer.flush()
+        elapsed = time.monotonic() - started
+
+        # fresh statistics, so benchmarks see the plans production would
+        with connection.cursor() as cursor:
+            for model, _ in TABLES:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+        total = sum(writer.counts.values())
+        for model, count in writer.counts.items():
+            self.stdout.write(f"  {model._meta.db_table}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
+
+    def organization_name(self, index):
+        return f"Synthetic {self.options['seed']}-{index:05d}"
+
+    def generate_organization(self, writer, index):
+        """
+        Generate one organization from its own random stream, so its rows do
+        not depend on the size of the organizations before it.
+        """
+        options = self.options
+        rng = random.Random(f"{options['seed']}:{index}")
+        now = self.now
+        domain = f"org{index}.seed{options['seed']}.test"
+
+        def new_id():
+            return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+        def past(days):
+            return now - timedelta(seconds=rng.randrange(days * 86400))
+
+        organization_id = new_id()
+        organization_created = past(5 * 365)
+        writer.add(Organization, (organization_id, self.organization_name(index), organization_created, now))
+
+        # roles and users have serial ids, read them back once written
+        roles = [('admin', ADMIN_PERMISSIONS)] + [
+            (f"role-{i}", ROLE_PERMISSIONS[i % len(ROLE_PERMISSIONS)]) for i in range(options['roles_per_org'])
+        ]
+        for name, permissions in roles:
+            writer.add(Role, (
+                name, organization_id, permissions, compile_permissions(permissions, name),
+                organization_created, organization_created,
+            ))
+        writer.flush()
+        role_ids = dict(Role.objects.filter(organization_id=organization_id).values_list('name', 'id'))
+        admin_role_id = role_ids.pop('admin')
+        member_role_ids = sorted(role_ids.values()) or [admin_role_id]
+
+        users = []
+        for i in range(options['members_per_org']):
+            email = f"admin@{domain}" if i == 0 else f"user{i}@{domain}"
+            created = organization_created + timedelta(seconds=i)
+            writer.add(User, (
+                self.password, False, email, 'Synthetic', f"User {i}",
+                organization_id, created, created, False, True,
+            ))
+            users.append(email)
+        writer.flush()
+        user_ids = dict(User.objects.filter(organization_id=organization_id).values_list('email', 'id'))
+        user_ids = [user_ids[email] for email in users]
+        admin_id = user_ids[0]
+        for i, user_id in enumerate(user_ids):
+            role_id = admin_role_id if i == 0 else rng.choice(member_role_ids)
+            writer.add(UserRole, (user_id, role_id, now, now))
+
+        for i in range(options['invitations_per_org']):
+            created = past(30)
+            writer.add(Invitation, (
+                new_id(), f"invitee{i}@{domain}", organization_id, admin_id,
+                rng.choice(member_role_ids), rng.random() < 0.2, True, created, created + timedelta(days=7),
+            ))
+
+        parties = []
+        for i in range(options['parties_per_org']):
+            party_id = new_id()
+            party_type = 'company' if rng.random() < 0.7 else 'person'
+            name = f"Company {i}" if party_type == 'company' else f"Person {i}"
+            email = f"party{i}@{domain}"
+            writer.add(Party, (party_id, organization_id, name, party_type, email, email, now, now))
+            parties.append((party_id, name, party_type, email))
+
+        stages, stage_weights = self.stages
+        buckets, bucket_weights = self.expiry
+        low, high = self.counterparties
+        today = now.date()
+        for i in range(options['contracts_per_org']):
+            contract_id = new_id()
+            created = past(3 * 365)
+            stage = rng.choices(stages, stage_weights)[0]
+            days = EXPIRY_BUCKETS[rng.choices(buckets, bucket_weights)[0]]
+            expires_on = today + timedelta(days=rng.randint(*days)) if days else None
+            effective_from = created.date() if expires_on is None else min(
+                created.date(), expires_on - timedelta(days=rng.randint(30, 1095))
+            )
+            terminated_at = today - timedelta(days=rng.randint(0, 365)) if stage == 'termination' else None
+            author_id = rng.choice(user_ids)
+            writer.add(Contract, (
+                contract_id, f"Contract {i}", rng.choice(CONTRACT_TYPES), organization_id, stage,
+                effective_from, expires_on, rng.random() < 0.3, rng.randint(0, 3) if stage == 'renewal' else 0,
+                terminated_at, 'Synthetic termination' if terminated_at else None,
+                created, author_id, created, author_id,
+                f"synthetic/{organization_id}/{contract_id}.pdf",
+            ))
+
+            for position, party in enumerate(rng.sample(parties, rng.randint(low, high))):
+                party_id, name, party_type, email = party
+                is_primary = position == 0
+                writer.add(Counterparty, (
+                    new_id(), name, party_type, contract_id, organization_id, email, is_primary, created, created,
+                ))
+                role = 'signatory' if is_primary else rng.choice(list(ContractParty.ROLE_CHOICES))
+                writer.add(ContractParty, (new_id(), contract_id, party_id, role, is_primary, created, created))
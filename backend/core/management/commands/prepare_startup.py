@@ -0,0 +1,52 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.utils import OperationalError
+
+from core.startup import unapplied_migrations, wait_for_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Wait for the database and run migrations only when some are unapplied, '
+        'so containers with a current schema skip loading every migration'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait for the database to accept connections',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with an error instead of migrating when migrations are unapplied',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            wait_for_database(options['timeout'])
+        except OperationalError as e:
+            raise CommandError(f'Database unavailable after {options["timeout"]:.0f}s: {e}')
+        self.stdout.write(f'Database is up after {time.monotonic() - started:.2f}s')
+
+        pending = unapplied_migrations()
+        if not pending:
+            self.stdout.write(self.style.SUCCESS(
+                f'Schema is current, skipping migrations ({time.monotonic() - started:.2f}s)'
+            ))
+            return
+
+        names = ', '.join(f'{app}.{name}' for app, name in sorted(pending))
+        if options['check']:
+            raise CommandError(f'Unapplied migrations: {names}')
+
+        self.stdout.write(f'Unapplied migrations: {names}')
+        call_command('migrate', interactive=False, verbosity=options['verbosity'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Migrations applied in {time.monotonic() - started:.2f}s'
+        ))
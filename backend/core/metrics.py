@@ -0,0 +1,153 @@
+import os
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from core import tracing
+
+# Route templates such as "api/contracts/<uuid:pk>/" keep the label
+# cardinality bounded, unlike raw paths
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, by route",
+    ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries executed per request, by route",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, float("inf")),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per request, by route",
+    ["method", "route"],
+)
+OUTBOUND_DURATION = Histogram(
+    "outbound_request_duration_seconds",
+    "Time spent in calls to external services, counted by outcome",
+    ["service", "operation", "status"],
+)
+
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+def render_metrics():
+    """
+    Return the metrics in Prometheus text format. Under gunicorn the values
+    of every worker are read from PROMETHEUS_MULTIPROC_DIR and aggregated.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def outbound_status(exception):
+    """
+    Return the HTTP status of a failed outbound call when the exception
+    carries one, from botocore or requests, and "error" otherwise.
+    """
+    response = getattr(exception, "response", None)
+    if isinstance(response, dict):
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    else:
+        status = getattr(response, "status_code", None)
+    return str(status) if status else "error"
+
+
+class outbound_call:
+    """
+    Time a call to an external service and trace it as a client span. Set
+    .status from the response; an exception leaving the block records its
+    status instead.
+
+        with outbound_call("signatureapi", "create_envelope") as call:
+            response = requests.post(...)
+            call.status = response.status_code
+    """
+
+    def __init__(self, service, operation):
+        self.service = service
+        self.operation = operation
+        self.status = "ok"
+
+    def __enter__(self):
+        self.span = tracing.span(
+            f"{self.service} {self.operation}",
+            attributes={"peer.service": self.service},
+            kind="client",
+        )
+        self.current_span = self.span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.status = outbound_status(exc)
+        OUTBOUND_DURATION.labels(self.service, self.operation, str(self.status)).observe(
+            time.perf_counter() - self.started
+        )
+        if self.current_span is not None:
+            self.current_span.set_attribute("outbound.status", str(self.status))
+        return self.span.__exit__(exc_type, exc, tb)
+
+
+class QueryCounter:
+    """
+    Database execute wrapper that counts the queries of a request and the
+    time spent in them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, query count and query time of every request by
+    route. Put it first so the other middleware is included in the latency.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        status = 500
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            duration = time.perf_counter() - started
+            match = getattr(request, "resolver_match", None)
+            route = match.route if match is not None else "unmatched"
+            method = request.method if request.method in METHODS else "other"
+            REQUEST_DURATION.labels(method, route, str(status)).observe(duration)
+            REQUEST_DB_QUERIES.labels(method, route).observe(queries.count)
+            REQUEST_DB_DURATION.labels(method, route).observe(queries.duration)
@@ -1,3 +1,4 @@
+from organizations.permissions import mask_for, user_permission_mask
 from rest_framework.permissions import BasePermission
 from rest_framework.exceptions import PermissionDenied
 
@@ -18,6 +19,9 @@ class IsOrganizationAdmin(BasePermission):
 
     def has_permission(self, request, view):
         user = request.user
+        # set from the token claims by ClaimsJWTAuthentication
+        if hasattr(user, "is_organization_admin"):
+            return user.is_organization_admin
         is_organization_admin = user.roles.filter(
             role__name="admin", role__organization=user.organization
         ).exists()
@@ -32,3 +36,21 @@ class IsInOrganization(BasePermission):
     def has_permission(self, request, view):
         organization_id = view.kwargs.get("organizationId")
         return request.user.organization.id == organization_id
+
+
+class HasPermission(BasePermission):
+    """
+    Allows access to users whose roles grant all the given permissions,
+    e.g. permission_classes = [IsAuthenticated, HasPermission("contracts.delete")].
+    """
+
+    def __init__(self, *permissions):
+        self.mask = mask_for(*permissions)
+
+    def __call__(self):
+        # DRF instantiates permission_classes entries, so return the
+        # configured instance
+        return self
+
+    def has_permission(self, request, view):
+        return user_permission_mask(request.user) & self.mask == self.mask
@@ -0,0 +1,195 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from authentication.authentication import ClaimsJWTAuthentication
+from core.permissions import IsMainAdmin
+
+
+# the switch interval is process-wide, so concurrent profiles share it:
+# the first one saves it and the last one to finish restores it
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_interval = None
+
+
+def lower_switch_interval(interval):
+    """
+    The sampler needs the GIL to take a sample, so have threads hand it
+    over at least as often as we sample.
+    """
+    global _switch_users, _switch_interval
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_interval = sys.getswitchinterval()
+        _switch_users += 1
+        sys.setswitchinterval(min(sys.getswitchinterval(), interval))
+
+
+def restore_switch_interval():
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_interval)
+
+
+class Sampler:
+    """
+    Sampling profiler for one thread. A background thread records the
+    thread's stack every interval and counts identical stacks, which is
+    the collapsed format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+        self.labels = {}
+
+    def __enter__(self):
+        lower_switch_interval(self.interval)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        restore_switch_interval()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self.label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            label = f"{code.co_qualname} ({relative_path(code.co_filename)}:{code.co_firstlineno})"
+            self.labels[code] = label
+        return label
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def relative_path(filename):
+    for path in sorted(sys.path, key=len, reverse=True):
+        if path and filename.startswith(path + os.sep):
+            return filename[len(path) + 1:]
+    return filename
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that records every query with its duration.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "sql": sql,
+                "many": many,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "connection": context["connection"].alias,
+            })
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request when a superuser asks for it with the
+    X-Profile header or the profile query parameter. The response is
+    replaced by the profile: JSON with the collapsed stacks and the SQL
+    queries, or only the collapsed stacks with "collapsed" as the value.
+
+        curl -H "Authorization: Bearer ..." -H "X-Profile: collapsed" \
+            https://.../api/contracts/ | flamegraph.pl > contracts.svg
+
+    Other requests only pay for the check of the header and query string.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if "HTTP_X_PROFILE" not in request.META and "profile=" not in request.META.get("QUERY_STRING", ""):
+            return self.get_response(request)
+
+        mode = request.META.get("HTTP_X_PROFILE") or request.GET.get("profile")
+        if not mode or not self.is_allowed(request):
+            return self.get_response(request)
+        return self.profile(request, mode)
+
+    def is_allowed(self, request):
+        """
+        Only superusers may profile. API clients authenticate with a JWT,
+        which DRF only checks inside the view, so check it here as well.
+        """
+        user = request.user
+        if not user.is_authenticated:
+            try:
+                authenticated = ClaimsJWTAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return False
+            if authenticated is None:
+                return False
+            user = authenticated[0]
+        return IsMainAdmin().has_permission(SimpleNamespace(user=user), None)
+
+    def profile(self, request, mode):
+        queries = QueryRecorder()
+        sampler = Sampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            with sampler:
+                response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        if mode == "collapsed":
+            profiled = HttpResponse(sampler.collapsed(), content_type="text/plain")
+        else:
+            profiled = HttpResponse(
+                json.dumps({
+                    "path": request.get_full_path(),
+                    "status": response.status_code,
+                    "duration_ms": round(duration * 1000, 3),
+                    "interval_ms": settings.PROFILING_INTERVAL * 1000,
+                    "samples": sampler.samples,
+                    "collapsed": sampler.collapsed(),
+                    "query_count": len(queries.queries),
+                    "query_duration_ms": round(sum(query["duration_ms"] for query in queries.queries), 3),
+                    "queries": queries.queries,
+                }),
+                content_type="application/json",
+            )
+        profiled["X-Profiled-Status"] = response.status_code
+        profiled["Cache-Control"] = "no-store"
+        return profiled
@@ -0,0 +1,127 @@
+import io
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # falls back to the standard library
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is optional
+    msgpack = None
+
+if orjson is not None:
+    # datetimes go through the DRF encoder, which writes UTC as "Z"; UUIDs
+    # are encoded natively and come out exactly as str(uuid)
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# orjson reads integers over 64 bits as floats where json keeps them exact.
+# Those have at least 20 digits: with every digit mapped to "0", a run of 20
+# zeros is found much faster than with a regular expression.
+DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+LONG_NUMBER = b"0" * 20
+
+
+def check_msgpack():
+    """
+    Refuse API_MSGPACK without msgpack installed, which would otherwise
+    fail every MessagePack request with an AttributeError.
+    """
+    if settings.API_MSGPACK and msgpack is None:
+        raise ImproperlyConfigured("API_MSGPACK is enabled but msgpack is not installed")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson, several times faster on large lists.
+    The output is byte for byte that of JSONRenderer: types orjson does
+    not know are converted by the same encoder, and anything orjson cannot
+    encode (integers over 64 bits, non-string keys) or an indented response
+    is rendered by JSONRenderer itself.
+
+    Floats are the exception: orjson writes 1e16 where json writes 1e+16
+    and null for NaN. The API has no float fields.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # escaped like JSONRenderer so the output stays a JavaScript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson. Bodies orjson rejects, or that may hold
+    integers over 64 bits, are parsed by JSONParser, so the result and the
+    error messages are unchanged.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS_TO_ZERO):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body if encoding.lower() in ("utf-8", "utf8") else body.decode(encoding))
+        except (orjson.JSONDecodeError, UnicodeDecodeError):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Compact binary alternative to JSON, for clients sending
+    Accept: application/msgpack. Values are the same as in the JSON
+    responses: UUIDs, dates and decimals are strings.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = encoders.JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder_class().default)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses request bodies sent with Content-Type: application/msgpack.
+    """
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read())
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+
+# directories that never hold application code
+SKIPPED_DIRECTORIES = {"__pycache__", "venv", "logs", "static", "staticfiles", "openapi"}
+
+
+@dataclass(frozen=True)
+class CachedSchema:
+    content: bytes
+    etag: str
+
+
+_lock = threading.Lock()
+_schema = None
+
+
+def code_version():
+    """
+    Identify the deployed code: CODE_VERSION, which the Dockerfile requires,
+    else for local runs a hash of the names, sizes and modification times of
+    the source files.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+
+    digest = hashlib.sha256()
+    for root, directories, files in os.walk(settings.BASE_DIR):
+        directories[:] = sorted(
+            name
+            for name in directories
+            if name not in SKIPPED_DIRECTORIES and not name.startswith(".")
+        )
+        for name in sorted(files):
+            if name.endswith(".py"):
+                stat = os.stat(os.path.join(root, name))
+                path = os.path.relpath(os.path.join(root, name), settings.BASE_DIR)
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(version):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f"openapi-{version}.json"
+
+
+def generate_schema():
+    """
+    Introspect every view and serializer and return the OpenAPI document
+    as JSON bytes.
+    """
+    # drf_yasg is only needed when the schema is (re)built
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    info = openapi.Info(
+        title="CLM Management API",
+        default_version="v1",
+        description="This is the API for the Contract Lifecycle Management System",
+        terms_of_service="https://www.example.com/terms/",
+        contact=openapi.Contact(email="your-email@example.com"),
+        license=openapi.License(name="BSD License"),
+    )
+    schema = OpenAPISchemaGenerator(info).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(version=None):
+    """
+    Generate the schema and store it for the given code version.
+    """
+    version = version or code_version()
+    content = generate_schema()
+    path = schema_path(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+    return path, content
+
+
+def get_schema():
+    """
+    Return the schema for the running code version. It is read from the
+    file written at build time, or generated once on first use, and then
+    kept in memory for the life of the process.
+    """
+    global _schema
+    if _schema is None:
+        with _lock:
+            if _schema is None:
+                version = code_version()
+                try:
+                    content = schema_path(version).read_bytes()
+                except FileNotFoundError:
+                    try:
+                        _, content = write_schema(version)
+                    except OSError:
+                        # read-only filesystem, keep it in memory only
+                        content = generate_schema()
+                _schema = CachedSchema(
+                    content=content, etag=hashlib.sha256(content).hexdigest()[:32]
+                )
+    return _schema
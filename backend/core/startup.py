@@ -0,0 +1,92 @@
+import gc
+import os
+import time
+from importlib.util import find_spec
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.utils import OperationalError
+
+
+def wait_for_database(timeout=60, using=DEFAULT_DB_ALIAS):
+    """
+    Block until the database accepts connections, retrying with a growing
+    delay. Raises the last OperationalError once the timeout has passed.
+    """
+    connection = connections[using]
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        try:
+            connection.ensure_connection()
+            return
+        except OperationalError:
+            if time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 2)
+
+
+def migrations_on_disk():
+    """
+    Return the (app_label, name) of every migration file, found by listing
+    the migrations packages instead of importing each module as
+    MigrationLoader does.
+    """
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for directory in spec.submodule_search_locations:
+            for filename in os.listdir(directory):
+                name, extension = os.path.splitext(filename)
+                if extension == ".py" and not name.startswith(("_", "~")):
+                    found.add((app_config.label, name))
+    return found
+
+
+def unapplied_migrations(using=DEFAULT_DB_ALIAS):
+    """
+    Return the migrations on disk that the database has not recorded, with
+    a single query. Squashed migrations whose replaced migrations are all
+    applied may show up here; running migrate then just records them.
+    """
+    recorder = MigrationRecorder(connections[using])
+    if not recorder.has_table():
+        return migrations_on_disk()
+    return migrations_on_disk() - set(recorder.applied_migrations())
+
+
+def warm_up():
+    """
+    Do the work of a first request ahead of time, in the gunicorn master when
+    the app is preloaded, so forked workers share it instead of each paying
+    for it on their first request.
+    """
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    from core.schema import get_schema
+
+    # reading reverse_dict imports every view module and compiles the URL
+    # patterns
+    get_resolver().reverse_dict
+    get_schema()
+    get_template("redoc.html")
+
+    # connections must not be shared across the fork
+    connections.close_all()
+
+    # keep the objects created so far out of the collector, which would
+    # otherwise touch them in every worker and copy their memory pages
+    gc.collect()
+    gc.freeze()
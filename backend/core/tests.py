@@ -1,3 +1,618 @@
-from django.test import TestCase
+import io
+import re
+import sys
+import tempfile
+import threading
+import unittest
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Callable
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from prometheus_client import REGISTRY
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from authentication.models import Invitation
+from authentication.serializers import CustomTokenObtainPairSerializer
+from contracts.models import Contract
+from core import profiling, renderers, schema, startup
+from counterparties.models import Counterparty, Party
+from organizations.models import Organization, OrganizationDeletionJob, Role, UserRole
+from organizations.permissions import compile_permissions
+from users.models import User
+
+# tenant sizes every endpoint is called at, its query count must not change
+SIZES = (10, 100, 1000)
+
+PASSWORD = "correct-horse-battery"
+
+
+@dataclass
+class Case:
+    """
+    One call to an endpoint. kwargs, data and query take the seeded tenant
+    and return the URL kwargs, the request body and the query string.
+    """
+
+    route: str
+    method: str
+    status: int
+    user: str = "admin"
+    kwargs: Callable = lambda tenant: {}
+    data: Callable = lambda tenant: None
+    query: Callable = lambda tenant: {}
+    name: str = field(default="")
+
+    def __post_init__(self):
+        self.name = self.name or f"{self.method} /{self.route}"
+
+
+def envelope(tenant):
+    return {
+        "contract_id": str(tenant.contract.id),
+        "document_format": "pdf",
+        "routing": "sequential",
+        "recipients": [
+            {"key": "signer", "recipient_type": "signer", "name": "Sam Signer", "email": "sam@signer.test"}
+        ],
+        "places": [{"key": "signature", "place_type": "signature", "recipient_key": "signer"}],
+    }
+
+
+CASES = [
+    # users
+    Case("api/users/profile/", "get", 200),
+    # authentication
+    Case(
+        "api/auth/register/", "post", 201, user=None,
+        data=lambda t: {"email": "new@register.test", "password": PASSWORD, "first_name": "New", "last_name": "User"},
+    ),
+    Case("api/auth/login/", "post", 200, user=None, data=lambda t: {"email": t.admin.email, "password": PASSWORD}),
+    Case(
+        "api/auth/refresh/", "post", 200, user=None,
+        data=lambda t: {"refresh": str(CustomTokenObtainPairSerializer.get_token(t.admin))},
+    ),
+    Case(
+        "api/auth/<uuid:organizationId>/invite/", "post", 201,
+        kwargs=lambda t: {"organizationId": t.organization.id},
+        data=lambda t: {"email": "invitee@tenant.test", "role": t.role.id},
+    ),
+    Case(
+        "api/auth/<uuid:organizationId>/invite/bulk/", "post", 200,
+        kwargs=lambda t: {"organizationId": t.organization.id},
+        data=lambda t: {"invitations": [{"email": f"bulk-{i}@tenant.test", "role": t.role.name} for i in range(5)]},
+    ),
+    Case(
+        "api/auth/invitations/<uuid:token>/accept/", "post", 201, user=None,
+        kwargs=lambda t: {"token": t.invitation.id},
+        data=lambda t: {"email": t.invitation.email, "password": PASSWORD, "first_name": "Ina", "last_name": "Vitee"},
+    ),
+    # organizations
+    Case("api/organizations/", "get", 200, user="superuser"),
+    Case("api/organizations/", "post", 201, user="loner", data=lambda t: {"name": "Founded"}),
+    Case("api/organizations/<uuid:pk>/", "get", 200, kwargs=lambda t: {"pk": t.organization.id}),
+    Case("api/organizations/<uuid:pk>/", "patch", 200, kwargs=lambda t: {"pk": t.organization.id}, data=lambda t: {"name": "Renamed"}),
+    Case("api/organizations/<uuid:pk>/", "delete", 202, kwargs=lambda t: {"pk": t.organization.id}),
+    Case("api/organizations/deletions/<uuid:pk>/", "get", 200, kwargs=lambda t: {"pk": t.job.id}),
+    Case("api/organizations/<uuid:organizationId>/users/", "get", 200, kwargs=lambda t: {"organizationId": t.organization.id}),
+    Case("api/organizations/<uuid:organizationId>/roles/", "get", 200, kwargs=lambda t: {"organizationId": t.organization.id}),
+    Case(
+        "api/organizations/<uuid:organizationId>/roles/<int:roleId>/permissions/", "patch", 200, user="superuser",
+        kwargs=lambda t: {"organizationId": t.organization.id, "roleId": t.role.id},
+        data=lambda t: {"permissions": ["contracts.view", "contracts.create"]},
+    ),
+    Case(
+        "api/organizations/<uuid:organizationId>/users/<int:userId>/roles", "get", 200,
+        kwargs=lambda t: {"organizationId": t.organization.id, "userId": t.member.id},
+    ),
+    Case(
+        "api/organizations/<uuid:organizationId>/users/<int:userId>/roles/assign", "post", 201,
+        kwargs=lambda t: {"organizationId": t.organization.id, "userId": t.member.id},
+        data=lambda t: {"roleId": t.other_role.id},
+    ),
+    Case(
+        "api/organizations/<uuid:organizationId>/roles/assign/bulk/", "post", 200,
+        kwargs=lambda t: {"organizationId": t.organization.id},
+        data=lambda t: {"userIds": [member.id for member in t.members[:5]], "roleIds": [t.other_role.id]},
+    ),
+    # contracts
+    Case("api/contracts/presigned-post-url/", "get", 200, query=lambda t: {"file_type": "application/pdf"}),
+    Case("api/contracts/presigned-download-url/", "get", 200, query=lambda t: {"file_path": t.contract.file_path}),
+    Case("api/contracts/", "get", 200),
+    Case(
+        "api/contracts/", "post", 201,
+        data=lambda t: {"title": "New contract", "contract_type": "nda", "file_path": "uploads/new.pdf"},
+    ),
+    Case("api/contracts/<uuid:pk>/", "get", 200, kwargs=lambda t: {"pk": t.contract.id}),
+    Case("api/contracts/<uuid:pk>/", "patch", 200, kwargs=lambda t: {"pk": t.contract.id}, data=lambda t: {"title": "Renamed"}),
+    Case("api/contracts/<uuid:pk>/", "delete", 204, kwargs=lambda t: {"pk": t.contract.id}),
+    # counterparties
+    Case("api/counterparties/", "get", 200),
+    Case(
+        "api/counterparties/", "post", 201,
+        data=lambda t: {"contract": str(t.contract.id), "party_name": "Newco", "party_type": "company", "email": "new@newco.test"},
+    ),
+    Case(
+        "api/counterparties/bulk/", "post", 200,
+        data=lambda t: [
+            {"contract": str(contract.id), "party_name": "Bulkco", "party_type": "company", "email": "bulk@bulkco.test"}
+            for contract in t.contracts[:5]
+        ],
+    ),
+    Case("api/counterparties/autocomplete/", "get", 200, query=lambda t: {"q": "shared"}),
+    Case("api/counterparties/directory/", "get", 200),
+    Case("api/counterparties/directory/<uuid:pk>/contracts/", "get", 200, kwargs=lambda t: {"pk": t.shared_party.id}),
+    Case("api/counterparties/<uuid:pk>/", "get", 200, kwargs=lambda t: {"pk": t.counterparty.id}),
+    Case("api/counterparties/<uuid:pk>/", "patch", 200, kwargs=lambda t: {"pk": t.counterparty.id}, data=lambda t: {"party_name": "Renamed"}),
+    Case("api/counterparties/<uuid:pk>/", "delete", 204, kwargs=lambda t: {"pk": t.counterparty.id}),
+    # esignature
+    Case("api/esignature/send-contract/", "post", 202, data=envelope),
+    Case("api/esignature/create-sender/", "post", 202),
+    # schema, metrics and admin
+    Case("metrics", "get", 200, user=None),
+    Case("openapi.json", "get", 200, user=None),
+    Case("", "get", 200, user=None),
+    Case("admin/", "get", 200, user="superuser"),
+]
+
+
+def seed(size):
+    """
+    Create a tenant whose members, roles, invitations, contracts,
+    counterparties and directory parties all grow with size.
+    """
+    organization = Organization.objects.create(name=f"Tenant {size}")
+    admin_role = Role.objects.create(name="admin", organization=organization)
+    roles = Role.objects.bulk_create([
+        Role(
+            name=f"role-{i}",
+            organization=organization,
+            permissions=["contracts.view"],
+            permission_mask=compile_permissions(["contracts.view"]),
+        )
+        for i in range(size)
+    ])
+
+    admin = User.objects.create_user(
+        f"admin@tenant{size}.test", PASSWORD, "Ada", "Admin", organization=organization
+    )
+    UserRole.objects.create(user=admin, role=admin_role)
+    members = User.objects.bulk_create([
+        User(
+            email=f"member-{i}@tenant{size}.test",
+            first_name="Member",
+            last_name=str(i),
+            organization=organization,
+            password="!",
+        )
+        for i in range(size)
+    ])
+    UserRole.objects.bulk_create([
+        UserRole(user=member, role=role) for member, role in zip(members, roles)
+    ])
+
+    expires_at = timezone.now() + timezone.timedelta(days=7)
+    invitations = Invitation.objects.bulk_create([
+        Invitation(
+            email=f"invited-{i}@tenant{size}.test",
+            organization=organization,
+            role=roles[i],
+            invited_by=admin,
+            expires_at=expires_at,
+        )
+        for i in range(size)
+    ])
+
+    contracts = Contract.objects.bulk_create([
+        Contract(
+            title=f"Contract {i}",
+            contract_type="nda",
+            organization=organization,
+            created_by=admin,
+            last_modified_by=admin,
+            file_path=f"tenant{size}/contract-{i}.pdf",
+        )
+        for i in range(size)
+    ])
+    # every contract has its own counterparty and one shared by all of them
+    counterparties = Counterparty.objects.bulk_create([
+        Counterparty(
+            contract=contract,
+            organization=organization,
+            party_name=name,
+            party_type="company",
+            email=email,
+        )
+        for i, contract in enumerate(contracts)
+        for name, email in ((f"Party {i}", f"party-{i}@tenant{size}.test"), ("Shared", "shared@party.test"))
+    ])
+    Party.objects.sync(counterparties)
+
+    job = OrganizationDeletionJob.objects.create(
+        organization_id=organization.id,
+        organization_name=organization.name,
+        status="done",
+    )
+
+    return SimpleNamespace(
+        organization=organization,
+        admin=admin,
+        superuser=User.objects.create_superuser(f"root@tenant{size}.test", PASSWORD, "Root", "User"),
+        loner=User.objects.create_user(f"loner@tenant{size}.test", PASSWORD, "Lone", "User"),
+        role=roles[0],
+        other_role=roles[1],
+        members=members,
+        member=members[0],
+        invitation=invitations[0],
+        contracts=contracts,
+        contract=contracts[0],
+        counterparty=counterparties[0],
+        shared_party=Party.objects.get(organization=organization, normalized_email="shared@party.test"),
+        job=job,
+    )
+
+
+class FakeS3:
+    def generate_presigned_post_url(self, file_type, key=None):
+        return {"url": "https://bucket.s3.test/", "fields": {"key": key or "upload"}}
+
+    def generate_presigned_url_expanded(self, client_method_name, key):
+        return f"https://bucket.s3.test/{key}"
+
+    def check_object_exists(self, key):
+        return True
+
+    def delete_object(self, key):
+        return True
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def path_for(case, tenant):
+    kwargs = case.kwargs(tenant)
+    return "/" + re.sub(r"<(?:\w+:)?(\w+)>", lambda match: str(kwargs[match.group(1)]), case.route)
+
+
+def all_routes(patterns=None, prefix=""):
+    """
+    Yield the route of every URL pattern, the admin site counting as one.
+    """
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver) and pattern.app_name != "admin":
+            yield from all_routes(pattern.url_patterns, route)
+        else:
+            yield route
+
+
+def normalize(sql):
+    """
+    Strip the literals from a query so repeats of the same query compare
+    equal, e.g. one SELECT per row of a list.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    return re.sub(r"\((?:\s*\?\s*,)*\s*\?\s*\)", "(...)", sql)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    SECURE_SSL_REDIRECT=False,
+    METRICS_TOKEN="scrape-token",
+)
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint must run the same number of queries whatever the size of
+    the tenant, otherwise it has an N+1 somewhere.
+    """
+
+    def setUp(self):
+        for target, replacement in (
+            ("contracts.views.S3", FakeS3),
+            ("esignature.utils.S3", FakeS3),
+            ("esignature.views.create_envelope", lambda data: FakeResponse(201, {"id": "envelope"})),
+            ("esignature.views.create_sender", lambda email: FakeResponse(201, {"id": "sender"})),
+        ):
+            patcher = mock.patch(target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_every_url_has_a_budget_case(self):
+        covered = {case.route for case in CASES}
+        missing = sorted(set(all_routes()) - covered)
+        if missing:
+            self.fail(f"URLs without a query budget case in core/tests.py: {missing}")
+
+    def test_query_counts_do_not_grow_with_data(self):
+        counts = {case.name: {} for case in CASES}
+        for size in SIZES:
+            with transaction.atomic():
+                tenant = seed(size)
+                for case in CASES:
+                    # once to warm process-wide caches, then measured
+                    self.call(case, tenant)
+                    counts[case.name][size] = self.call(case, tenant)
+                transaction.set_rollback(True)
+
+        failures = []
+        for case in CASES:
+            by_size = counts[case.name]
+            smallest, largest = by_size[SIZES[0]], by_size[SIZES[-1]]
+            if len({len(queries) for queries in by_size.values()}) == 1:
+                continue
+            grown = Counter(map(normalize, largest))
+            grown.subtract(Counter(map(normalize, smallest)))
+            offending = "\n".join(
+                f"    +{extra} {sql}" for sql, extra in grown.most_common() if extra > 0
+            )
+            sizes = ", ".join(f"{len(queries)} at {size}" for size, queries in by_size.items())
+            failures.append(f"{case.name}: {sizes} queries\n{offending}")
+
+        if failures:
+            self.fail("Query counts grow with data size:\n" + "\n".join(failures))
+
+    def call(self, case, tenant):
+        """
+        Call the endpoint inside a rolled back savepoint, with empty caches,
+        and return the SQL it ran.
+        """
+        cache.clear()
+        self.client.logout()
+        headers = {}
+        user = getattr(tenant, case.user) if case.user else None
+        if case.route == "admin/":
+            self.client.force_login(user)
+        elif case.route == "metrics":
+            headers["HTTP_AUTHORIZATION"] = "Bearer scrape-token"
+        elif user is not None:
+            token = CustomTokenObtainPairSerializer.get_token(user).access_token
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+
+        with transaction.atomic():
+            path = path_for(case, tenant)
+            data = case.data(tenant)
+            query = case.query(tenant)
+            request = getattr(self.client, case.method)
+            with CaptureQueriesContext(connection) as queries:
+                if case.method == "get":
+                    response = request(path, query, **headers)
+                else:
+                    response = request(path, data, content_type="application/json", **headers)
+            transaction.set_rollback(True)
+
+        self.assertEqual(
+            response.status_code,
+            case.status,
+            f"{case.name} at size {len(tenant.members)}: {response.content[:500]!r}",
+        )
+        return [query["sql"] for query in queries.captured_queries]
+
+
+class StartupTests(TestCase):
+    def test_unapplied_migrations_finds_pending_ones(self):
+        self.assertEqual(startup.unapplied_migrations(), set())
+
+        MigrationRecorder.Migration.objects.filter(
+            app="counterparties", name="0009_unique_contract_counterparty"
+        ).delete()
+        self.assertEqual(
+            startup.unapplied_migrations(),
+            {("counterparties", "0009_unique_contract_counterparty")},
+        )
+
+        with mock.patch.object(MigrationRecorder, "has_table", return_value=False):
+            self.assertIn(("users", "0001_initial"), startup.unapplied_migrations())
+
+    def test_warm_up_closes_connections_and_freezes_objects(self):
+        with mock.patch("core.startup.connections") as connections, \
+                mock.patch("core.schema.get_schema") as get_schema, mock.patch("gc.freeze") as freeze:
+            startup.warm_up()
+
+        get_schema.assert_called_once_with()
+        connections.close_all.assert_called_once_with()
+        freeze.assert_called_once_with()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def profile(self, **headers):
+        return self.client.get("/api/users/profile/", HTTP_X_PROFILE="json", **headers)
+
+    def test_only_superusers_can_profile(self):
+        self.client.force_login(User.objects.create_user("user@acme.test", PASSWORD, "Ann", "User"))
+        response = self.profile()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profiled-Status", response)
+        self.assertEqual(response.json()["email"], "user@acme.test")
+
+        self.client.logout()
+        self.assertNotIn("X-Profiled-Status", self.profile(HTTP_AUTHORIZATION="Bearer not-a-token"))
+
+        self.client.force_login(User.objects.create_superuser("root@acme.test", PASSWORD, "Root", "User"))
+        response = self.profile()
+        self.assertEqual(response["X-Profiled-Status"], "200")
+        self.assertEqual(response.json()["path"], "/api/users/profile/")
+        self.assertEqual(sys.getswitchinterval(), self.switch_interval)
+
+    def test_overlapping_profiles_restore_the_switch_interval(self):
+        first = profiling.Sampler(threading.get_ident(), 0.002)
+        second = profiling.Sampler(threading.get_ident(), 0.001)
+
+        first.__enter__()
+        second.__enter__()
+        self.assertEqual(sys.getswitchinterval(), 0.001)
+        # the first request finishes while the second is still profiled
+        first.__exit__(None, None, None)
+        self.assertEqual(sys.getswitchinterval(), 0.001)
+        second.__exit__(None, None, None)
+        self.assertEqual(sys.getswitchinterval(), self.switch_interval)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class SchemaTests(SimpleTestCase):
+    """
+    The schema is stored per code version and revalidated with its ETag.
+    """
+
+    def setUp(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(OPENAPI_SCHEMA_DIR=directory))
+        for version, title in (("v1", "First"), ("v2", "Second")):
+            schema.schema_path(version).write_text(f'{{"info": {{"title": "{title}"}}}}')
+        self.enterContext(mock.patch.object(schema, "_schema", None))
+
+    def fetch(self, version, **headers):
+        schema._schema = None
+        with self.settings(CODE_VERSION=version):
+            return self.client.get("/openapi.json", **headers)
+
+    def test_etag_changes_with_the_code_version(self):
+        first = self.fetch("v1")
+        second = self.fetch("v2")
+
+        self.assertEqual(first.json()["info"]["title"], "First")
+        self.assertEqual(second.json()["info"]["title"], "Second")
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_matching_etag_returns_304(self):
+        etag = self.fetch("v1")["ETag"]
+
+        self.assertEqual(self.fetch("v1", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.fetch("v2", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_code_version_prefers_the_setting(self):
+        with self.settings(CODE_VERSION="abc123"):
+            self.assertEqual(schema.code_version(), "abc123")
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class MetricsTests(SimpleTestCase):
+    """
+    /metrics is closed unless scrapers send the token, or under DEBUG.
+    """
+
+    def test_requires_the_token(self):
+        with self.settings(METRICS_TOKEN="scrape-token"):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-token").status_code, 200)
+
+    def test_without_a_token_is_only_open_under_debug(self):
+        with self.settings(METRICS_TOKEN="", DEBUG=False):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with self.settings(METRICS_TOKEN="", DEBUG=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_unknown_methods_share_one_label(self):
+        labels = {"method": "other", "route": "metrics", "status": "405"}
+        before = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+        for method in ("BREW", "PROPFIND", "X-RANDOM-1"):
+            self.client.generic(method, "/metrics")
+        self.assertEqual(REGISTRY.get_sample_value("http_request_duration_seconds_count", labels), before + 3)
+        self.assertIsNone(
+            REGISTRY.get_sample_value("http_request_duration_seconds_count", {**labels, "method": "BREW"})
+        )
+
+
+@unittest.skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    """
+    The orjson renderer and parser must be interchangeable with DRF's.
+    """
+
+    def assertSameRendering(self, data, accepted_media_type=None):
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_renders_the_same_bytes_as_drf(self):
+        self.assertSameRendering(ReturnDict({
+            "id": uuid.UUID("4f1c1c3e-0d7a-4d5e-9b8a-3f2d1e0c9b8a"),
+            "created_at": datetime(2025, 1, 15, 9, 30, 5, 123456, tzinfo=UTC),
+            "naive": datetime(2025, 1, 15, 9, 30),
+            "offset": datetime(2025, 1, 15, 9, 30, tzinfo=timezone.get_fixed_timezone(120)),
+            "expires_on": date(2026, 1, 1),
+            "at": time(12, 0, 1),
+            "duration": timedelta(minutes=5),
+            "amount": Decimal("12.50"),
+            "label": gettext_lazy("Draft"),
+            "text": "ünïcode \u2028 and \u2029 <script>",
+            "nested": [{"count": 3, "ok": True, "none": None}, (1, 2)],
+            "set": {1},
+        }, serializer=None))
+
+    def test_falls_back_to_drf_for_what_orjson_cannot_encode(self):
+        self.assertSameRendering({"big": 2**70})
+        self.assertSameRendering({1: "integer key"})
+        self.assertSameRendering({"a": [1]}, "application/json; indent=4")
+        self.assertEqual(renderers.ORJSONRenderer().render(None), b"")
+        with self.assertRaises(TypeError):
+            renderers.ORJSONRenderer().render({"object": object()})
+
+    def test_parses_like_drf(self):
+        for body in [b'{"a": [1, 2.5, "\\u00e9", null, true]}', b'{"big": 123456789012345678901234567890}']:
+            self.assertEqual(
+                renderers.ORJSONParser().parse(io.BytesIO(body)),
+                JSONParser().parse(io.BytesIO(body)),
+            )
+
+        for body in [b'{"a": NaN}', b'{"a": ', b"\xff"]:
+            with self.assertRaises(ParseError) as expected:
+                JSONParser().parse(io.BytesIO(body))
+            with self.assertRaises(ParseError) as parsed:
+                renderers.ORJSONParser().parse(io.BytesIO(body))
+            self.assertEqual(str(parsed.exception), str(expected.exception))
+
+    def test_messagepack_requires_msgpack(self):
+        with mock.patch.object(renderers, "msgpack", None):
+            with self.settings(API_MSGPACK=True), self.assertRaises(ImproperlyConfigured):
+                renderers.check_msgpack()
+            with self.settings(API_MSGPACK=False):
+                renderers.check_msgpack()
+
+    @unittest.skipIf(renderers.msgpack is None, "msgpack is not installed")
+    def test_messagepack_round_trip_has_the_json_values(self):
+        data = {
+            "id": uuid.UUID("4f1c1c3e-0d7a-4d5e-9b8a-3f2d1e0c9b8a"),
+            "created_at": datetime(2025, 1, 15, 9, 30, tzinfo=UTC),
+            "amount": Decimal("12.50"),
+            "items": [1, "two", None],
+        }
+        body = renderers.MessagePackRenderer().render(data)
+        self.assertEqual(
+            renderers.MessagePackParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(JSONRenderer().render(data))),
+        )
+        with self.assertRaises(ParseError):
+            renderers.MessagePackParser().parse(io.BytesIO(body[:-3]))
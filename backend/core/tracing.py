@@ -0,0 +1,164 @@
+import logging
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # tracing is optional
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+
+
+def configure():
+    """
+    Install the tracer provider described by settings.TRACING. Does nothing
+    when tracing is disabled or OpenTelemetry is not installed, so every
+    helper below becomes a no-op.
+    """
+    global _tracer
+    options = settings.TRACING
+    if not options["ENABLED"] or _tracer is not None:
+        return
+    if trace is None:
+        logger.warning("TRACING is enabled but opentelemetry-sdk is not installed")
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    # the sampling decision is made once per trace, at its root, and
+    # followed by every span and background job that joins it
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": options["SERVICE_NAME"]}),
+        sampler=ParentBased(TraceIdRatioBased(options["SAMPLE_RATE"])),
+    )
+    # spans are exported from a background thread, off the request path
+    provider.add_span_processor(BatchSpanProcessor(get_exporter(options)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("clm")
+
+
+def get_exporter(options):
+    if options["EXPORTER"] == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=options["OTLP_ENDPOINT"] or None)
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    # one JSON span per line, appended by every process
+    return ConsoleSpanExporter(
+        out=open(options["FILE"], "a"),
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+
+
+def span(name, attributes=None, context=None, kind="internal"):
+    """
+    Context manager for a span, child of the current span or of the given
+    context. kind is "internal", "client" or "server". Returns a null
+    context when tracing is off.
+    """
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(
+        name,
+        context=context,
+        kind=SpanKind[kind.upper()],
+        attributes=attributes,
+    )
+
+
+def inject():
+    """
+    Return the current trace context as a dict, to store on a row that a
+    background worker picks up later.
+    """
+    if _tracer is None:
+        return {}
+    carrier = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+def extract(carrier):
+    """
+    Return the context stored by inject(), to parent a worker's spans.
+    """
+    if _tracer is None or not carrier:
+        return None
+    return propagate.extract(carrier)
+
+
+def trace_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper that puts each query in its own span.
+    """
+    if not trace.get_current_span().is_recording():
+        return execute(sql, params, many, context)
+
+    operation = sql.split(None, 1)[0].upper() if sql else "QUERY"
+    attributes = {
+        "db.system": context["connection"].vendor,
+        "db.statement": sql[:2000],
+    }
+    with _tracer.start_as_current_span(operation, kind=SpanKind.CLIENT, attributes=attributes):
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def traced_queries():
+    """
+    Put each query run inside the block in its own span.
+    """
+    if _tracer is None:
+        yield
+        return
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(trace_query))
+        yield
+
+
+class TracingMiddleware:
+    """
+    Put every request in a server span, continuing the caller's trace when
+    it sends a traceparent header, with a child span per SQL query.
+    Removed from the stack when tracing is off.
+    """
+
+    def __init__(self, get_response):
+        if _tracer is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with _tracer.start_as_current_span(
+            request.method, context=propagate.extract(request.headers), kind=SpanKind.SERVER
+        ) as current:
+            if not current.is_recording():
+                return self.get_response(request)
+
+            with traced_queries():
+                response = self.get_response(request)
+
+            match = getattr(request, "resolver_match", None)
+            route = match.route if match is not None else "unmatched"
+            current.update_name(f"{request.method} {route}")
+            current.set_attribute("http.request.method", request.method)
+            current.set_attribute("http.route", route)
+            current.set_attribute("http.response.status_code", response.status_code)
+            if match is not None:
+                current.set_attribute("code.function", match._func_path)
+            if response.status_code >= 500:
+                current.set_status(Status(StatusCode.ERROR))
+            return response
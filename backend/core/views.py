@@ -1,3 +1,56 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+
+from core.metrics import render_metrics
+from core.schema import get_schema
+
+
+def schema_etag(request):
+    return get_schema().etag
+
+
+def redoc_etag(request):
+    return f"{get_schema().etag}-redoc"
+
+
+@require_safe
+@cache_control(no_cache=True)
+@condition(etag_func=schema_etag)
+def openapi_schema(request):
+    """
+    Serve the precomputed OpenAPI schema. Clients revalidate with the ETag
+    and get a 304 while the code version is unchanged.
+    """
+    return HttpResponse(get_schema().content, content_type="application/json")
+
+
+@require_safe
+@cache_control(no_cache=True)
+@condition(etag_func=redoc_etag)
+def redoc(request):
+    """
+    Redoc page that loads the cached schema.
+    """
+    return render(request, "redoc.html", {"schema_url": reverse("schema-json")})
+
 
-# Create your views here.
+@require_safe
+def metrics(request):
+    """
+    Prometheus metrics of all workers. Scrapers must send METRICS_TOKEN as
+    a bearer token; without one the endpoint is only open under DEBUG.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        return HttpResponse(status=403)
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from counterparties.models import Counterparty
+from counterparties.models import ContractParty, Counterparty, Party
 
 admin.site.register(Counterparty)
+admin.site.register(Party)
+admin.site.register(ContractParty)
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:43
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0004_contract_list_filter_indexes'),
+        ('counterparties', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='counterparty',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('party_name'), name='gin_trgm_ops'), name='counterparties_name_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='counterparty',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'), name='counterparties_email_trgm_idx'),
+        ),
+    ]
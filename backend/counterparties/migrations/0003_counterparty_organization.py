@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counterparties', '0002_counterparty_trigram_indexes'),
+        ('organizations', '0003_alter_role_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='counterparty',
+            name='organization',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='counterparties', to='organizations.organization'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_organization(apps, schema_editor):
+    """
+    Copy each counterparty's organization from its contract.
+
+    Runs outside a transaction in bounded batches so every batch commits on
+    its own and no lock is held over the whole table.
+    """
+    Counterparty = apps.get_model("counterparties", "Counterparty")
+    Contract = apps.get_model("contracts", "Contract")
+
+    contract_organization = Contract.objects.filter(id=OuterRef("contract_id")).values(
+        "organization_id"
+    )[:1]
+
+    # walk the primary key so every batch starts where the last one ended
+    # instead of scanning past the rows already filled
+    last_id = None
+    while True:
+        pending = Counterparty.objects.filter(organization__isnull=True).order_by("id")
+        if last_id is not None:
+            pending = pending.filter(id__gt=last_id)
+        batch = list(pending.values_list("id", flat=True)[:BATCH_SIZE])
+        if not batch:
+            break
+        Counterparty.objects.filter(id__in=batch).update(
+            organization_id=Subquery(contract_organization)
+        )
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('contracts', '0004_contract_list_filter_indexes'),
+        ('counterparties', '0003_counterparty_organization'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+    ]
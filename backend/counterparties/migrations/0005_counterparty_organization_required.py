@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counterparties', '0004_backfill_counterparty_organization'),
+        ('organizations', '0003_alter_role_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='counterparty',
+            name='organization',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='counterparties', to='organizations.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='counterparty',
+            index=models.Index(fields=['organization', 'added_at'], name='counterpart_organiz_e09bcd_idx'),
+        ),
+    ]
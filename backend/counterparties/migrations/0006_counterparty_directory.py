@@ -0,0 +1,65 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:48
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0004_contract_list_filter_indexes'),
+        ('counterparties', '0005_counterparty_organization_required'),
+        ('organizations', '0003_alter_role_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractParty',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('role', models.CharField(choices=[('signatory', 'Signatory'), ('viewer', 'Viewer'), ('influencer', 'Influencer')], default='signatory', max_length=50)),
+                ('isPrimary', models.BooleanField(default=True)),
+                ('added_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='party_links', to='contracts.contract')),
+            ],
+            options={
+                'db_table': 'contract_parties',
+            },
+        ),
+        migrations.CreateModel(
+            name='Party',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('party_name', models.CharField(max_length=255)),
+                ('party_type', models.CharField(max_length=255)),
+                ('email', models.EmailField(max_length=254)),
+                ('normalized_email', models.EmailField(editable=False, max_length=254)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('contracts', models.ManyToManyField(related_name='parties', through='counterparties.ContractParty', to='contracts.contract')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parties', to='organizations.organization')),
+            ],
+            options={
+                'db_table': 'parties',
+            },
+        ),
+        migrations.AddField(
+            model_name='contractparty',
+            name='party',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contract_links', to='counterparties.party'),
+        ),
+        migrations.AddConstraint(
+            model_name='party',
+            constraint=models.UniqueConstraint(fields=('organization', 'normalized_email'), name='unique_organization_party_email'),
+        ),
+        migrations.AddIndex(
+            model_name='contractparty',
+            index=models.Index(fields=['party', 'contract'], name='contract_pa_party_i_dabaad_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='contractparty',
+            constraint=models.UniqueConstraint(fields=('contract', 'party'), name='unique_contract_party'),
+        ),
+    ]
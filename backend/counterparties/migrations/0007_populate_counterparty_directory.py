@@ -0,0 +1,82 @@
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def populate_directory(apps, schema_editor):
+    """
+    Merge existing counterparties into the organization directory.
+
+    Counterparties sharing an organization and (case-insensitive) email
+    become one party linked to each of their contracts. Runs outside a
+    transaction in keyset-paginated batches so every batch commits on its own.
+    """
+    Counterparty = apps.get_model("counterparties", "Counterparty")
+    Party = apps.get_model("counterparties", "Party")
+    ContractParty = apps.get_model("counterparties", "ContractParty")
+
+    last_id = None
+    while True:
+        counterparties = Counterparty.objects.order_by("id")
+        if last_id is not None:
+            counterparties = counterparties.filter(id__gt=last_id)
+        batch = list(counterparties[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        parties = {}
+        for counterparty in batch:
+            key = (counterparty.organization_id, counterparty.email.strip().lower())
+            parties[key] = Party(
+                organization_id=key[0],
+                normalized_email=key[1],
+                email=counterparty.email,
+                party_name=counterparty.party_name,
+                party_type=counterparty.party_type,
+            )
+        Party.objects.bulk_create(
+            parties.values(),
+            update_conflicts=True,
+            unique_fields=["organization", "normalized_email"],
+            update_fields=["email", "party_name", "party_type", "updated_at"],
+        )
+
+        stored_parties = Party.objects.filter(
+            organization_id__in={key[0] for key in parties},
+            normalized_email__in={key[1] for key in parties},
+        ).values_list("id", "organization_id", "normalized_email")
+        party_ids = {
+            (organization_id, normalized_email): party_id
+            for party_id, organization_id, normalized_email in stored_parties
+        }
+
+        links = {}
+        for counterparty in batch:
+            party_id = party_ids[
+                (counterparty.organization_id, counterparty.email.strip().lower())
+            ]
+            links[(counterparty.contract_id, party_id)] = ContractParty(
+                contract_id=counterparty.contract_id,
+                party_id=party_id,
+                isPrimary=counterparty.isPrimary,
+            )
+        ContractParty.objects.bulk_create(
+            links.values(),
+            update_conflicts=True,
+            unique_fields=["contract", "party"],
+            update_fields=["isPrimary", "updated_at"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('counterparties', '0006_counterparty_directory'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_directory, migrations.RunPython.noop),
+    ]
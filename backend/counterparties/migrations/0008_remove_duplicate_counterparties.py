@@ -0,0 +1,85 @@
+from django.db import migrations, transaction
+from django.db.models import Count
+
+BATCH_SIZE = 500
+
+# removed rows are kept here, with every column, so they can be reviewed
+# or restored; drop the table once nobody needs them
+ARCHIVE_TABLE = "counterparties_removed_duplicates"
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Keep only the most recently updated counterparty per (contract, email)
+    so the unique constraint can be added. The other copies are moved to
+    the archive table. Runs outside a transaction in batches of duplicate
+    groups, each batch archived and deleted atomically.
+    """
+    Counterparty = apps.get_model("counterparties", "Counterparty")
+    table = schema_editor.quote_name(Counterparty._meta.db_table)
+    archive = schema_editor.quote_name(ARCHIVE_TABLE)
+
+    schema_editor.execute(
+        f"CREATE TABLE IF NOT EXISTS {archive} (LIKE {table} INCLUDING DEFAULTS)"
+    )
+
+    while True:
+        groups = list(
+            Counterparty.objects.values("contract_id", "email")
+            .annotate(copies=Count("id"))
+            .filter(copies__gt=1)
+            .order_by()[:BATCH_SIZE]
+        )
+        if not groups:
+            break
+
+        duplicate_ids = []
+        for group in groups:
+            duplicate_ids.extend(
+                Counterparty.objects.filter(
+                    contract_id=group["contract_id"], email=group["email"]
+                )
+                .order_by("-updated_at", "-id")
+                .values_list("id", flat=True)[1:]
+            )
+
+        with transaction.atomic():
+            schema_editor.execute(
+                f"INSERT INTO {archive} SELECT * FROM {table} WHERE id = ANY(%s)",
+                [duplicate_ids],
+            )
+            Counterparty.objects.filter(id__in=duplicate_ids).delete()
+
+
+def restore_duplicates(apps, schema_editor):
+    """
+    Put the archived counterparties back, except those whose contract has
+    been deleted since, and drop the archive table.
+    """
+    if ARCHIVE_TABLE not in schema_editor.connection.introspection.table_names():
+        return
+
+    Counterparty = apps.get_model("counterparties", "Counterparty")
+    Contract = apps.get_model("contracts", "Contract")
+    table = schema_editor.quote_name(Counterparty._meta.db_table)
+    contracts = schema_editor.quote_name(Contract._meta.db_table)
+    archive = schema_editor.quote_name(ARCHIVE_TABLE)
+
+    schema_editor.execute(
+        f"INSERT INTO {table} SELECT * FROM {archive} "
+        f"WHERE contract_id IN (SELECT id FROM {contracts})"
+    )
+    schema_editor.execute(f"DROP TABLE {archive}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('counterparties', '0007_populate_counterparty_directory'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, restore_duplicates),
+    ]
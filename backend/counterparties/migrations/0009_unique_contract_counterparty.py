@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counterparties', '0008_remove_duplicate_counterparties'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='counterparty',
+            constraint=models.UniqueConstraint(fields=('contract', 'email'), name='unique_contract_counterparty'),
+        ),
+    ]
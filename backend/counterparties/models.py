@@ -1,5 +1,7 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class Counterparty(models.Model):
@@ -12,6 +14,13 @@ class Counterparty(models.Model):
     contract = models.ForeignKey(
         "contracts.Contract", on_delete=models.CASCADE, related_name="counterparties"
     )
+    # denormalized from contract so tenant-scoped queries can skip the join
+    organization = models.ForeignKey(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="counterparties",
+        editable=False,
+    )
     email = models.EmailField()
     isPrimary = models.BooleanField(default=True)
     added_at = models.DateTimeField(auto_now_add=True)
@@ -19,3 +28,205 @@ class Counterparty(models.Model):
 
     class Meta:
         db_table = "counterparties"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["contract", "email"], name="unique_contract_counterparty"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["organization", "added_at"]),
+            # trigram indexes over the upper-cased values serve both the
+            # case-insensitive prefix (istartswith) and fuzzy (%) lookups
+            GinIndex(
+                OpClass(Upper("party_name"), name="gin_trgm_ops"),
+                name="counterparties_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="counterparties_email_trgm_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_link = (
+            instance.__dict__.get("contract_id"),
+            instance.__dict__.get("email"),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        # keep the denormalized organization in step with the contract
+        self.organization_id = self.contract.organization_id
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "contract" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "organization"}
+
+        super().save(*args, **kwargs)
+
+        # mirror the counterparty into the organization's directory
+        loaded_link = getattr(self, "_loaded_link", None)
+        if loaded_link and loaded_link != (self.contract_id, self.email):
+            Party.objects.unlink(*loaded_link)
+        Party.objects.sync([self])
+        self._loaded_link = (self.contract_id, self.email)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Party.objects.unlink(self.contract_id, self.email)
+        return result
+
+
+def normalize_email(email):
+    """
+    Normalize an email address for directory matching.
+    """
+    return email.strip().lower()
+
+
+class PartyManager(models.Manager):
+    def sync(self, counterparties):
+        """
+        Upsert the directory parties and contract links for the given
+        counterparties with one statement per table.
+        """
+        if not counterparties:
+            return []
+
+        parties = {}
+        for counterparty in counterparties:
+            key = (counterparty.organization_id, normalize_email(counterparty.email))
+            parties[key] = self.model(
+                organization_id=key[0],
+                normalized_email=key[1],
+                email=counterparty.email,
+                party_name=counterparty.party_name,
+                party_type=counterparty.party_type,
+            )
+
+        self.bulk_create(
+            parties.values(),
+            update_conflicts=True,
+            unique_fields=["organization", "normalized_email"],
+            update_fields=["email", "party_name", "party_type", "updated_at"],
+        )
+
+        # bulk_create keeps the generated ids of rows that hit a conflict,
+        # so read back the ids that are actually stored
+        stored_parties = self.filter(
+            organization_id__in={key[0] for key in parties},
+            normalized_email__in={key[1] for key in parties},
+        ).values_list("id", "organization_id", "normalized_email")
+        party_ids = {
+            (organization_id, normalized_email): party_id
+            for party_id, organization_id, normalized_email in stored_parties
+        }
+
+        links = {}
+        for counterparty in counterparties:
+            party_id = party_ids[
+                (counterparty.organization_id, normalize_email(counterparty.email))
+            ]
+            links[(counterparty.contract_id, party_id)] = ContractParty(
+                contract_id=counterparty.contract_id,
+                party_id=party_id,
+                isPrimary=counterparty.isPrimary,
+            )
+
+        return ContractParty.objects.bulk_create(
+            links.values(),
+            update_conflicts=True,
+            unique_fields=["contract", "party"],
+            update_fields=["isPrimary", "updated_at"],
+        )
+
+    def unlink(self, contract_id, email):
+        """
+        Remove the contract link of a directory party once no counterparty
+        on the contract uses its email anymore.
+        """
+        normalized_email = normalize_email(email)
+        if Counterparty.objects.filter(
+            contract_id=contract_id, email__iexact=normalized_email
+        ).exists():
+            return
+        ContractParty.objects.filter(
+            contract_id=contract_id, party__normalized_email=normalized_email
+        ).delete()
+
+
+class Party(models.Model):
+    """
+    Organization-wide directory entry for a company or person, shared by
+    every contract they are a counterparty on.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.CASCADE, related_name="parties"
+    )
+    party_name = models.CharField(max_length=255)
+    party_type = models.CharField(max_length=255)
+    email = models.EmailField()
+    normalized_email = models.EmailField(editable=False)
+    contracts = models.ManyToManyField(
+        "contracts.Contract", through="ContractParty", related_name="parties"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PartyManager()
+
+    class Meta:
+        db_table = "parties"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "normalized_email"],
+                name="unique_organization_party_email",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.party_name} <{self.email}>"
+
+    def save(self, *args, **kwargs):
+        self.normalized_email = normalize_email(self.email)
+        super().save(*args, **kwargs)
+
+
+class ContractParty(models.Model):
+    """
+    Link between a contract and a directory party, with the party's role on
+    that contract.
+    """
+
+    ROLE_CHOICES = {
+        "signatory": "Signatory",
+        "viewer": "Viewer",
+        "influencer": "Influencer",
+    }
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    contract = models.ForeignKey(
+        "contracts.Contract", on_delete=models.CASCADE, related_name="party_links"
+    )
+    party = models.ForeignKey(
+        Party, on_delete=models.CASCADE, related_name="contract_links"
+    )
+    role = models.CharField(max_length=50, choices=ROLE_CHOICES, default="signatory")
+    isPrimary = models.BooleanField(default=True)
+    added_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "contract_parties"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["contract", "party"], name="unique_contract_party"
+            )
+        ]
+        # the unique constraint covers contract -> parties, this covers
+        # party -> contracts
+        indexes = [models.Index(fields=["party", "contract"])]
@@ -1,4 +1,4 @@
-from counterparties.models import Counterparty
+from counterparties.models import ContractParty, Counterparty, Party
 
 from rest_framework import serializers
 
@@ -8,3 +8,53 @@ class CounterpartySerializer(serializers.ModelSerializer):
         model = Counterparty
         fields = '__all__'
         read_only_fields = ['id', 'added_at', 'updated_at']
+
+
+class CounterpartyAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Counterparty
+        fields = ['id', 'party_name', 'party_type', 'email']
+        read_only_fields = fields
+
+
+class CounterpartyAutocompleteQuerySerializer(serializers.Serializer):
+    """
+    Validates the query parameters of the counterparty autocomplete endpoint.
+    """
+
+    q = serializers.CharField(max_length=255, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class PartySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Party
+        fields = ['id', 'party_name', 'party_type', 'email', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class PartyContractSerializer(serializers.ModelSerializer):
+    """
+    A contract a directory party is linked to, with the party's role on it.
+    """
+
+    contract_title = serializers.CharField(source='contract.title', read_only=True)
+    contract_stage = serializers.CharField(source='contract.stage', read_only=True)
+
+    class Meta:
+        model = ContractParty
+        fields = ['contract', 'contract_title', 'contract_stage', 'role', 'isPrimary', 'added_at']
+        read_only_fields = fields
+
+
+class BulkCounterpartySerializer(serializers.Serializer):
+    """
+    One row of a bulk counterparty upsert. The contract is validated in bulk
+    by the view instead of one lookup per row.
+    """
+
+    contract = serializers.UUIDField()
+    party_name = serializers.CharField(max_length=255)
+    party_type = serializers.CharField(max_length=255)
+    email = serializers.EmailField()
+    isPrimary = serializers.BooleanField(default=True)
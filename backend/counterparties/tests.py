@@ -1,3 +1,239 @@
-from django.test import TestCase
+import importlib
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from contracts.models import Contract
+from counterparties.models import ContractParty, Counterparty, Party
+from organizations.models import Organization, Role, UserRole
+from users.models import User
+
+
+def create_contract(organization, title, **fields):
+    return Contract.objects.create(
+        title=title,
+        contract_type="nda",
+        organization=organization,
+        file_path=f"{organization.id}/{title}.pdf",
+        **fields,
+    )
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CounterpartyTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        self.admin = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=self.organization
+        )
+        UserRole.objects.create(
+            user=self.admin, role=Role.objects.create(name="admin", organization=self.organization)
+        )
+        self.contracts = [create_contract(self.organization, f"Contract {i}") for i in range(3)]
+        # the same party is a counterparty on every contract
+        self.counterparties = [
+            Counterparty.objects.create(
+                contract=contract, party_name="Shared", party_type="company", email="shared@party.test"
+            )
+            for contract in self.contracts
+        ]
+        self.client.force_login(self.admin)
+
+    def test_autocomplete_returns_one_match_per_email(self):
+        Counterparty.objects.create(
+            contract=self.contracts[0],
+            party_name="Sharpe",
+            party_type="person",
+            email="sharpe@party.test",
+        )
+
+        response = self.client.get("/api/counterparties/autocomplete/", {"q": "shar", "limit": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [match["email"] for match in response.json()],
+            ["shared@party.test", "sharpe@party.test"],
+        )
+
+    def test_bulk_upsert_reports_every_row(self):
+        other_contract = create_contract(Organization.objects.create(name="Other"), "Theirs")
+        contract = self.contracts[0]
+        row = {"contract": str(contract.id), "party_type": "company"}
+
+        response = self.client.post(
+            "/api/counterparties/bulk/",
+            [
+                {**row, "party_name": "First", "email": "new@bulk.test"},
+                {**row, "party_name": "Renamed", "email": "shared@party.test"},
+                {**row, "party_name": "No email"},
+                {**row, "contract": str(other_contract.id), "party_name": "Other", "email": "x@bulk.test"},
+                {**row, "party_name": "Second", "email": "new@bulk.test"},
+            ],
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["skipped", "updated", "error", "error", "created"],
+        )
+        self.assertEqual(list(results[2]["errors"]), ["email"])
+        self.assertEqual(list(results[3]["errors"]), ["contract"])
+        self.assertEqual(results[1]["id"], str(self.counterparties[0].id))
+        self.assertEqual(
+            Counterparty.objects.get(id=results[4]["id"]).party_name, "Second"
+        )
+        self.counterparties[0].refresh_from_db()
+        self.assertEqual(self.counterparties[0].party_name, "Renamed")
+        self.assertFalse(other_contract.counterparties.filter(email="x@bulk.test").exists())
+
+
+class PartyDirectoryTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        self.first, self.second = (
+            create_contract(self.organization, title) for title in ("First", "Second")
+        )
+
+    def links(self):
+        return set(ContractParty.objects.values_list("contract__title", "party__normalized_email"))
+
+    def test_parties_are_shared_by_normalized_email(self):
+        Counterparty.objects.create(
+            contract=self.first, party_name="Ann", party_type="person", email="Ann@Party.test"
+        )
+        Counterparty.objects.create(
+            contract=self.second, party_name="Ann B.", party_type="person", email="ann@party.test"
+        )
+        Counterparty.objects.create(
+            contract=create_contract(Organization.objects.create(name="Other"), "Theirs"),
+            party_name="Ann",
+            party_type="person",
+            email="ann@party.test",
+        )
+
+        party = Party.objects.get(organization=self.organization)
+        self.assertEqual((party.normalized_email, party.party_name), ("ann@party.test", "Ann B."))
+        self.assertEqual(set(party.contracts.values_list("title", flat=True)), {"First", "Second"})
+        self.assertEqual(Party.objects.count(), 2)
+
+    def test_moving_a_counterparty_moves_its_link(self):
+        counterparty = Counterparty.objects.create(
+            contract=self.first, party_name="Ann", party_type="person", email="ann@party.test"
+        )
+
+        counterparty = Counterparty.objects.get(pk=counterparty.pk)
+        counterparty.contract = self.second
+        counterparty.save()
+        self.assertEqual(self.links(), {("Second", "ann@party.test")})
+
+        counterparty = Counterparty.objects.get(pk=counterparty.pk)
+        counterparty.email = "bea@party.test"
+        counterparty.save()
+        self.assertEqual(self.links(), {("Second", "bea@party.test")})
+
+    def test_deleting_a_counterparty_unlinks_its_party(self):
+        counterparty = Counterparty.objects.create(
+            contract=self.first, party_name="Ann", party_type="person", email="ann@party.test"
+        )
+        # same party under another spelling, the link stays until both are gone
+        other_spelling = Counterparty.objects.create(
+            contract=self.first, party_name="Ann", party_type="person", email="ANN@party.test"
+        )
+
+        counterparty.delete()
+        self.assertEqual(self.links(), {("First", "ann@party.test")})
+        other_spelling.delete()
+        self.assertEqual(self.links(), set())
+        self.assertTrue(Party.objects.filter(normalized_email="ann@party.test").exists())
+
+
+class CounterpartyMigrationTests(TransactionTestCase):
+    """
+    Run the counterparty data migrations on rows created with the models
+    of the preceding migration.
+    """
+
+    def migrate(self, name):
+        executor = MigrationExecutor(connection)
+        executor.migrate([("counterparties", name)])
+        return executor.loader.project_state([("counterparties", name)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def create_contracts(self, apps, *organization_names):
+        Organization = apps.get_model("organizations", "Organization")
+        Contract = apps.get_model("contracts", "Contract")
+        return [
+            Contract.objects.create(
+                title=name,
+                contract_type="nda",
+                organization=Organization.objects.create(name=name),
+                file_path=f"{name}.pdf",
+            )
+            for name in organization_names
+        ]
+
+    def test_backfill_walks_the_primary_key_in_batches(self):
+        apps = self.migrate("0003_counterparty_organization")
+        Counterparty = apps.get_model("counterparties", "Counterparty")
+        contracts = self.create_contracts(apps, "Acme", "Other")
+        for i in range(5):
+            Counterparty.objects.create(
+                contract=contracts[i % 2], party_name=f"Party {i}", party_type="company", email=f"{i}@party.test"
+            )
+
+        migration = importlib.import_module("counterparties.migrations.0004_backfill_counterparty_organization")
+        with mock.patch.object(migration, "BATCH_SIZE", 2), CaptureQueriesContext(connection) as queries:
+            apps = self.migrate("0004_backfill_counterparty_organization")
+
+        Counterparty = apps.get_model("counterparties", "Counterparty")
+        self.assertEqual(
+            sorted(Counterparty.objects.values_list("organization__name", flat=True)),
+            ["Acme", "Acme", "Acme", "Other", "Other"],
+        )
+        updates = [query["sql"] for query in queries if query["sql"].startswith('UPDATE "counterparties"')]
+        self.assertEqual(len(updates), 3)
+        # every batch after the first starts after the previous one's last id
+        selects = [
+            query["sql"] for query in queries
+            if query["sql"].startswith('SELECT "counterparties"."id" FROM "counterparties"')
+        ]
+        self.assertEqual(len(selects), 4)
+        self.assertTrue(all('"counterparties"."id" >' in sql for sql in selects[1:]))
+
+    def test_directory_merges_counterparties_by_normalized_email(self):
+        apps = self.migrate("0006_counterparty_directory")
+        Counterparty = apps.get_model("counterparties", "Counterparty")
+        first, other = self.create_contracts(apps, "Acme", "Other")
+        Contract = apps.get_model("contracts", "Contract")
+        second = Contract.objects.create(
+            title="Second", contract_type="nda", organization_id=first.organization_id, file_path="second.pdf"
+        )
+        for contract, email in ((first, "Ann@Party.test"), (second, " ann@party.test"), (other, "ann@party.test")):
+            Counterparty.objects.create(
+                contract=contract,
+                organization_id=contract.organization_id,
+                party_name="Ann",
+                party_type="person",
+                email=email,
+            )
+
+        apps = self.migrate("0007_populate_counterparty_directory")
+
+        Party = apps.get_model("counterparties", "Party")
+        ContractParty = apps.get_model("counterparties", "ContractParty")
+        self.assertEqual(
+            sorted(Party.objects.values_list("organization__name", "normalized_email")),
+            [("Acme", "ann@party.test"), ("Other", "ann@party.test")],
+        )
+        self.assertEqual(
+            sorted(ContractParty.objects.values_list("contract__title", "party__organization__name")),
+            [("Acme", "Acme"), ("Other", "Other"), ("Second", "Acme")],
+        )
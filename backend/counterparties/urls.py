@@ -1,8 +1,12 @@
 from django.urls import path
 
-from counterparties.views import CounterpartyListCreateView, CounterpartyRetrieveUpdateDestroyView
+from counterparties.views import CounterpartyAutocompleteView, CounterpartyBulkUpsertView, CounterpartyListCreateView, CounterpartyRetrieveUpdateDestroyView, PartyContractsView, PartyListView
 
 urlpatterns = [
     path('', CounterpartyListCreateView.as_view(), name='list-create-counterparties'),
+    path('bulk/', CounterpartyBulkUpsertView.as_view(), name='bulk-upsert-counterparties'),
+    path('autocomplete/', CounterpartyAutocompleteView.as_view(), name='autocomplete-counterparties'),
+    path('directory/', PartyListView.as_view(), name='list-parties'),
+    path('directory/<uuid:pk>/contracts/', PartyContractsView.as_view(), name='list-party-contracts'),
     path('<uuid:pk>/', CounterpartyRetrieveUpdateDestroyView.as_view(), name='counterparty-retrieve-update-destroy')
 ]
\ No newline at end of file
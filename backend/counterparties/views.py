@@ -1,10 +1,22 @@
 from contracts.models import Contract
 from core.permissions import IsOrganizationAdmin
-from counterparties.models import Counterparty
-from counterparties.serializers import CounterpartySerializer
+from counterparties.models import ContractParty, Counterparty, Party
+from counterparties.serializers import (
+    BulkCounterpartySerializer,
+    CounterpartyAutocompleteQuerySerializer,
+    CounterpartyAutocompleteSerializer,
+    CounterpartySerializer,
+    PartyContractSerializer,
+    PartySerializer,
+)
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q, Window
+from django.db.models.functions import Greatest, Lower, RowNumber, Upper
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
@@ -18,8 +30,8 @@ class CounterpartyListCreateView(generics.ListCreateAPIView):
     serializer_class = CounterpartySerializer
 
     def get_queryset(self):
-        organization = self.request.user.organization
-        return Counterparty.objects.filter(contract__organization=organization)
+        organization_id = self.request.user.organization_id
+        return Counterparty.objects.filter(organization_id=organization_id)
 
     def create(self, request, *args, **kwargs):
         """
@@ -29,7 +41,7 @@ class CounterpartyListCreateView(generics.ListCreateAPIView):
         contract_id = request.data.get("contract")
         contract = get_object_or_404(Contract, id=contract_id)
 
-        if contract.organization != user.organization:
+        if contract.organization_id != user.organization_id:
             return Response(
                 {"error": "The contract does not belong user's organization"},
                 status=status.HTTP_403_FORBIDDEN,
@@ -42,6 +54,175 @@ class CounterpartyListCreateView(generics.ListCreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class CounterpartyBulkUpsertView(APIView):
+    """
+    Create or update many counterparties, across one or more contracts, in
+    one request.
+
+    Expects a list of counterparties. Rows are matched on (contract, email):
+    an existing counterparty is updated, otherwise a new one is created.
+    Every row gets a result with its status ("created", "updated", "skipped"
+    or "error"), in request order.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
+
+    MAX_ROWS = 1000
+
+    def post(self, request, *args, **kwargs):
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"error": "Expected a non-empty list of counterparties"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(rows) > self.MAX_ROWS:
+            return Response(
+                {"error": f"At most {self.MAX_ROWS} counterparties can be sent at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(rows)
+        valid_rows = {}
+        for index, row in enumerate(rows):
+            serializer = BulkCounterpartySerializer(data=row)
+            if serializer.is_valid():
+                valid_rows[index] = serializer.validated_data
+            else:
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+
+        # authorize every referenced contract with a single query
+        contract_ids = {data["contract"] for data in valid_rows.values()}
+        owned_contract_ids = set(
+            Contract.objects.filter(
+                id__in=contract_ids, organization_id=request.user.organization_id
+            ).values_list("id", flat=True)
+        )
+
+        # the last row wins when the same (contract, email) is sent twice
+        rows_by_key = {}
+        for index, data in valid_rows.items():
+            if data["contract"] not in owned_contract_ids:
+                results[index] = {
+                    "index": index,
+                    "status": "error",
+                    "errors": {
+                        "contract": ["The contract does not belong user's organization"]
+                    },
+                }
+                continue
+            key = (data["contract"], data["email"])
+            if key in rows_by_key:
+                results[rows_by_key[key]] = {
+                    "index": rows_by_key[key],
+                    "status": "skipped",
+                    "errors": {"email": ["Superseded by a later row for the same contract"]},
+                }
+            rows_by_key[key] = index
+
+        if rows_by_key:
+            existing_keys = set(
+                Counterparty.objects.filter(
+                    contract_id__in={key[0] for key in rows_by_key},
+                    email__in={key[1] for key in rows_by_key},
+                ).values_list("contract_id", "email")
+            )
+
+            counterparties = [
+                Counterparty(
+                    contract_id=valid_rows[index]["contract"],
+                    organization_id=request.user.organization_id,
+                    party_name=valid_rows[index]["party_name"],
+                    party_type=valid_rows[index]["party_type"],
+                    email=valid_rows[index]["email"],
+                    isPrimary=valid_rows[index]["isPrimary"],
+                )
+                for index in rows_by_key.values()
+            ]
+            with transaction.atomic():
+                Counterparty.objects.bulk_create(
+                    counterparties,
+                    update_conflicts=True,
+                    unique_fields=["contract", "email"],
+                    update_fields=["party_name", "party_type", "isPrimary", "updated_at"],
+                )
+                Party.objects.sync(counterparties)
+
+            # bulk_create keeps the generated ids of updated rows, read back
+            # the stored ones
+            stored_ids = {
+                (contract_id, email): counterparty_id
+                for counterparty_id, contract_id, email in Counterparty.objects.filter(
+                    contract_id__in={key[0] for key in rows_by_key},
+                    email__in={key[1] for key in rows_by_key},
+                ).values_list("id", "contract_id", "email")
+            }
+
+            for key, index in rows_by_key.items():
+                results[index] = {
+                    "index": index,
+                    "status": "updated" if key in existing_keys else "created",
+                    "id": str(stored_ids[key]),
+                }
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class CounterpartyAutocompleteView(generics.GenericAPIView):
+    """
+    Typeahead search over the counterparties of user's organization.
+
+    Matches `q` as a case-insensitive prefix or a fuzzy (trigram) match of
+    party_name and email and returns the best `limit` matches, one per email.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
+    serializer_class = CounterpartyAutocompleteSerializer
+
+    def get(self, request, *args, **kwargs):
+        query_serializer = CounterpartyAutocompleteQuerySerializer(
+            data=request.query_params
+        )
+        query_serializer.is_valid(raise_exception=True)
+        term = query_serializer.validated_data["q"]
+        limit = query_serializer.validated_data["limit"]
+
+        # compare upper-cased values so the lookups match the trigram indexes
+        upper_term = term.upper()
+        is_prefix_match = Q(party_name__istartswith=term) | Q(email__istartswith=term)
+
+        ranking = [F("is_prefix").desc(), F("similarity").desc(), F("party_name").asc()]
+        # one row per email, the best ranked, deduplicated in the database so
+        # a party on many contracts cannot crowd out the other matches
+        results = (
+            Counterparty.objects.filter(organization_id=request.user.organization_id)
+            .alias(party_name_upper=Upper("party_name"), email_upper=Upper("email"))
+            .filter(
+                is_prefix_match
+                | Q(party_name_upper__trigram_similar=upper_term)
+                | Q(email_upper__trigram_similar=upper_term)
+            )
+            .annotate(
+                is_prefix=ExpressionWrapper(is_prefix_match, output_field=BooleanField()),
+                similarity=Greatest(
+                    TrigramSimilarity(Upper("party_name"), upper_term),
+                    TrigramSimilarity(Upper("email"), upper_term),
+                ),
+            )
+            .annotate(
+                email_rank=Window(
+                    RowNumber(), partition_by=[Lower("email")], order_by=ranking
+                )
+            )
+            .filter(email_rank=1)
+            .order_by(*ranking)
+            .only("id", "party_name", "party_type", "email")[:limit]
+        )
+
+        serializer = self.get_serializer(results, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class CounterpartyRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a counterparty.
@@ -57,11 +238,10 @@ class CounterpartyRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         and return it. If not, raise PermissionDenied.
         """
         user = request.user
-        organization = user.organization
 
         counterparty = self.get_object()
 
-        if counterparty.contract.organization != organization:
+        if counterparty.organization_id != user.organization_id:
             raise PermissionDenied(
                 {"error": "The counterparty is not associated with user's organization"}
             )
@@ -100,3 +280,41 @@ class CounterpartyRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
             {"message": "Counterparty deleted successfully"},
             status=status.HTTP_204_NO_CONTENT,
         )
+
+
+class PartyListView(generics.ListAPIView):
+    """
+    List the counterparty directory of user's organization.
+
+    Every company or person appears once, however many contracts they are on.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
+    serializer_class = PartySerializer
+
+    def get_queryset(self):
+        organization_id = self.request.user.organization_id
+        return Party.objects.filter(organization_id=organization_id).order_by(
+            "party_name", "id"
+        )
+
+
+class PartyContractsView(generics.ListAPIView):
+    """
+    List the contracts a directory party is linked to.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin]
+    serializer_class = PartyContractSerializer
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ContractParty.objects.none()
+        party = get_object_or_404(
+            Party, pk=self.kwargs["pk"], organization_id=self.request.user.organization_id
+        )
+        return (
+            ContractParty.objects.filter(party=party)
+            .select_related("contract")
+            .order_by("-added_at")
+        )
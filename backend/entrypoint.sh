@@ -8,31 +8,13 @@ if [ -z "$DATABASE_URL" ]; then
   exit 1
 fi
 
-echo "Waiting for PostgreSQL..."
-
-# Wait until PostgreSQL is available
-until python -c "
-import psycopg2
-from urllib.parse import urlparse
-url = urlparse('$DATABASE_URL')
-conn = psycopg2.connect(
-    dbname=url.path[1:],
-    user=url.username,
-    password=url.password,
-    host=url.hostname,
-    port=url.port
-)
-conn.close()
-"; do
-  echo "PostgreSQL is unavailable - sleeping"
-  sleep 1
-done
-
-echo "PostgreSQL is up - executing migrations"
-
-# Apply migrations
-echo "Running migrations..."
-python manage.py migrate --noinput
+# Workers write their metrics here so /metrics can aggregate them
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Wait for PostgreSQL and apply migrations, skipped when the schema is current
+python manage.py prepare_startup
 
 # Collect static files (optional)
 if [[ "$COLLECT_STATIC" == "1" ]]; then
@@ -40,11 +22,36 @@ if [[ "$COLLECT_STATIC" == "1" ]]; then
   python manage.py collectstatic --noinput
 fi
 
+# Deliver queued emails in the background, invitations are only sent by
+# this worker; set RUN_OUTBOX_WORKER=0 when it runs in its own container
+if [[ "$RUN_OUTBOX_WORKER" != "0" ]]; then
+  echo "Starting email outbox worker..."
+  python manage.py send_outbox_emails --loop &
+else
+  echo "Warning: email outbox worker disabled, queued emails are not sent from this container"
+fi
+
+# Run organization deletions and purge their S3 files in the background, the
+# DELETE endpoint only schedules them; set RUN_DELETION_WORKER=0 when they run
+# in their own container
+if [[ "$RUN_DELETION_WORKER" != "0" ]]; then
+  echo "Starting organization deletion worker..."
+  python manage.py process_organization_deletions --loop &
+  python manage.py purge_s3_objects --loop &
+else
+  echo "Warning: organization deletion worker disabled, scheduled deletions and S3 purges do not run from this container"
+fi
+
+# Prune expired invitations, tokens and old outbox emails every hour; set
+# RUN_PRUNE_WORKER=0 when it runs in its own container or from cron
+if [[ "$RUN_PRUNE_WORKER" != "0" ]]; then
+  echo "Starting expired rows pruning worker..."
+  python manage.py prune_expired --loop &
+else
+  echo "Warning: pruning worker disabled, expired rows are not deleted from this container"
+fi
+
 # Start Gunicorn server
 echo "Starting Gunicorn..."
-exec gunicorn clm.wsgi:application \
-    --bind 0.0.0.0:$PORT \
-    --workers 3 \
-    --threads 2 \
-    --timeout 0
+exec gunicorn clm.wsgi:application --config gunicorn.conf.py
 
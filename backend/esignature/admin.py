@@ -0,0 +1,5 @@
+from django.contrib import admin
+
+from esignature.models import SignatureAPISenderProfile
+
+admin.site.register(SignatureAPISenderProfile)
@@ -0,0 +1,49 @@
+import requests
+from core.metrics import outbound_call
+from django.conf import settings
+
+
+def create_envelope(envelope_data):
+    """
+    Make request to signatureAPI to create an envelope and start the signing process,
+    sending the documents to the recipients.
+    """
+    headers = {"X-API-Key": settings.SIGNATUREAPI_API_KEY}
+
+    with outbound_call("signatureapi", "create_envelope") as call:
+        response = requests.post(
+            f"{settings.SIGNATUREAPI_BASE_URL}envelopes", json=envelope_data, headers=headers
+        )
+        call.status = response.status_code
+
+    return response
+
+
+def create_sender(email):
+    headers = {"X-API-Key": settings.SIGNATUREAPI_API_KEY}
+
+    with outbound_call("signatureapi", "create_sender") as call:
+        response = requests.post(
+            f"{settings.SIGNATUREAPI_BASE_URL}senders", json={"email": email}, headers=headers
+        )
+        call.status = response.status_code
+
+    return response
+
+
+def get_sender(sender_id):
+    headers = {"X-API-Key": settings.SIGNATUREAPI_API_KEY}
+
+    with outbound_call("signatureapi", "get_sender") as call:
+        response = requests.get(
+            f"{settings.SIGNATUREAPI_BASE_URL}senders/{sender_id}", headers=headers
+        )
+        call.status = response.status_code
+    return response
+
+
+# def get_sender_status(sender_id):
+#     sender = get_sender(sender_id)
+
+#     if sender.ok:
+#         return sender.json()["status"]
@@ -0,0 +1,26 @@
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "3"))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "0"))
+
+# Load Django once in the master and fork the workers from it, so they
+# start without importing anything and share the loaded code in memory
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+
+def when_ready(server):
+    if preload_app:
+        from core.startup import warm_up
+
+        warm_up()
+        server.log.info("Application warmed up before forking workers")
+
+
+def child_exit(server, worker):
+    # keep the metrics of a finished worker without treating it as live
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OrganizationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'organizations'
+
+    def ready(self):
+        # registers the permission cache invalidation signals
+        from organizations import permissions  # noqa: F401
@@ -0,0 +1,186 @@
+import logging
+import time
+from datetime import timedelta
+
+from authentication.models import Invitation, OutboundEmail
+from contracts.models import Contract, PendingObjectDeletion
+from core import tracing
+from counterparties.models import ContractParty, Counterparty, Party
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from organizations.models import Organization, OrganizationDeletionJob, Role, UserRole
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+# a running job whose worker has not reported for this long is taken over
+JOB_LEASE = timedelta(minutes=5)
+
+# Tables emptied in order, leaves first, so each batch delete finds nothing
+# left to cascade into. Every step is idempotent, so an interrupted job
+# resumes by re-running its current step.
+STEPS = [
+    ("email_outbox", lambda org_id: OutboundEmail.objects.filter(
+        Q(invitation__organization_id=org_id)
+        | Q(invitation__invited_by__organization_id=org_id)
+    )),
+    ("invitations", lambda org_id: Invitation.objects.filter(
+        Q(organization_id=org_id) | Q(invited_by__organization_id=org_id)
+    )),
+    ("contract_parties", lambda org_id: ContractParty.objects.filter(
+        contract__organization_id=org_id
+    )),
+    ("counterparties", lambda org_id: Counterparty.objects.filter(organization_id=org_id)),
+    ("parties", lambda org_id: Party.objects.filter(organization_id=org_id)),
+    ("contracts", lambda org_id: Contract.objects.filter(organization_id=org_id)),
+    ("user_roles", lambda org_id: UserRole.objects.filter(
+        Q(role__organization_id=org_id) | Q(user__organization_id=org_id)
+    )),
+    ("roles", lambda org_id: Role.objects.filter(organization_id=org_id)),
+    ("blacklisted_tokens", lambda org_id: BlacklistedToken.objects.filter(
+        token__user__organization_id=org_id
+    )),
+    ("outstanding_tokens", lambda org_id: OutstandingToken.objects.filter(
+        user__organization_id=org_id
+    )),
+    ("users", lambda org_id: User.objects.filter(organization_id=org_id)),
+    ("organization", lambda org_id: Organization.objects.filter(id=org_id)),
+]
+
+
+def schedule_deletion(organization, requested_by):
+    """
+    Return the organization's deletion job, creating it or re-queueing a
+    failed one.
+    """
+    job = (
+        OrganizationDeletionJob.objects.filter(organization_id=organization.id)
+        .exclude(status="done")
+        .first()
+    )
+    if job is None:
+        return OrganizationDeletionJob.objects.create(
+            organization_id=organization.id,
+            organization_name=organization.name,
+            requested_by=requested_by,
+            trace_context=tracing.inject(),
+        )
+    if job.status == "failed":
+        job.status = "pending"
+        job.error = ""
+        job.trace_context = tracing.inject()
+        job.save(update_fields=["status", "error", "trace_context"])
+    return job
+
+
+def claim_job():
+    """
+    Claim the oldest pending job, or a running one whose worker went away.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            OrganizationDeletionJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="pending")
+                | Q(status="running", heartbeat_at__lt=now - JOB_LEASE)
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "running"
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        job.save(update_fields=["status", "started_at", "heartbeat_at"])
+    return job
+
+
+def queue_contract_files(contracts):
+    PendingObjectDeletion.objects.bulk_create(
+        [
+            PendingObjectDeletion(key=key)
+            for key in contracts.values_list("file_path", flat=True)
+            if key
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def delete_batch(label, queryset, batch_size):
+    """
+    Delete up to batch_size rows of the queryset and return how many were
+    deleted. Contract files are queued for S3 deletion in the same
+    transaction.
+    """
+    model = queryset.model
+    rows = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        if label == "contracts":
+            queue_contract_files(Contract.objects.filter(pk__in=rows))
+        elif label == "organization":
+            # Contracts created after the contracts step are removed by the
+            # cascade below, queue their files too. The row lock blocks new
+            # rows referencing the organization until it is gone.
+            list(Organization.objects.select_for_update().filter(pk__in=rows))
+            queue_contract_files(Contract.objects.filter(organization_id__in=rows))
+        model.objects.filter(pk__in=rows).delete()
+    return len(rows)
+
+
+def run_job(job, batch_size, pause=0, on_batch=None):
+    """
+    Work through the job's steps from where it left off. Progress is saved
+    after every batch. Rows created behind the current step are removed by
+    the cascade of the final organization delete, which queues the files
+    of such contracts first.
+    """
+    org_id = job.organization_id
+    if not job.totals:
+        job.totals = {label: queryset(org_id).count() for label, queryset in STEPS}
+        job.save(update_fields=["totals"])
+
+    labels = [label for label, _ in STEPS]
+    start = labels.index(job.step) if job.step in labels else 0
+    # batches are traced under the request that scheduled the job
+    trace_context = tracing.extract(job.trace_context)
+
+    try:
+        for label, queryset in STEPS[start:]:
+            job.step = label
+            while True:
+                with tracing.span(
+                    f"delete {label}",
+                    attributes={"organization.id": str(org_id), "batch_size": batch_size},
+                    context=trace_context,
+                ), tracing.traced_queries():
+                    deleted = delete_batch(label, queryset(org_id), batch_size)
+                job.progress[label] = job.progress.get(label, 0) + deleted
+                job.heartbeat_at = timezone.now()
+                job.save(update_fields=["step", "progress", "heartbeat_at"])
+                if on_batch and deleted:
+                    on_batch(job, label, deleted)
+                if deleted < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+    except Exception as e:
+        logger.error(f"Deletion of organization {org_id} failed at {job.step}: {e}", exc_info=True)
+        job.status = "failed"
+        job.error = str(e)
+        job.save(update_fields=["status", "error"])
+        raise
+
+    job.status = "done"
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+    return job
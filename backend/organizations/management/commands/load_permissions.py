@@ -1,17 +1,62 @@
 import json
 import os
-from django.core.management.base import BaseCommand
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from organizations.models import Role, Organization
+from organizations.permissions import (
+    compile_permissions,
+    invalidate_organization_permissions,
+)
 
 
 class Command(BaseCommand):
-    help = 'Load default permissions into the database'
+    help = (
+        'Load default permissions into the database. Without --organization or --all '
+        'the roles go to the "Default Organization", as before.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            action='append',
+            default=[],
+            help='Organization id or name to update, can be repeated',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Apply the permissions to every organization',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Organizations handled per transaction',
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='Replace the permissions of existing roles that differ from the file; '
+                 'by default only missing roles are created and customised ones are kept',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the roles that would be created or changed without writing',
+        )
+        parser.add_argument(
+            '--file',
+            help='Permissions file to load instead of default_permissions.json',
+        )
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
         # Get the path to the directory containing manage.py
         base_dir = os.path.dirname(os.path.abspath(__file__))
         root_dir = os.path.abspath(os.path.join(base_dir, "../../../"))
-        permissions_file = os.path.join(root_dir, 'default_permissions.json')
+        permissions_file = options['file'] or os.path.join(root_dir, 'default_permissions.json')
 
         # Check if the file exists
         if not os.path.exists(permissions_file):
@@ -22,14 +67,128 @@ class Command(BaseCommand):
         with open(permissions_file, 'r') as file:
             permissions = json.load(file)
 
-        # Assign roles to a default organization (replace with a specific org ID if needed)
-        default_organization, _ = Organization.objects.get_or_create(name="Default Organization")
+        organizations = self.get_organizations(options)
+
+        started = time.monotonic()
+        totals = {'organizations': 0, 'created': 0, 'updated': 0, 'kept': 0, 'unchanged': 0}
+        last_id = None
+
+        while True:
+            chunk = organizations.order_by('id')
+            if last_id is not None:
+                chunk = chunk.filter(id__gt=last_id)
+            chunk = list(chunk.values_list('id', 'name')[:options['chunk_size']])
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
 
-        for role_name, perms in permissions.items():
-            Role.objects.get_or_create(
-                name=role_name,
-                organization=default_organization,  # Ensure roles are tied to an organization
-                defaults={"permissions": perms}
+            chunk_started = time.monotonic()
+            counts = self.apply(chunk, permissions, options['dry_run'], options['overwrite'])
+            for key, value in counts.items():
+                totals[key] += value
+            totals['organizations'] += len(chunk)
+
+            elapsed = time.monotonic() - chunk_started
+            self.stdout.write(
+                f"{totals['organizations']} organizations: "
+                f"{counts['created']} created, {counts['updated']} updated, "
+                f"{counts['kept']} kept, {counts['unchanged']} unchanged "
+                f"({len(chunk) / elapsed if elapsed else 0:.0f} organizations/s)"
             )
 
-        self.stdout.write(self.style.SUCCESS('Default permissions loaded successfully!'))
+        elapsed = time.monotonic() - started
+        verb = 'would be' if options['dry_run'] else 'were'
+        self.stdout.write(self.style.SUCCESS(
+            f"Default permissions loaded successfully! {totals['created']} roles {verb} created, "
+            f"{totals['updated']} {verb} updated, {totals['kept']} customised were kept and "
+            f"{totals['unchanged']} were unchanged across "
+            f"{totals['organizations']} organizations in {elapsed:.1f}s "
+            f"({totals['organizations'] / elapsed if elapsed else 0:.0f} organizations/s)"
+        ))
+
+    def get_organizations(self, options):
+        if options['all']:
+            return Organization.objects.all()
+
+        if not options['organization']:
+            default_organization, _ = Organization.objects.get_or_create(name="Default Organization")
+            return Organization.objects.filter(id=default_organization.id)
+
+        ids, names = [], []
+        for value in options['organization']:
+            try:
+                ids.append(Organization._meta.pk.to_python(value))
+            except ValidationError:
+                names.append(value)
+        organizations = Organization.objects.filter(id__in=ids) | Organization.objects.filter(name__in=names)
+
+        found = {str(pk) for pk in organizations.values_list('id', flat=True)}
+        found |= set(organizations.values_list('name', flat=True))
+        missing = [value for value in options['organization'] if value not in found]
+        if missing:
+            raise CommandError(f"Organizations not found: {', '.join(missing)}")
+        return organizations
+
+    def apply(self, chunk, permissions, dry_run, overwrite):
+        """
+        Diff the template against the chunk's roles with one query and write
+        the differences with a single statement. Roles whose permissions
+        differ from the template are only overwritten with overwrite.
+        """
+        organization_names = dict(chunk)
+        existing = {
+            (organization_id, name): role_permissions
+            for organization_id, name, role_permissions in Role.objects.filter(
+                organization_id__in=organization_names, name__in=permissions
+            ).values_list('organization_id', 'name', 'permissions')
+        }
+
+        counts = {'created': 0, 'updated': 0, 'kept': 0, 'unchanged': 0}
+        roles = []
+        for organization_id in organization_names:
+            for role_name, perms in permissions.items():
+                key = (organization_id, role_name)
+                if key not in existing:
+                    action = 'created'
+                elif existing[key] == perms:
+                    counts['unchanged'] += 1
+                    continue
+                elif not overwrite:
+                    counts['kept'] += 1
+                    continue
+                else:
+                    action = 'updated'
+
+                counts[action] += 1
+                if dry_run:
+                    self.stdout.write(
+                        f"  {organization_names[organization_id]}: {role_name} would be {action}"
+                        + (f" ({existing[key]} -> {perms})" if action == 'updated' else f" ({perms})")
+                    )
+                    continue
+
+                roles.append(Role(
+                    name=role_name,
+                    organization_id=organization_id,
+                    permissions=perms,
+                    # bulk_create skips Role.save, so compile the mask here
+                    permission_mask=compile_permissions(perms, role_name),
+                ))
+
+        if roles:
+            with transaction.atomic():
+                if overwrite:
+                    Role.objects.bulk_create(
+                        roles,
+                        update_conflicts=True,
+                        unique_fields=['name', 'organization'],
+                        update_fields=['permissions', 'permission_mask', 'updated_at'],
+                    )
+                else:
+                    # a role created since the diff is left alone, as get_or_create did
+                    Role.objects.bulk_create(roles, ignore_conflicts=True)
+            # bulk writes skip the signals that invalidate the permission cache
+            for organization_id in {role.organization_id for role in roles}:
+                invalidate_organization_permissions(organization_id)
+
+        return counts
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from organizations.deletion import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued organization deletion jobs in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows deleted per table per transaction',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches to limit database load',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for jobs instead of stopping when none are left',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='Seconds to wait between polls when there is no job (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_job()
+            if job is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f"Deleting organization {job.organization_name} ({job.organization_id})")
+            try:
+                run_job(job, options['batch_size'], options['pause'], on_batch=self.report)
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f"Failed at {job.step}: {e}"))
+                continue
+
+            self.stdout.write(self.style.SUCCESS(f"Deleted organization {job.organization_name}"))
+
+    def report(self, job, label, deleted):
+        self.stdout.write(
+            f"  {label}: {job.progress[label]}/{job.totals.get(label, '?')} (+{deleted})"
+        )
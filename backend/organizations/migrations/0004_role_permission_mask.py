@@ -0,0 +1,87 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# The permission bits as they were when this migration was written, so it
+# keeps computing the same masks whatever organizations.permissions becomes.
+ALL_PERMISSIONS = 0xffff
+PERMISSION_BITS = {
+    'contracts.view': 0x1,
+    'contracts.create': 0x2,
+    'contracts.change': 0x4,
+    'contracts.delete': 0x8,
+    'counterparties.view': 0x10,
+    'counterparties.change': 0x20,
+    'counterparties.delete': 0x40,
+    'users.view': 0x80,
+    'users.invite': 0x100,
+    'users.manage': 0x200,
+    'roles.manage': 0x400,
+    'permissions.manage': 0x800,
+    'organization.view': 0x1000,
+    'organization.manage': 0x2000,
+    'organization.delete': 0x4000,
+    'esignature.send': 0x8000,
+    'FULL_ACCESS': 0xffff,
+    'READ': 0x1091,
+    'WRITE': 0x26,
+    'DELETE': 0x48,
+    'can_invite': 0x100,
+    'can_manage_users': 0x280,
+    'can_manage_roles': 0x400,
+    'can_manage_permissions': 0x800,
+    'can_manage_organization': 0x3000,
+    'is_organization_admin': 0xffff,
+    'create_organization': 0x2000,
+    'delete_organization': 0x4000,
+    'assign_roles': 0x400,
+    'manage_users': 0x280,
+    'update_permissions': 0x800,
+    'view_organization': 0x1000,
+    'view_users': 0x80,
+    'submit_requests': 0x3,
+}
+
+
+def compile_permissions(permissions, role_name):
+    if role_name == 'admin':
+        return ALL_PERMISSIONS
+    if isinstance(permissions, dict):
+        names = [name for name, granted in permissions.items() if granted]
+    else:
+        names = permissions or []
+    mask = 0
+    for name in names:
+        mask |= PERMISSION_BITS.get(name, 0)
+    return mask
+
+
+def compile_role_permissions(apps, schema_editor):
+    Role = apps.get_model('organizations', 'Role')
+    last_id = 0
+    while True:
+        roles = list(Role.objects.filter(id__gt=last_id).order_by('id')[:BATCH_SIZE])
+        if not roles:
+            break
+        for role in roles:
+            role.permission_mask = compile_permissions(role.permissions, role.name)
+        Role.objects.bulk_update(roles, ['permission_mask'])
+        last_id = roles[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0003_alter_role_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='role',
+            name='permission_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(compile_role_permissions, migrations.RunPython.noop),
+    ]
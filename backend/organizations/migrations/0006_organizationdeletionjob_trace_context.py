@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0005_organization_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizationdeletionjob',
+            name='trace_context',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
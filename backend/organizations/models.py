@@ -30,6 +30,8 @@ class Role(models.Model):
         Organization, on_delete=models.CASCADE, related_name="roles"
     )
     permissions = models.JSONField(default=list)
+    # permissions compiled against organizations.permissions.PERMISSIONS
+    permission_mask = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -43,6 +45,17 @@ class Role(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        from organizations.permissions import compile_permissions
+
+        self.permission_mask = compile_permissions(self.permissions, self.name)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "permission_mask"}
+
+        super().save(*args, **kwargs)
+
 
 class UserRole(models.Model):
     """
@@ -60,3 +73,44 @@ class UserRole(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["user", "role"], name="unique_user_role")
         ]
+
+
+class OrganizationDeletionJob(models.Model):
+    """
+    Background deletion of an organization and everything it owns, run by
+    `python manage.py process_organization_deletions` one bounded batch at a
+    time so large tenants never hold locks or memory for long.
+    """
+
+    STATUS_CHOICES = {
+        "pending": "Pending",
+        "running": "Running",
+        "done": "Done",
+        "failed": "Failed",
+    }
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # not a foreign key, the job outlives the organization
+    organization_id = models.UUIDField(db_index=True)
+    organization_name = models.CharField(max_length=255)
+    requested_by = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    step = models.CharField(max_length=50, blank=True)
+    totals = models.JSONField(default=dict)
+    progress = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # trace context of the request that scheduled the deletion, see core.tracing
+    trace_context = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = "organization_deletion_jobs"
+
+    def __str__(self):
+        return f"Deletion of {self.organization_name} ({self.status})"
+
@@ -0,0 +1,192 @@
+import logging
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.caching import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+# Each permission owns one bit of Role.permission_mask, by position. Only
+# ever append to this list, otherwise stored masks change meaning.
+PERMISSIONS = [
+    "contracts.view",
+    "contracts.create",
+    "contracts.change",
+    "contracts.delete",
+    "counterparties.view",
+    "counterparties.change",
+    "counterparties.delete",
+    "users.view",
+    "users.invite",
+    "users.manage",
+    "roles.manage",
+    "permissions.manage",
+    "organization.view",
+    "organization.manage",
+    "organization.delete",
+    "esignature.send",
+]
+
+PERMISSION_BITS = {name: 1 << position for position, name in enumerate(PERMISSIONS)}
+ALL_PERMISSIONS = (1 << len(PERMISSIONS)) - 1
+
+
+def mask_for(*names):
+    """
+    Return the bitmask of the given registry names. Raises KeyError for an
+    unknown name, so typos fail at import time.
+    """
+    mask = 0
+    for name in names:
+        mask |= PERMISSION_BITS[name]
+    return mask
+
+
+# Names used by the existing role data, mapped onto the registry
+LEGACY_PERMISSIONS = {
+    # RoleSerializer
+    "FULL_ACCESS": ALL_PERMISSIONS,
+    "READ": mask_for(
+        "contracts.view", "counterparties.view", "users.view", "organization.view"
+    ),
+    "WRITE": mask_for("contracts.create", "contracts.change", "counterparties.change"),
+    "DELETE": mask_for("contracts.delete", "counterparties.delete"),
+    # admin role created with an organization
+    "can_invite": mask_for("users.invite"),
+    "can_manage_users": mask_for("users.view", "users.manage"),
+    "can_manage_roles": mask_for("roles.manage"),
+    "can_manage_permissions": mask_for("permissions.manage"),
+    "can_manage_organization": mask_for("organization.view", "organization.manage"),
+    "is_organization_admin": ALL_PERMISSIONS,
+    # default_permissions.json
+    "create_organization": mask_for("organization.manage"),
+    "delete_organization": mask_for("organization.delete"),
+    "assign_roles": mask_for("roles.manage"),
+    "manage_users": mask_for("users.view", "users.manage"),
+    "update_permissions": mask_for("permissions.manage"),
+    "view_organization": mask_for("organization.view"),
+    "view_users": mask_for("users.view"),
+    "submit_requests": mask_for("contracts.view", "contracts.create"),
+}
+
+KNOWN_PERMISSIONS = {**PERMISSION_BITS, **LEGACY_PERMISSIONS}
+
+
+def compile_permissions(permissions, role_name=None):
+    """
+    Compile a Role.permissions value, either a list of names or a dict of
+    name to flag, into a bitmask. The admin role always gets every
+    permission, as IsOrganizationAdmin already grants it everything.
+    """
+    if role_name == "admin":
+        return ALL_PERMISSIONS
+
+    if isinstance(permissions, dict):
+        names = [name for name, granted in permissions.items() if granted]
+    else:
+        names = permissions or []
+
+    mask = 0
+    for name in names:
+        if name not in KNOWN_PERMISSIONS:
+            logger.warning(f"Ignoring unknown permission {name!r}")
+            continue
+        mask |= KNOWN_PERMISSIONS[name]
+    return mask
+
+
+def bump_version(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def organization_version_key(organization_id):
+    return f"permissions:organization:{organization_id}"
+
+
+def user_version_key(user_id):
+    return f"permissions:user:{user_id}"
+
+
+def invalidate_organization_permissions(organization_id):
+    """
+    Drop the cached permission masks of every member of an organization.
+    Call this after bulk changes to roles, which skip the signals below.
+    """
+    bump_version(organization_version_key(organization_id))
+
+
+def invalidate_user_permissions(*user_ids):
+    """
+    Drop the cached permission masks of the given users. Call this after
+    bulk changes to role assignments, which skip the signals below.
+    """
+    for user_id in user_ids:
+        bump_version(user_version_key(user_id))
+
+
+def user_permission_mask(user):
+    """
+    Return the union of the permission masks of the user's roles in their
+    organization. Cached per user until their roles or the organization's
+    roles change.
+    """
+    if not user.is_authenticated:
+        return 0
+    if user.is_superuser:
+        return ALL_PERMISSIONS
+    if getattr(user, "_permission_mask", None) is not None:
+        return user._permission_mask
+
+    # another worker's invalidation never reaches a per-process cache, so
+    # masks are only cached when the cache is shared
+    if not is_shared_cache():
+        user._permission_mask = load_permission_mask(user)
+        return user._permission_mask
+
+    organization_key = organization_version_key(user.organization_id)
+    user_key = user_version_key(user.pk)
+    versions = cache.get_many([organization_key, user_key])
+    key = (
+        f"permissions:{user.organization_id}:{versions.get(organization_key, 0)}"
+        f":{user.pk}:{versions.get(user_key, 0)}"
+    )
+    mask = cache.get(key)
+    if mask is None:
+        mask = load_permission_mask(user)
+        cache.set(key, mask)
+
+    user._permission_mask = mask
+    return mask
+
+
+def load_permission_mask(user):
+    """
+    Return the union of the permission masks of the user's roles, read
+    from the database.
+    """
+    from organizations.models import Role
+
+    mask = 0
+    for role_mask in Role.objects.filter(
+        userrole__user_id=user.pk, organization_id=user.organization_id
+    ).values_list("permission_mask", flat=True):
+        mask |= role_mask
+    return mask
+
+
+@receiver(post_save, sender="organizations.Role")
+@receiver(post_delete, sender="organizations.Role")
+def role_changed(sender, instance, **kwargs):
+    invalidate_organization_permissions(instance.organization_id)
+
+
+@receiver(post_save, sender="organizations.UserRole")
+@receiver(post_delete, sender="organizations.UserRole")
+def user_role_changed(sender, instance, **kwargs):
+    invalidate_user_permissions(instance.user_id)
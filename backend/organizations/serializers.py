@@ -1,4 +1,5 @@
-from organizations.models import Organization, Role
+from organizations.models import Organization, OrganizationDeletionJob, Role
+from organizations.permissions import KNOWN_PERMISSIONS
 from rest_framework import serializers
 
 
@@ -10,6 +11,37 @@ class OrganizationSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
+class OrganizationDeletionJobSerializer(serializers.ModelSerializer):
+    percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = OrganizationDeletionJob
+        fields = [
+            "id",
+            "organization_id",
+            "organization_name",
+            "status",
+            "step",
+            "totals",
+            "progress",
+            "percent",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_percent(self, job):
+        if job.status == "done":
+            return 100
+        total = sum(job.totals.values())
+        if not total:
+            return 0
+        deleted = sum(job.progress.values())
+        return min(99, int(deleted * 100 / total))
+
+
 class RoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Role
@@ -32,14 +64,8 @@ class RoleSerializer(serializers.ModelSerializer):
         if not isinstance(value, list):
             raise serializers.ValidationError("Permissions must be a list")
 
-        # Add any specific permission validation logic here
-        allowed_permissions = {
-            "FULL_ACCESS",
-            "READ",
-            "WRITE",
-            "DELETE",
-        }  # Add your allowed permissions
-        invalid_permissions = set(value) - allowed_permissions
+        # registry names, or the legacy names mapped onto them
+        invalid_permissions = set(value) - KNOWN_PERMISSIONS.keys()
 
         if invalid_permissions:
             raise serializers.ValidationError(
@@ -61,7 +87,7 @@ class AssignRoleSerializer(serializers.Serializer):
     def validate_roleId(self, value):
         # Validate that the role belongs to the correct organization
         organization = self.context.get("organization")
-        if organization and value.organization != organization:
+        if organization and value.organization_id != organization.id:
             raise serializers.ValidationError(
                 "This role does not belong to the specified organization"
             )
@@ -70,18 +96,31 @@ class AssignRoleSerializer(serializers.Serializer):
     def create(self, validated_data):
         user = self.context.get("user")
         role = validated_data.get("roleId")
-        organization = role.organization
 
         from .models import UserRole
 
-        user_role = UserRole.objects.create(
-            user=user, organization=organization, role=role
-        )
+        user_role = UserRole.objects.create(user=user, role=role)
         return user_role
 
 
+class BulkAssignRoleSerializer(serializers.Serializer):
+    """
+    Assign every listed role to every listed user. Ids are validated in bulk
+    by the view.
+    """
+
+    userIds = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=5000
+    )
+    roleIds = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=50
+    )
+
+
 class UpdatePermissionsSerializer(serializers.ModelSerializer):
-    permissions = serializers.ListField(child=serializers.CharField(max_length=100))
+    permissions = serializers.ListField(
+        child=serializers.ChoiceField(choices=sorted(KNOWN_PERMISSIONS))
+    )
 
     class Meta:
         model = Role
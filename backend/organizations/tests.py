@@ -1,3 +1,286 @@
-from django.test import TestCase
+import io
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from botocore.exceptions import EndpointConnectionError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from authentication.models import Invitation
+from contracts.models import Contract, PendingObjectDeletion
+from core.permissions import HasPermission
+from counterparties.models import Counterparty
+from organizations.deletion import STEPS, claim_job, run_job, schedule_deletion
+from organizations.models import Organization, Role, UserRole
+from organizations.permissions import mask_for, user_permission_mask
+from users.models import User
+
+
+def create_tenant(size):
+    """
+    Create an organization with an admin, size members, invitations and
+    contracts, each contract with a counterparty.
+    """
+    organization = Organization.objects.create(name=f"Tenant {size}")
+    admin = User.objects.create_user(
+        f"admin@tenant{size}.test", "password", "Ada", "Admin", organization=organization
+    )
+    UserRole.objects.create(user=admin, role=Role.objects.create(name="admin", organization=organization))
+    role = Role.objects.create(name="member", organization=organization, permissions=["contracts.view"])
+    for i in range(size):
+        member = User.objects.create_user(
+            f"member-{i}@tenant{size}.test", "password", "Member", str(i), organization=organization
+        )
+        UserRole.objects.create(user=member, role=role)
+        Invitation.objects.create(
+            email=f"invited-{i}@tenant{size}.test",
+            organization=organization,
+            role=role,
+            invited_by=admin,
+            expires_at=timezone.now() + timezone.timedelta(days=7),
+        )
+        contract = Contract.objects.create(
+            title=f"Contract {i}",
+            contract_type="nda",
+            organization=organization,
+            created_by=admin,
+            file_path=f"tenant{size}/contract-{i}.pdf",
+        )
+        Counterparty.objects.create(
+            contract=contract, party_name=f"Party {i}", party_type="company", email=f"party-{i}@party.test"
+        )
+    return SimpleNamespace(organization=organization, admin=admin)
+
+
+class OrganizationDeletionTests(TestCase):
+    def setUp(self):
+        self.tenant = create_tenant(10)
+        self.job = schedule_deletion(self.tenant.organization, requested_by=self.tenant.admin)
+
+    def test_steps_delete_rows_before_what_they_reference(self):
+        models = [queryset(self.tenant.organization.id).model for _, queryset in STEPS]
+        for position, model in enumerate(models):
+            for relation in model._meta.related_objects:
+                if relation.related_model in models:
+                    self.assertLess(
+                        models.index(relation.related_model),
+                        position,
+                        f"{relation.related_model.__name__} must be deleted before {model.__name__}",
+                    )
+
+    def test_failed_jobs_resume_from_their_step(self):
+        def fail_once(job, label, deleted):
+            if label == "contracts":
+                raise ConnectionError("database went away")
+
+        with self.assertRaises(ConnectionError):
+            run_job(claim_job(), batch_size=4, on_batch=fail_once)
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.step), ("failed", "contracts"))
+        self.assertEqual(self.job.progress["contracts"], 4)
+
+        schedule_deletion(self.tenant.organization, requested_by=None)
+        job = run_job(claim_job(), batch_size=4)
+
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.progress, job.totals)
+        self.assertFalse(Organization.objects.filter(id=self.tenant.organization.id).exists())
+        self.assertFalse(Contract.objects.filter(organization_id=self.tenant.organization.id).exists())
+        self.assertEqual(PendingObjectDeletion.objects.count(), 10)
+
+    def test_files_of_contracts_created_during_the_job_are_queued(self):
+        def create_contract(job, label, deleted):
+            if label == "users":
+                Contract.objects.create(
+                    title="Late",
+                    contract_type="nda",
+                    organization=self.tenant.organization,
+                    file_path="tenant10/late.pdf",
+                )
+
+        run_job(claim_job(), batch_size=100, on_batch=create_contract)
+
+        self.assertFalse(Organization.objects.filter(id=self.tenant.organization.id).exists())
+        self.assertTrue(PendingObjectDeletion.objects.filter(key="tenant10/late.pdf").exists())
+
+    def test_purge_counts_connection_errors_as_failed_attempts(self):
+        PendingObjectDeletion.objects.create(key="tenant10/orphan.pdf")
+        s3 = mock.Mock()
+        s3.delete_objects.side_effect = EndpointConnectionError(endpoint_url="https://s3.test")
+
+        with mock.patch("contracts.management.commands.purge_s3_objects.S3", return_value=s3):
+            call_command("purge_s3_objects", stdout=io.StringIO())
+
+        pending = PendingObjectDeletion.objects.get()
+        self.assertEqual(pending.attempts, 1)
+        self.assertIn("s3.test", pending.last_error)
+
+
+class HasPermissionTests(TestCase):
+    def setUp(self):
+        # masks are only cached on a cache shared between processes
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory},
+        }))
+        self.organization = Organization.objects.create(name="Acme")
+        self.role = Role.objects.create(
+            name="editor", organization=self.organization, permissions=["contracts.view"]
+        )
+        self.user = User.objects.create_user(
+            "editor@acme.test", "password", "Ed", "Itor", organization=self.organization
+        )
+        UserRole.objects.create(user=self.user, role=self.role)
+
+    def allows(self, *permissions):
+        # a fresh user per request, as the authentication builds it
+        user = User.objects.get(pk=self.user.pk)
+        return HasPermission(*permissions)().has_permission(SimpleNamespace(user=user), None)
+
+    def test_checks_every_permission(self):
+        self.assertTrue(self.allows("contracts.view"))
+        self.assertFalse(self.allows("contracts.view", "contracts.delete"))
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(self.allows("contracts.view", "contracts.delete"))
+
+    def test_masks_are_cached_until_roles_change(self):
+        self.assertFalse(self.allows("contracts.delete"))
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_permission_mask(user), mask_for("contracts.view"))
+
+        self.role.permissions = ["contracts.view", "contracts.delete"]
+        self.role.save()
+        self.assertTrue(self.allows("contracts.delete"))
+
+        deleter = Role.objects.create(
+            name="deleter", organization=self.organization, permissions=["organization.delete"]
+        )
+        self.assertFalse(self.allows("organization.delete"))
+        user_role = UserRole.objects.create(user=self.user, role=deleter)
+        self.assertTrue(self.allows("organization.delete"))
+        user_role.delete()
+        self.assertFalse(self.allows("organization.delete"))
+
+    def test_masks_are_not_cached_on_a_per_process_cache(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertFalse(self.allows("contracts.delete"))
+            # as another worker would, without the invalidation reaching this one
+            Role.objects.filter(pk=self.role.pk).update(permission_mask=mask_for("contracts.delete"))
+
+            self.assertTrue(self.allows("contracts.delete"))
+
+    def test_bulk_role_assignment_invalidates_masks(self):
+        admin_role = Role.objects.create(name="admin", organization=self.organization)
+        admin = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=self.organization
+        )
+        UserRole.objects.create(user=admin, role=admin_role)
+        deleter = Role.objects.create(
+            name="deleter", organization=self.organization, permissions=["contracts.delete"]
+        )
+        self.assertFalse(self.allows("contracts.delete"))
+
+        self.client.force_login(admin)
+        with override_settings(SECURE_SSL_REDIRECT=False):
+            response = self.client.post(
+                f"/api/organizations/{self.organization.id}/roles/assign/bulk/",
+                {"userIds": [self.user.id], "roleIds": [deleter.id]},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.allows("contracts.delete"))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class BulkAssignRoleTests(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name="Acme")
+        admin = User.objects.create_user(
+            "admin@acme.test", "password", "Ada", "Admin", organization=self.organization
+        )
+        UserRole.objects.create(user=admin, role=Role.objects.create(name="admin", organization=self.organization))
+        self.roles = [Role.objects.create(name=name, organization=self.organization) for name in ("a", "b")]
+        self.members = [
+            User.objects.create_user(f"member-{i}@acme.test", "password", "Member", str(i), organization=self.organization)
+            for i in range(2)
+        ]
+        self.outsider = User.objects.create_user("outsider@other.test", "password", "Out", "Sider")
+        self.client.force_login(admin)
+
+    def assign(self, user_ids):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f"/api/organizations/{self.organization.id}/roles/assign/bulk/",
+                {"userIds": user_ids, "roleIds": [role.id for role in self.roles]},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        return {result["userId"]: result["status"] for result in response.json()["results"]}, queries
+
+    def test_reports_the_pairs_missing_before_the_insert(self):
+        first, second = self.members
+        for role in self.roles:
+            UserRole.objects.create(user=second, role=role)
+
+        statuses, queries = self.assign([first.id, second.id, self.outsider.id])
+
+        self.assertEqual(
+            statuses, {first.id: "assigned", second.id: "unchanged", self.outsider.id: "error"}
+        )
+        self.assertEqual(UserRole.objects.filter(user=first).count(), 2)
+        self.assertEqual(self.assign([first.id])[0], {first.id: "unchanged"})
+        # members are locked before their roles are read
+        sql = [query["sql"] for query in queries]
+        lock = next(i for i, statement in enumerate(sql) if statement.endswith("FOR UPDATE"))
+        self.assertIn('FROM "users"', sql[lock])
+        self.assertLess(lock, next(i for i, statement in enumerate(sql) if 'INSERT INTO "organizations_userrole"' in statement))
+
+
+class LoadPermissionsTests(TestCase):
+    def setUp(self):
+        self.organizations = [Organization.objects.create(name=f"Tenant {i}") for i in range(5)]
+        self.customised = Role.objects.create(
+            name="user", organization=self.organizations[0], permissions=["contracts.view"]
+        )
+
+    def load(self, *args):
+        out = io.StringIO()
+        call_command("load_permissions", "--all", "--chunk-size", "2", *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        output = self.load("--dry-run")
+
+        self.assertIn("Tenant 1: admin would be created", output)
+        self.assertIn("9 roles would be created, 0 would be updated, 1 customised were kept", output)
+        self.assertEqual(Role.objects.count(), 1)
+
+    def test_creates_missing_roles_in_chunks_and_keeps_customised_ones(self):
+        output = self.load()
+
+        # 5 organizations in chunks of 2
+        self.assertEqual(output.count(" organizations: "), 3)
+        self.assertIn("9 roles were created, 0 were updated, 1 customised were kept", output)
+        self.assertEqual(Role.objects.filter(name__in=["admin", "user"]).count(), 10)
+        self.customised.refresh_from_db()
+        self.assertEqual(self.customised.permissions, ["contracts.view"])
+        self.assertIn("0 roles were created, 0 were updated, 1 customised were kept", self.load())
+
+    def test_overwrite_replaces_customised_roles(self):
+        self.load()
+        output = self.load("--overwrite")
+
+        self.assertIn("0 roles were created, 1 were updated", output)
+        self.customised.refresh_from_db()
+        self.assertEqual(self.customised.permissions, ["view_organization", "view_users", "submit_requests"])
+        self.assertEqual(
+            self.customised.permission_mask,
+            mask_for("organization.view", "users.view", "contracts.view", "contracts.create"),
+        )
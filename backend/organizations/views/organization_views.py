@@ -1,6 +1,10 @@
 from core.permissions import IsMainAdmin, IsOrganizationAdmin
-from organizations.models import Organization, Role, UserRole
-from organizations.serializers import OrganizationSerializer
+from organizations.deletion import schedule_deletion
+from organizations.models import Organization, OrganizationDeletionJob, Role, UserRole
+from organizations.serializers import (
+    OrganizationDeletionJobSerializer,
+    OrganizationSerializer,
+)
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -81,8 +85,44 @@ class OrganizationRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
     Retrieve, update or delete an organization.
 
     User must be either an organization admin or a Django superuser to access this view.
+    Deleting schedules a background deletion job and returns it with 202.
     """
 
     permission_classes = [IsAuthenticated, IsOrganizationAdmin | IsMainAdmin]
     queryset = Organization.objects.all()
     serializer_class = OrganizationSerializer
+
+    def destroy(self, request, *args, **kwargs):
+        organization = self.get_object()
+        user = request.user
+        if not user.is_superuser and organization.id != user.organization_id:
+            return Response(
+                {"message": "You do not have permission to perform this action."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        job = schedule_deletion(organization, requested_by=user)
+        return Response(
+            {
+                "message": "Organization deletion scheduled.",
+                "job": OrganizationDeletionJobSerializer(job).data,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class OrganizationDeletionJobView(generics.RetrieveAPIView):
+    """
+    Report the progress of an organization deletion job.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizationAdmin | IsMainAdmin]
+    serializer_class = OrganizationDeletionJobSerializer
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return OrganizationDeletionJob.objects.none()
+        user = self.request.user
+        if user.is_superuser:
+            return OrganizationDeletionJob.objects.all()
+        return OrganizationDeletionJob.objects.filter(organization_id=user.organization_id)
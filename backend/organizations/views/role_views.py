@@ -1,6 +1,14 @@
-from core.permissions import IsOrganizationAdmin
+from authentication.tokens import invalidate_auth_versions
+from core.permissions import HasPermission, IsInOrganization, IsOrganizationAdmin
+from django.db import transaction
+from django.db.models import Q
 from organizations.models import Organization, Role, UserRole
-from organizations.serializers import AssignRoleSerializer, RoleSerializer
+from organizations.permissions import invalidate_user_permissions
+from organizations.serializers import (
+    AssignRoleSerializer,
+    BulkAssignRoleSerializer,
+    RoleSerializer,
+)
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -38,7 +46,7 @@ class UserRolesView(generics.GenericAPIView):
 
         # Check if user has any roles in the organization
         user_roles = UserRole.objects.filter(
-            organization=organization, user=user
+            role__organization=organization, user=user
         ).select_related("role")
 
         if not user_roles.exists():
@@ -72,17 +80,17 @@ class AssignRoleView(generics.GenericAPIView):
                 )
 
             # Check if the role has been already assigned to the user
-            if UserRole.objects.filter(
-                user_id=userId, organization_id=organizationId, role_id=role.id
-            ).exists():
+            if UserRole.objects.filter(user_id=userId, role_id=role.id).exists():
                 return Response(
                     {"message": "Role already assigned to the user."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             # Check if the user belongs to the organization
-            if not UserRole.objects.filter(
-                user_id=userId, organization_id=organizationId
+            if not User.objects.filter(
+                Q(organization_id=organizationId)
+                | Q(roles__role__organization_id=organizationId),
+                id=userId,
             ).exists():
                 return Response(
                     {"message": "User does not belong to the organization."},
@@ -95,9 +103,7 @@ class AssignRoleView(generics.GenericAPIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            UserRole.objects.create(
-                user_id=userId, organization_id=organizationId, role_id=role.id
-            )
+            UserRole.objects.create(user_id=userId, role_id=role.id)
             return Response(
                 {"message": "Role assigned successfully!"},
                 status=status.HTTP_201_CREATED,
@@ -105,6 +111,97 @@ class AssignRoleView(generics.GenericAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkAssignRoleView(generics.GenericAPIView):
+    """
+    Assign one or more roles to many users of the organization at once.
+
+    Every user gets a result with its status: "assigned" when at least one
+    role was new to them, "unchanged" when they already had every role, or
+    "error" when they are not a member of the organization.
+    """
+
+    permission_classes = [
+        IsAuthenticated,
+        IsInOrganization,
+        HasPermission("roles.manage"),
+    ]
+    serializer_class = BulkAssignRoleSerializer
+
+    def post(self, request, organizationId):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = list(dict.fromkeys(serializer.validated_data["userIds"]))
+        role_ids = set(serializer.validated_data["roleIds"])
+
+        found_role_ids = set(
+            Role.objects.filter(
+                id__in=role_ids, organization_id=organizationId
+            ).values_list("id", flat=True)
+        )
+        if found_role_ids != role_ids:
+            return Response(
+                {
+                    "message": "Roles do not exist or do not belong to the organization.",
+                    "roleIds": sorted(role_ids - found_role_ids),
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        members = set(
+            User.objects.filter(id__in=user_ids)
+            .filter(
+                Q(organization_id=organizationId)
+                | Q(roles__role__organization_id=organizationId)
+            )
+            .values_list("id", flat=True)
+        )
+
+        with transaction.atomic():
+            # bulk_create(ignore_conflicts=True) does not tell which rows it
+            # skipped, so read the pairs that exist before the insert under
+            # a lock: a concurrent assignment inserting a user role holds a
+            # key share lock on the user until it commits
+            list(User.objects.select_for_update().filter(id__in=members).values_list("id"))
+            existing = set(
+                UserRole.objects.filter(
+                    user_id__in=members, role_id__in=role_ids
+                ).values_list("user_id", "role_id")
+            )
+            missing = [
+                (user_id, role_id)
+                for user_id in user_ids
+                if user_id in members
+                for role_id in role_ids
+                if (user_id, role_id) not in existing
+            ]
+            # anything that still slips through is absorbed by unique_user_role
+            UserRole.objects.bulk_create(
+                [UserRole(user_id=user_id, role_id=role_id) for user_id, role_id in missing],
+                ignore_conflicts=True,
+            )
+
+        assigned = {user_id for user_id, _ in missing}
+        invalidate_user_permissions(*assigned)
+        invalidate_auth_versions(user_ids=assigned)
+
+        results = []
+        for user_id in user_ids:
+            if user_id not in members:
+                results.append(
+                    {
+                        "userId": user_id,
+                        "status": "error",
+                        "message": "User does not belong to the organization.",
+                    }
+                )
+            elif user_id in assigned:
+                results.append({"userId": user_id, "status": "assigned"})
+            else:
+                results.append({"userId": user_id, "status": "unchanged"})
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 class AvailableRolesView(generics.GenericAPIView):
     """
     Retrieve all roles available in an organization.
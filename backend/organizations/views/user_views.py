@@ -1,6 +1,7 @@
+from core.loaders import get_loader
 from core.permissions import IsInOrganization
-from django.shortcuts import get_object_or_404
-from organizations.models import Organization
+from django.http import Http404
+from organizations.models import Organization, UserRole
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -13,15 +14,23 @@ class OrganizationUsersView(generics.GenericAPIView):
     serializer_class = UserSerializer
 
     def get(self, request, organizationId):
-        organization = get_object_or_404(Organization, id=organizationId)
-        members = organization.members.all()
+        organization = get_loader().load(Organization, organizationId)
+        if organization is None:
+            raise Http404
+        members = list(organization.members.all())
+
+        # all member roles in one query instead of one per member
+        member_roles = {member.id: [] for member in members}
+        for user_id, role_name in UserRole.objects.filter(
+            user__in=members, role__organization=organization
+        ).values_list("user_id", "role__name"):
+            member_roles[user_id].append(role_name)
 
         user_data = []
 
         for member in members:
             member_data = self.get_serializer(member).data
-            member_roles = member.roles.filter(role__organization=organization)
-            member_data["roles"] = [role.role.name for role in member_roles]
+            member_data["roles"] = member_roles[member.id]
             user_data.append(member_data)
 
         return Response(user_data, status=status.HTTP_200_OK)
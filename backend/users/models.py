@@ -72,3 +72,53 @@ class User(AbstractBaseUser, PermissionsMixin):
             f"Name: {self.first_name} {self.last_name}\n"
             f'Organization: {self.organization.name if self.organization else "None"}'
         )
+
+
+class ClaimsUser(User):
+    """
+    User built from access token claims without a database query. Only the
+    id, organization and admin flags are loaded; reading any other field
+    loads the full row, with its organization, in one query.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, organization_id, is_superuser, is_organization_admin):
+        values = {
+            "id": cls._meta.pk.to_python(user_id),
+            "is_superuser": is_superuser,
+            # deactivation changes the auth version, so tokens of inactive
+            # users never get here
+            "is_active": True,
+            "organization_id": None,
+        }
+        # from_db expects values in concrete field order
+        field_names = [
+            field.attname
+            for field in cls._meta.concrete_fields
+            if field.attname in values
+        ]
+        user = cls.from_db(
+            None, field_names, [values[name] for name in field_names]
+        )
+        if organization_id is not None:
+            from organizations.models import Organization
+
+            user.organization = Organization.from_db(
+                None, ["id"], [Organization._meta.pk.to_python(organization_id)]
+            )
+        user.is_organization_admin = is_organization_admin
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred_fields = self.get_deferred_fields()
+        if fields is None or from_queryset is not None or not deferred_fields:
+            return super().refresh_from_db(using, fields, from_queryset)
+
+        user = User.objects.select_related("organization").get(pk=self.pk)
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred_fields:
+                setattr(self, field.attname, getattr(user, field.attname))
+        self.organization = user.organization